@@ -19,8 +19,9 @@ from app.models import Appointment, Patient, ConversationHistory
 # access to the values within the .ini file in use.
 config = context.config
 
-# Set the database URL from settings
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# Set the database URL from settings (migrations take advisory locks and
+# run CONCURRENTLY, so bypass a transaction pooler when one is configured)
+config.set_main_option("sqlalchemy.url", settings.direct_database_url or settings.database_url)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
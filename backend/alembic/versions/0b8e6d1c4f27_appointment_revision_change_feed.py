@@ -0,0 +1,116 @@
+"""Appointment revision sequence and change notifications
+
+Revision ID: 0b8e6d1c4f27
+Revises: 9f4c2b7e1d58
+Create Date: 2025-11-19 16:31:52.447013
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b8e6d1c4f27'
+down_revision: Union[str, None] = '9f4c2b7e1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE appointments_revision_seq")
+
+    # Nullable first so adding the column doesn't rewrite the table; the
+    # default only applies to new rows, existing ones are numbered in id order
+    op.add_column('appointments', sa.Column('revision', sa.BigInteger(), nullable=True))
+    op.execute(
+        "ALTER TABLE appointments "
+        "ALTER COLUMN revision SET DEFAULT nextval('appointments_revision_seq')"
+    )
+    op.execute("""
+        UPDATE appointments AS a
+        SET revision = numbered.revision
+        FROM (
+            SELECT id, nextval('appointments_revision_seq') AS revision
+            FROM (SELECT id FROM appointments WHERE revision IS NULL ORDER BY id) AS ordered
+        ) AS numbered
+        WHERE a.id = numbered.id
+    """)
+    op.alter_column('appointments', 'revision', nullable=False)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION appointments_bump_revision() RETURNS trigger AS $$
+        BEGIN
+            NEW.revision := nextval('appointments_revision_seq');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER appointments_bump_revision
+        BEFORE UPDATE ON appointments
+        FOR EACH ROW
+        WHEN ((OLD.patient_id, OLD.doctor_id, OLD.doctor_name, OLD.appointment_date,
+               OLD.duration_minutes, OLD.status, OLD.notes, OLD.reminder_sent_at)
+              IS DISTINCT FROM
+              (NEW.patient_id, NEW.doctor_id, NEW.doctor_name, NEW.appointment_date,
+               NEW.duration_minutes, NEW.status, NEW.notes, NEW.reminder_sent_at))
+        EXECUTE FUNCTION appointments_bump_revision()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION appointments_notify_changes() RETURNS trigger AS $$
+        DECLARE
+            latest bigint;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT max(revision) INTO latest FROM new_rows;
+            ELSE
+                SELECT max(n.revision) INTO latest
+                FROM new_rows n JOIN old_rows o USING (id)
+                WHERE n.revision <> o.revision;
+            END IF;
+            IF latest IS NOT NULL THEN
+                PERFORM pg_notify('appointment_changes', latest::text);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER appointments_notify_insert
+        AFTER INSERT ON appointments
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION appointments_notify_changes()
+    """)
+    op.execute("""
+        CREATE TRIGGER appointments_notify_update
+        AFTER UPDATE ON appointments
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION appointments_notify_changes()
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_revision',
+            'appointments',
+            ['revision'],
+            unique=True,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_appointments_revision',
+            table_name='appointments',
+            postgresql_concurrently=True
+        )
+    op.execute("DROP TRIGGER IF EXISTS appointments_notify_update ON appointments")
+    op.execute("DROP TRIGGER IF EXISTS appointments_notify_insert ON appointments")
+    op.execute("DROP FUNCTION IF EXISTS appointments_notify_changes()")
+    op.execute("DROP TRIGGER IF EXISTS appointments_bump_revision ON appointments")
+    op.execute("DROP FUNCTION IF EXISTS appointments_bump_revision()")
+    op.drop_column('appointments', 'revision')
+    op.execute("DROP SEQUENCE IF EXISTS appointments_revision_seq")
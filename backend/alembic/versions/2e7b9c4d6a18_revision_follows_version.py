@@ -0,0 +1,46 @@
+"""Bump the revision whenever the version changes
+
+Revision ID: 2e7b9c4d6a18
+Revises: 6a4f2d8b1c35
+Create Date: 2025-11-24 15:07:51.628094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e7b9c4d6a18'
+down_revision: Union[str, None] = '6a4f2d8b1c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    'patient_id', 'doctor_id', 'doctor_name', 'appointment_date',
+    'duration_minutes', 'status', 'notes', 'reminder_sent_at'
+]
+
+
+def _create_trigger(columns: Sequence[str]) -> None:
+    old = ", ".join(f"OLD.{column}" for column in columns)
+    new = ", ".join(f"NEW.{column}" for column in columns)
+    op.execute("DROP TRIGGER IF EXISTS appointments_bump_revision ON appointments")
+    op.execute(f"""
+        CREATE TRIGGER appointments_bump_revision
+        BEFORE UPDATE ON appointments
+        FOR EACH ROW
+        WHEN (({old}) IS DISTINCT FROM ({new}))
+        EXECUTE FUNCTION appointments_bump_revision()
+    """)
+
+
+def upgrade() -> None:
+    # Idempotent transitions (a repeated confirm) only bump version; without
+    # a new revision the ETag stayed the same and the change feed missed them
+    _create_trigger(COLUMNS + ['version'])
+
+
+def downgrade() -> None:
+    _create_trigger(COLUMNS)
@@ -0,0 +1,51 @@
+"""Carry revision in the upcoming-window indexes
+
+Revision ID: 3d7a1f5c9e64
+Revises: 0b8e6d1c4f27
+Create Date: 2025-11-20 11:08:27.934561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7a1f5c9e64'
+down_revision: Union[str, None] = '0b8e6d1c4f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, partial index predicate)
+WINDOW_INDEXES = [
+    ('ix_appointments_status_appointment_date', None),
+    ('ix_appointments_reminder_due', 'reminder_sent_at IS NULL'),
+]
+
+
+def _rebuild(include: Sequence[str]) -> None:
+    # An index can't gain INCLUDE columns in place: build the new one next
+    # to the old one, then swap, so the window scan always has an index
+    with op.get_context().autocommit_block():
+        for name, where in WINDOW_INDEXES:
+            op.create_index(
+                f'{name}_new',
+                'appointments',
+                ['status', 'appointment_date', 'id'],
+                unique=False,
+                postgresql_include=list(include),
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True
+            )
+            op.drop_index(name, table_name='appointments', postgresql_concurrently=True)
+            op.execute(f'ALTER INDEX {name}_new RENAME TO {name}')
+
+
+def upgrade() -> None:
+    _rebuild(['revision'])
+
+
+def downgrade() -> None:
+    _rebuild([])
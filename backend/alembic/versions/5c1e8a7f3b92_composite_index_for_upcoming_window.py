@@ -0,0 +1,52 @@
+"""Composite index for the upcoming-window scan
+
+Revision ID: 5c1e8a7f3b92
+Revises: db9e577080c2
+Create Date: 2025-11-03 10:15:42.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a7f3b92'
+down_revision: Union[str, None] = 'db9e577080c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction, and keeps the table
+    # writable while the index builds on large agendas
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_status_appointment_date',
+            'appointments',
+            ['status', 'appointment_date', 'id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        # Leading column of the composite index covers status-only lookups
+        op.drop_index(
+            'ix_appointments_status',
+            table_name='appointments',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_status',
+            'appointments',
+            ['status'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_appointments_status_appointment_date',
+            table_name='appointments',
+            postgresql_concurrently=True
+        )
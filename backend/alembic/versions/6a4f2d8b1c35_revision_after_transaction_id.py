@@ -0,0 +1,59 @@
+"""Assign the transaction id before taking a revision
+
+Revision ID: 6a4f2d8b1c35
+Revises: 3d7a1f5c9e64
+Create Date: 2025-11-24 10:42:18.306719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a4f2d8b1c35'
+down_revision: Union[str, None] = '3d7a1f5c9e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _bump_revision_function(next_revision: str) -> str:
+    return f"""
+        CREATE OR REPLACE FUNCTION appointments_bump_revision() RETURNS trigger AS $$
+        BEGIN
+            NEW.revision := {next_revision};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """
+
+
+def upgrade() -> None:
+    # nextval() doesn't assign a transaction id, so a revision could be
+    # taken before its transaction had one and pass the change feed's
+    # watermark while still in flight
+    op.execute("""
+        CREATE OR REPLACE FUNCTION appointments_next_revision() RETURNS bigint AS $$
+        BEGIN
+            PERFORM pg_current_xact_id();
+            RETURN nextval('appointments_revision_seq');
+        END
+        $$ LANGUAGE plpgsql VOLATILE
+    """)
+    op.alter_column(
+        'appointments',
+        'revision',
+        server_default=sa.text("appointments_next_revision()")
+    )
+    op.execute(_bump_revision_function("appointments_next_revision()"))
+
+
+def downgrade() -> None:
+    op.execute(_bump_revision_function("nextval('appointments_revision_seq')"))
+    op.alter_column(
+        'appointments',
+        'revision',
+        server_default=sa.text("nextval('appointments_revision_seq')")
+    )
+    op.execute("DROP FUNCTION IF EXISTS appointments_next_revision()")
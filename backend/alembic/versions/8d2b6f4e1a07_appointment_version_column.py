@@ -0,0 +1,30 @@
+"""Appointment version column for optimistic concurrency
+
+Revision ID: 8d2b6f4e1a07
+Revises: 5c1e8a7f3b92
+Create Date: 2025-11-05 16:02:11.840377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2b6f4e1a07'
+down_revision: Union[str, None] = '5c1e8a7f3b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Constant server default: Postgres 11+ adds the column without a table rewrite
+    op.add_column(
+        'appointments',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('appointments', 'version')
@@ -0,0 +1,60 @@
+"""reminder_jobs queue table
+
+Revision ID: 9f4c2b7e1d58
+Revises: d5b1a9e3c427
+Create Date: 2025-11-18 11:05:49.204716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f4c2b7e1d58'
+down_revision: Union[str, None] = 'd5b1a9e3c427'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reminder_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('appointment_id', sa.Integer(), nullable=False),
+    sa.Column('reminder_type', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'SENT', 'FAILED', 'SKIPPED', name='reminderjobstatus'), server_default='PENDING', nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), server_default='3', nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('locked_by', sa.String(length=64), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('message_sid', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('appointment_id', 'reminder_type', name='uq_reminder_jobs_appointment_id_reminder_type')
+    )
+    op.create_index(
+        'ix_reminder_jobs_runnable',
+        'reminder_jobs',
+        ['run_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+    op.create_index(
+        'ix_reminder_jobs_running_locked_at',
+        'reminder_jobs',
+        ['locked_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'RUNNING'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminder_jobs_running_locked_at', table_name='reminder_jobs')
+    op.drop_index('ix_reminder_jobs_runnable', table_name='reminder_jobs')
+    op.drop_table('reminder_jobs')
+    sa.Enum(name='reminderjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,79 @@
+"""JSONB with GIN indexes for patient preferences and conversation state
+
+Revision ID: a7d3e5f09c18
+Revises: f1c6d8a2b930
+Create Date: 2025-11-13 16:02:41.775203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5f09c18'
+down_revision: Union[str, None] = 'f1c6d8a2b930'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rewrites both tables under an exclusive lock; both are small compared
+    # to appointments, but run this outside peak hours
+    op.alter_column(
+        'patients', 'preferences',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='preferences::jsonb'
+    )
+    op.alter_column(
+        'conversation_history', 'state',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='state::jsonb'
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_preferences',
+            'patients',
+            ['preferences'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'preferences': 'jsonb_path_ops'},
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_patients_preferred_time',
+            'patients',
+            [sa.text("(preferences ->> 'preferred_time')")],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_conversation_history_state',
+            'conversation_history',
+            ['state'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'state': 'jsonb_path_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_conversation_history_state', table_name='conversation_history', postgresql_concurrently=True)
+        op.drop_index('ix_patients_preferred_time', table_name='patients', postgresql_concurrently=True)
+        op.drop_index('ix_patients_preferences', table_name='patients', postgresql_concurrently=True)
+
+    op.alter_column(
+        'conversation_history', 'state',
+        type_=sa.JSON(),
+        postgresql_using='state::json'
+    )
+    op.alter_column(
+        'patients', 'preferences',
+        type_=sa.JSON(),
+        postgresql_using='preferences::json'
+    )
@@ -0,0 +1,37 @@
+"""Index on (doctor_id, appointment_date) for availability lookups
+
+Revision ID: b47e9d3c5a16
+Revises: 8d2b6f4e1a07
+Create Date: 2025-11-07 11:48:30.524917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b47e9d3c5a16'
+down_revision: Union[str, None] = '8d2b6f4e1a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_doctor_id_appointment_date',
+            'appointments',
+            ['doctor_id', 'appointment_date'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_appointments_doctor_id_appointment_date',
+            table_name='appointments',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,65 @@
+"""jsonb_merge_patch() function and conversation appointment index
+
+Revision ID: c2e8f4a6d713
+Revises: a7d3e5f09c18
+Create Date: 2025-11-14 09:47:12.318846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f4a6d713'
+down_revision: Union[str, None] = 'a7d3e5f09c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # RFC 7396 merge patch, used by PATCH /api/conversations/{id}
+    op.execute("""
+        CREATE OR REPLACE FUNCTION jsonb_merge_patch(target jsonb, patch jsonb) RETURNS jsonb AS $$
+        BEGIN
+            IF patch IS NULL OR jsonb_typeof(patch) <> 'object' THEN
+                RETURN patch;
+            END IF;
+            IF target IS NULL OR jsonb_typeof(target) <> 'object' THEN
+                target := '{}'::jsonb;
+            END IF;
+            RETURN (
+                SELECT COALESCE(
+                    jsonb_object_agg(
+                        key,
+                        CASE WHEN p.value IS NULL THEN t.value
+                             ELSE jsonb_merge_patch(t.value, p.value) END
+                    ),
+                    '{}'::jsonb
+                )
+                FROM jsonb_each(target) t
+                FULL JOIN jsonb_each(patch) p USING (key)
+                WHERE p.value IS NULL OR jsonb_typeof(p.value) <> 'null'
+            );
+        END
+        $$ LANGUAGE plpgsql IMMUTABLE
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_conversation_history_appointment_id',
+            'conversation_history',
+            ['appointment_id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_conversation_history_appointment_id',
+            table_name='conversation_history',
+            postgresql_concurrently=True
+        )
+    op.execute("DROP FUNCTION IF EXISTS jsonb_merge_patch(jsonb, jsonb)")
@@ -0,0 +1,51 @@
+"""Reminder tracking columns and partial index for due reminders
+
+Revision ID: d5b1a9e3c427
+Revises: c2e8f4a6d713
+Create Date: 2025-11-17 14:22:38.590117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b1a9e3c427'
+down_revision: Union[str, None] = 'c2e8f4a6d713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable columns and a constant default don't rewrite the table
+    op.add_column('appointments', sa.Column('reminder_sent_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('appointments', sa.Column('reminder_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('appointments', sa.Column('reminder_claimed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('appointments', sa.Column('reminder_message_sid', sa.String(length=64), nullable=True))
+    op.add_column('appointments', sa.Column('reminder_type', sa.String(length=50), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_reminder_due',
+            'appointments',
+            ['status', 'appointment_date', 'id'],
+            unique=False,
+            postgresql_where=sa.text('reminder_sent_at IS NULL'),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_appointments_reminder_due',
+            table_name='appointments',
+            postgresql_concurrently=True
+        )
+    op.drop_column('appointments', 'reminder_type')
+    op.drop_column('appointments', 'reminder_message_sid')
+    op.drop_column('appointments', 'reminder_claimed_at')
+    op.drop_column('appointments', 'reminder_attempts')
+    op.drop_column('appointments', 'reminder_sent_at')
@@ -0,0 +1,86 @@
+"""Prevent double booking with a tstzrange exclusion constraint
+
+Revision ID: e3a9c1f7d24b
+Revises: b47e9d3c5a16
+Create Date: 2025-11-10 09:31:57.204661
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c1f7d24b'
+down_revision: Union[str, None] = 'b47e9d3c5a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets the GiST index combine doctor_id (btree-style =) with ranges (&&)
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.add_column(
+        'appointments',
+        sa.Column('booked_during', postgresql.TSTZRANGE(), nullable=True)
+    )
+
+    # timestamptz + interval is not IMMUTABLE, so the range cannot be a
+    # generated column; a trigger keeps it in sync on every write path
+    op.execute("""
+        CREATE OR REPLACE FUNCTION appointments_set_booked_during() RETURNS trigger AS $$
+        BEGIN
+            NEW.booked_during := tstzrange(
+                NEW.appointment_date,
+                NEW.appointment_date + make_interval(mins => COALESCE(NEW.duration_minutes, 30))
+            );
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER appointments_booked_during
+        BEFORE INSERT OR UPDATE OF appointment_date, duration_minutes ON appointments
+        FOR EACH ROW EXECUTE FUNCTION appointments_set_booked_during()
+    """)
+
+    # Backfill through the trigger
+    op.execute("UPDATE appointments SET appointment_date = appointment_date")
+
+    # Fail with the offending rows instead of a bare constraint error
+    conflicts = op.get_bind().execute(sa.text("""
+        SELECT a.id, b.id
+        FROM appointments a
+        JOIN appointments b
+          ON a.doctor_id = b.doctor_id
+         AND a.id < b.id
+         AND a.booked_during && b.booked_during
+        WHERE a.status IN ('PENDING', 'CONFIRMED')
+          AND b.status IN ('PENDING', 'CONFIRMED')
+        LIMIT 20
+    """)).all()
+    if conflicts:
+        pairs = ", ".join(f"{a}/{b}" for a, b in conflicts)
+        raise RuntimeError(
+            f"Overlapping booked appointments must be resolved before this "
+            f"migration (appointment id pairs: {pairs})"
+        )
+
+    op.create_exclude_constraint(
+        'ex_appointments_doctor_overlap',
+        'appointments',
+        ('doctor_id', '='),
+        ('booked_during', '&&'),
+        using='gist',
+        where="status IN ('PENDING', 'CONFIRMED')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('ex_appointments_doctor_overlap', 'appointments', type_='exclude')
+    op.execute("DROP TRIGGER IF EXISTS appointments_booked_during ON appointments")
+    op.execute("DROP FUNCTION IF EXISTS appointments_set_booked_during()")
+    op.drop_column('appointments', 'booked_during')
@@ -0,0 +1,103 @@
+"""Append-only conversation_messages table
+
+Revision ID: f1c6d8a2b930
+Revises: e3a9c1f7d24b
+Create Date: 2025-11-12 10:14:06.381529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6d8a2b930'
+down_revision: Union[str, None] = 'e3a9c1f7d24b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('conversation_messages',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('conversation_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('clock_timestamp()'), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversation_history.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_conversation_messages_conversation_id_created_at',
+        'conversation_messages',
+        ['conversation_id', 'created_at', 'id'],
+        unique=False
+    )
+
+    # Timestamp cast that returns NULL instead of failing, so one element
+    # with a bad date (e.g. 2025-13-40) doesn't abort the migration
+    op.execute("""
+        CREATE FUNCTION pg_temp.try_timestamptz(value text) RETURNS timestamptz AS $$
+        BEGIN
+            RETURN value::timestamptz;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Copy the legacy JSON arrays in order. Elements keep their own
+    # ISO timestamp when it is valid (the prefix check also rejects
+    # special inputs like 'now'); the others are placed after the
+    # conversation's creation in array order. Everything else becomes
+    # payload.
+    op.execute("""
+        INSERT INTO conversation_messages (conversation_id, role, content, payload, created_at)
+        SELECT ch.id,
+               left(COALESCE(m.value->>'role', 'user'), 20),
+               COALESCE(m.value->>'content', ''),
+               NULLIF(m.value::jsonb - 'role' - 'content' - 'timestamp', '{}'::jsonb),
+               COALESCE(
+                   CASE
+                       WHEN m.value->>'timestamp' ~ '^\\d{4}-\\d{2}-\\d{2}'
+                       THEN pg_temp.try_timestamptz(m.value->>'timestamp')
+                   END,
+                   ch.created_at + m.position * interval '1 microsecond'
+               )
+        FROM conversation_history ch
+        CROSS JOIN LATERAL json_array_elements(
+            CASE WHEN json_typeof(ch.messages) = 'array' THEN ch.messages ELSE '[]'::json END
+        ) WITH ORDINALITY AS m(value, position)
+        WHERE json_typeof(m.value) = 'object'
+        ORDER BY ch.id, m.position
+    """)
+    op.execute("DROP FUNCTION pg_temp.try_timestamptz(text)")
+
+
+def downgrade() -> None:
+    # Write every message back into the JSON array, including the ones
+    # appended since the upgrade, in log order
+    op.execute("""
+        UPDATE conversation_history ch
+        SET messages = log.messages
+        FROM (
+            SELECT conversation_id,
+                   json_agg(
+                       COALESCE(payload, '{}'::jsonb)
+                       || jsonb_build_object(
+                           'role', role,
+                           'content', content,
+                           'timestamp', to_json(created_at) #>> '{}'
+                       )
+                       ORDER BY created_at, id
+                   ) AS messages
+            FROM conversation_messages
+            GROUP BY conversation_id
+        ) AS log
+        WHERE ch.id = log.conversation_id
+    """)
+    op.drop_index('ix_conversation_messages_conversation_id_created_at', table_name='conversation_messages')
+    op.drop_table('conversation_messages')
@@ -0,0 +1,86 @@
+"""
+Bulk appointment import from the command line.
+
+Loads a clinic's agenda export through the same path as
+POST /api/appointments/import (validation, COPY into a staging table,
+one INSERT), without the upload size limits of a web request.
+
+Usage:
+    python -m app.import_appointments agenda.csv
+    python -m app.import_appointments agenda.ndjson --chunk-size 10000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from app.database import AsyncSessionLocal, async_engine
+from app.services.importer import (
+    DEFAULT_CHUNK_SIZE,
+    ImportFormat,
+    detect_format,
+    import_appointments,
+    read_rows
+)
+
+
+async def import_file(path: str, import_format: ImportFormat, chunk_size: int) -> int:
+    """
+    Import one file and print a summary.
+
+    Returns:
+        Number of rejected rows
+    """
+    started = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            async with AsyncSessionLocal() as db:
+                report = await import_appointments(
+                    db, read_rows(stream, import_format), chunk_size
+                )
+    finally:
+        await async_engine.dispose()
+    elapsed = time.perf_counter() - started
+
+    for error in report.errors[:20]:
+        print(f"  row {error.row}: {error.detail}")
+    if report.failed > 20:
+        print(f"  ... and {report.failed - 20} more rejected rows")
+
+    print("\n" + "="*50)
+    print(f"Import finished in {elapsed:.2f}s")
+    print("="*50)
+    print(f"Rows received: {report.received}")
+    print(f"Imported: {report.imported}")
+    print(f"Rejected: {report.failed}")
+    print("="*50 + "\n")
+    return report.failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import appointments from CSV or NDJSON.")
+    parser.add_argument("path", help="Agenda export (.csv with header row, or .ndjson)")
+    parser.add_argument(
+        "--format",
+        dest="import_format",
+        choices=[choice.value for choice in ImportFormat],
+        help="Defaults to the file extension"
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    import_format = (
+        ImportFormat(args.import_format) if args.import_format
+        else detect_format(args.path, None)
+    )
+    if import_format is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+
+    print(f"Importing {args.path}...")
+    failed = asyncio.run(import_file(args.path, import_format, args.chunk_size))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Logging setup for the API and app.worker.
+
+Operational events (connection budget, slow queries, worker metrics,
+reconnects) are logged under the "app." loggers; structured payloads go in
+extra={"fields": {...}}. configure_logging() installs one stderr handler at
+LOG_LEVEL. With LOG_FORMAT=json every record is one JSON object with the
+fields merged in; the text format appends them as JSON after the message.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.database import settings
+
+
+class TextFormatter(logging.Formatter):
+    """Plain log lines, with any structured fields appended as JSON."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        return f"{line} {json.dumps(fields, default=str)}" if fields else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: at, level, logger, message and the fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "at": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **(getattr(record, "fields", None) or {})
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def configure_logging(level: Optional[str] = None, log_format: Optional[str] = None) -> None:
+    """
+    Send log records to stderr (no-op if the root logger already has handlers).
+
+    Args:
+        level: Level name (default: settings.log_level)
+        log_format: "text" or "json" (default: settings.log_format)
+    """
+    handler = logging.StreamHandler()
+    if (log_format or settings.log_format) == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logging.basicConfig(level=(level or settings.log_level).upper(), handlers=[handler])
+    # SQLAlchemy logs every statement at INFO (SQL_ECHO covers that) and
+    # names pool loggers after the pool class, i.e. app.database.*
+    for name in ("sqlalchemy", "app.database"):
+        logging.getLogger(name).setLevel(logging.WARNING)
@@ -5,19 +5,45 @@ Main entry point for the FastAPI backend.
 Handles database operations, business logic, and external API integrations.
 """
 
-from fastapi import FastAPI, status
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime
-from sqlalchemy import text
+from typing import Optional
+
+from app.database import async_engine, connection_budget, get_db, settings
+from app.logging_config import configure_logging
+from app.metrics import Gauge, MetricsMiddleware, registry
+from app.routers import appointments, conversations, patients
+from app.services.availability import calendar_cache, working_hours
+from app.services.changes import change_notifier
+from app.services.health import check_connection_budget, health_monitor
+from app.services.patients import patient_id_cache
+from app.services.response_cache import upcoming_cache
+from app.slow_queries import slow_query_log
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hook: starts the database health probe and reports
+    the connection budget; closes the change feed's LISTEN connection and
+    the response cache's backend."""
+    configure_logging()
+    await health_monitor.start()
+    await check_connection_budget(async_engine, settings.health_probe_timeout_seconds)
+    yield
+    await health_monitor.stop()
+    await change_notifier.stop()
+    await upcoming_cache.close()
 
-from app.database import engine, get_db
-from app.routers import appointments
 
 app = FastAPI(
     title="smartSalud API",
     description="Backend for autonomous appointment management system",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS configuration - Allow Cloudflare Workers and local development
@@ -35,22 +61,24 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Outermost, so latency includes the other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(appointments.router)
+app.include_router(patients.router)
+app.include_router(conversations.router)
 
 
 @app.get("/health", status_code=status.HTTP_200_OK)
 async def health_check():
     """
     Health check endpoint for monitoring and load balancers.
+
+    Served from memory: the database state comes from the background probe
+    (app.services.health), so polling this never touches the database.
     """
-    # Check database connection
-    db_status = "healthy"
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-    except Exception as e:
-        db_status = f"unhealthy: {str(e)}"
+    db_status = health_monitor.status
 
     return JSONResponse({
         "status": "healthy" if db_status == "healthy" else "degraded",
@@ -60,10 +88,103 @@ async def health_check():
             "database": db_status,
             "google_calendar": "not_configured",
             "groq": "not_configured"
-        }
+        },
+        "database_probe": health_monitor.stats(),
+        "pool": {**async_engine.pool.stats(), "budget": connection_budget()},
+        "caches": {
+            "doctor_calendar": calendar_cache.stats(),
+            "working_hours_slots": working_hours.stats(),
+            "patient_phone": patient_id_cache.stats(),
+            "upcoming": upcoming_cache.stats()
+        },
+        "change_feed": change_notifier.stats()
     })
 
 
+@app.get("/health/live", status_code=status.HTTP_200_OK)
+async def liveness():
+    """
+    Liveness probe: the process is up and serving requests.
+
+    Doesn't depend on the database, so an outage doesn't get healthy
+    workers restarted.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: 200 while the last database probe succeeded and is
+    recent, 503 otherwise (take the instance out of rotation).
+    """
+    return JSONResponse(
+        {"status": "ready" if health_monitor.ready else "not_ready", "database": health_monitor.stats()},
+        status_code=status.HTTP_200_OK if health_monitor.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+POOL_STATES = ("checked_out", "checked_in", "overflow")
+
+registry.register(Gauge(
+    "db_pool_connections",
+    "Connections of the async engine's pool by state.",
+    ("state",),
+    lambda: {(state,): async_engine.pool.stats()[state] for state in POOL_STATES}
+))
+registry.register(Gauge(
+    "db_health_probe_latency_seconds",
+    "Latency of the last background database probe.",
+    (),
+    lambda: {(): (health_monitor.latency_ms or 0) / 1000}
+))
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint: per-route latency, status and database
+    histograms (app.metrics) plus pool gauges, for this process.
+    """
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+def _require_admin(token: Optional[str]) -> None:
+    """
+    Raises:
+        HTTPException: 404 while ADMIN_TOKEN is unset, 403 on a wrong token
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if token != settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+
+@app.get("/admin/slow-queries", include_in_schema=False)
+async def slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Most recent sampled slow statements of this process (app.slow_queries),
+    newest first, with bound parameters and EXPLAIN plans when enabled.
+
+    Requires ADMIN_TOKEN (X-Admin-Token header): entries contain patient data.
+    """
+    _require_admin(x_admin_token)
+    return {"stats": slow_query_log.stats(), "entries": slow_query_log.recent(limit)}
+
+
+@app.delete("/admin/slow-queries", status_code=status.HTTP_204_NO_CONTENT, include_in_schema=False)
+async def clear_slow_queries(x_admin_token: Optional[str] = Header(None)):
+    """Empty this process's slow-query buffer (counters are kept)."""
+    _require_admin(x_admin_token)
+    slow_query_log.clear()
+
+
 @app.get("/")
 async def root():
     """
@@ -79,7 +200,6 @@ async def root():
 
 # TODO: Implement routes
 # - /appointments/* - Appointment CRUD operations
-# - /patients/* - Patient management
 # - /calendar/sync - Google Calendar sync
 # - /webhooks/agent - Cloudflare Agent callbacks
 
@@ -0,0 +1,263 @@
+"""
+Request and query metrics in Prometheus text format.
+
+MetricsMiddleware times every request and labels it with the route
+template (/api/appointments/{appointment_id}, not the raw path, so label
+cardinality stays bounded). SQLAlchemy cursor hooks time every statement
+on any engine and add it to the current request's totals, so each route
+gets histograms of queries per request and database time per request
+next to its latency:
+
+    http_request_duration_seconds{method, route}     request latency
+    http_requests_total{method, route, status}       responses by status
+    http_request_db_queries{method, route}           statements per request
+    http_request_db_seconds{method, route}           database time per request
+    db_query_duration_seconds{operation}             every statement, by verb
+
+GET /metrics renders the registry. Metrics are per process; with several
+workers, scrape each one (or aggregate in Prometheus).
+"""
+
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Seconds; Prometheus client defaults plus finer steps below 5ms for queries
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter per label combination."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, total in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_number(total)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Value read at scrape time from a callback returning {label values: value}."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], collect):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for values, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Request latency until the last body byte, by route template.",
+    ("method", "route")
+))
+REQUESTS = registry.register(Counter(
+    "http_requests_total",
+    "Responses by route template and status code.",
+    ("method", "route", "status")
+))
+REQUEST_QUERIES = registry.register(Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS
+))
+REQUEST_DB_SECONDS = registry.register(Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request.",
+    ("method", "route")
+))
+QUERY_DURATION = registry.register(Histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency, by leading keyword.",
+    ("operation",)
+))
+
+
+class RequestStats:
+    """Database totals of one request."""
+
+    __slots__ = ("method", "path", "queries", "db_seconds")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    """Stats of the request being served, None outside requests."""
+    return _request_stats.get()
+
+
+def _operation(statement: str) -> str:
+    """SELECT/INSERT/UPDATE/... (WITH ... statements count as WITH)."""
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "EMPTY"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_query_started"].pop()
+    elapsed = time.perf_counter() - started
+    QUERY_DURATION.observe(elapsed, _operation(statement))
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_query_timer(exception_context):
+    # after_cursor_execute doesn't run for failed statements
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("metrics_query_started"):
+        connection.info["metrics_query_started"].pop()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (streaming responses pass through untouched)
+    recording latency, status and database totals per route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"], scope["path"])
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            # FastAPI stores the matched route in the scope; 404s share one
+            # label instead of one per probed path
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method, path)
+            REQUESTS.inc(method, path, str(status_code))
+            REQUEST_QUERIES.observe(stats.queries, method, path)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, path)
@@ -2,11 +2,12 @@
 Database models for smartSalud.
 
 Exports all models for easy import:
-    from app.models import Appointment, Patient, ConversationHistory
+    from app.models import Appointment, Patient, ConversationHistory, ConversationMessage, ReminderJob
 """
 
 from app.models.appointment import Appointment
 from app.models.patient import Patient
-from app.models.conversation import ConversationHistory
+from app.models.conversation import ConversationHistory, ConversationMessage
+from app.models.reminder_job import ReminderJob
 
-__all__ = ["Appointment", "Patient", "ConversationHistory"]
+__all__ = ["Appointment", "Patient", "ConversationHistory", "ConversationMessage", "ReminderJob"]
@@ -4,7 +4,22 @@ Appointment model for medical appointments.
 Tracks appointment scheduling, status, and related information.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Enum,
+    FetchedValue,
+    Index,
+    Sequence,
+    event,
+    text
+)
+from sqlalchemy.dialects.postgresql import TSTZRANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -29,6 +44,32 @@ class AppointmentStatus(str, enum.Enum):
     NO_SHOW = "NO_SHOW"
 
 
+# Statuses that occupy the doctor's time and take part in overlap checks
+BOOKED_STATUSES = (AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED)
+
+# Name of the exclusion constraint that rejects double bookings
+DOCTOR_OVERLAP_CONSTRAINT = "ex_appointments_doctor_overlap"
+
+# Source of appointments.revision (change feed position)
+REVISION_SEQUENCE = Sequence("appointments_revision_seq", metadata=Base.metadata)
+
+# Takes the next revision after making sure the transaction has an id:
+# nextval() alone doesn't assign one, and the change feed's watermark
+# (app.services.changes.safe_revision) relies on every revision belonging
+# to a transaction that already had its id when the revision was taken
+NEXT_REVISION_FUNCTION = DDL("""
+    CREATE OR REPLACE FUNCTION appointments_next_revision() RETURNS bigint AS $$
+    BEGIN
+        PERFORM pg_current_xact_id();
+        RETURN nextval('appointments_revision_seq');
+    END
+    $$ LANGUAGE plpgsql VOLATILE
+""")
+
+# NOTIFY channel carrying the latest revision after each committed write
+CHANGES_CHANNEL = "appointment_changes"
+
+
 class Appointment(Base):
     """
     Appointment database model.
@@ -44,11 +85,58 @@ class Appointment(Base):
         notes: Additional notes about the appointment
         created_at: Timestamp when record was created
         updated_at: Timestamp when record was last updated
+        version: Incremented on every update; used for optimistic concurrency
+        booked_during: [appointment_date, end) range, maintained by a trigger
+            and used by the double-booking exclusion constraint
+        reminder_sent_at: When the patient was reminded (None = not yet)
+        reminder_attempts: How many times a reminder was claimed for sending
+        reminder_claimed_at: When a reminder worker last claimed the row;
+            the claim expires after a lease so crashed workers don't block it
+        reminder_message_sid: Provider id of the reminder (e.g. Twilio SID)
+        reminder_type: Kind of reminder sent (e.g. "48h_confirmation")
+        revision: Change feed position, taken from appointments_revision_seq
+            on insert and on every update that changes appointment data or
+            the version (reminder claim bookkeeping doesn't count)
         patient: Relationship to patient
         conversations: Relationship to conversation history
     """
 
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Serves the upcoming-window scan (equality on status, range on date)
+        # and its (appointment_date, id) keyset order in a single index range.
+        # revision is carried along so the window's ETag aggregate is an
+        # index-only scan.
+        Index(
+            "ix_appointments_status_appointment_date",
+            "status", "appointment_date", "id",
+            postgresql_include=["revision"]
+        ),
+        # Same window scan restricted to rows not reminded yet: reminder
+        # claims and /upcoming?exclude_reminded=true never visit sent rows
+        Index(
+            "ix_appointments_reminder_due",
+            "status", "appointment_date", "id",
+            postgresql_include=["revision"],
+            postgresql_where=text("reminder_sent_at IS NULL")
+        ),
+        # Change feed scan: revision > since, in revision order
+        Index("ix_appointments_revision", "revision", unique=True),
+        # Loads one doctor's bookings over a horizon (availability engine)
+        Index(
+            "ix_appointments_doctor_id_appointment_date",
+            "doctor_id", "appointment_date"
+        ),
+        # No two booked appointments of a doctor may overlap; checked by
+        # Postgres in the GiST index instead of by the application
+        ExcludeConstraint(
+            ("doctor_id", "="),
+            ("booked_during", "&&"),
+            name=DOCTOR_OVERLAP_CONSTRAINT,
+            using="gist",
+            where=text("status IN ('PENDING', 'CONFIRMED')")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -56,10 +144,32 @@ class Appointment(Base):
     doctor_name = Column(String(255), nullable=False)
     appointment_date = Column(DateTime(timezone=True), nullable=False, index=True)
     duration_minutes = Column(Integer, default=30)
-    status = Column(Enum(AppointmentStatus), default=AppointmentStatus.PENDING, index=True)
+    status = Column(Enum(AppointmentStatus), default=AppointmentStatus.PENDING)
     notes = Column(String(1000), default="")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, server_default="1")
+    booked_during = Column(
+        TSTZRANGE,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue()
+    )
+    reminder_sent_at = Column(DateTime(timezone=True), nullable=True)
+    reminder_attempts = Column(Integer, nullable=False, server_default="0")
+    reminder_claimed_at = Column(DateTime(timezone=True), nullable=True)
+    reminder_message_sid = Column(String(64), nullable=True)
+    reminder_type = Column(String(50), nullable=True)
+    revision = Column(
+        BigInteger,
+        nullable=False,
+        server_default=text("appointments_next_revision()"),
+        server_onupdate=FetchedValue()
+    )
+
+    # ORM flushes check and bump version; status transitions in the router
+    # do the same in their UPDATE statements. Server-generated columns come
+    # back through RETURNING, so nothing is lazy-loaded after a flush.
+    __mapper_args__ = {"version_id_col": version, "eager_defaults": True}
 
     # Relationships
     patient = relationship("Patient", back_populates="appointments")
@@ -70,3 +180,120 @@ class Appointment(Base):
             f"<Appointment(id={self.id}, patient_id={self.patient_id}, "
             f"date='{self.appointment_date}', status='{self.status}')>"
         )
+
+
+# booked_during is derived in the database so every write path (ORM, bulk
+# UPDATE, COPY) keeps it in sync. Alembic migration e3a9c1f7d24b creates the
+# same objects; these listeners cover metadata.create_all() (benchmarks).
+event.listen(
+    Appointment.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+event.listen(
+    Appointment.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION appointments_set_booked_during() RETURNS trigger AS $$
+        BEGIN
+            NEW.booked_during := tstzrange(
+                NEW.appointment_date,
+                NEW.appointment_date + make_interval(mins => COALESCE(NEW.duration_minutes, 30))
+            );
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """).execute_if(dialect="postgresql")
+)
+event.listen(
+    Appointment.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER appointments_booked_during
+        BEFORE INSERT OR UPDATE OF appointment_date, duration_minutes ON appointments
+        FOR EACH ROW EXECUTE FUNCTION appointments_set_booked_during()
+    """).execute_if(dialect="postgresql")
+)
+
+# revision is bumped by a trigger, so every write path (router statements,
+# COPY imports, reminder bookkeeping) feeds the change feed; statement-level
+# triggers then NOTIFY the highest new revision once per statement. Alembic
+# migrations 0b8e6d1c4f27, 6a4f2d8b1c35 and 2e7b9c4d6a18 create the same
+# objects.
+event.listen(
+    Appointment.__table__,
+    "before_create",
+    NEXT_REVISION_FUNCTION.execute_if(dialect="postgresql")
+)
+event.listen(
+    Appointment.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION appointments_bump_revision() RETURNS trigger AS $$
+        BEGIN
+            NEW.revision := appointments_next_revision();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """).execute_if(dialect="postgresql")
+)
+event.listen(
+    Appointment.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER appointments_bump_revision
+        BEFORE UPDATE ON appointments
+        FOR EACH ROW
+        WHEN ((OLD.patient_id, OLD.doctor_id, OLD.doctor_name, OLD.appointment_date,
+               OLD.duration_minutes, OLD.status, OLD.notes, OLD.reminder_sent_at,
+               OLD.version)
+              IS DISTINCT FROM
+              (NEW.patient_id, NEW.doctor_id, NEW.doctor_name, NEW.appointment_date,
+               NEW.duration_minutes, NEW.status, NEW.notes, NEW.reminder_sent_at,
+               NEW.version))
+        EXECUTE FUNCTION appointments_bump_revision()
+    """).execute_if(dialect="postgresql")
+)
+event.listen(
+    Appointment.__table__,
+    "after_create",
+    DDL(f"""
+        CREATE OR REPLACE FUNCTION appointments_notify_changes() RETURNS trigger AS $$
+        DECLARE
+            latest bigint;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT max(revision) INTO latest FROM new_rows;
+            ELSE
+                SELECT max(n.revision) INTO latest
+                FROM new_rows n JOIN old_rows o USING (id)
+                WHERE n.revision <> o.revision;
+            END IF;
+            IF latest IS NOT NULL THEN
+                PERFORM pg_notify('{CHANGES_CHANNEL}', latest::text);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """).execute_if(dialect="postgresql")
+)
+event.listen(
+    Appointment.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER appointments_notify_insert
+        AFTER INSERT ON appointments
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION appointments_notify_changes()
+    """).execute_if(dialect="postgresql")
+)
+event.listen(
+    Appointment.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER appointments_notify_update
+        AFTER UPDATE ON appointments
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION appointments_notify_changes()
+    """).execute_if(dialect="postgresql")
+)
@@ -4,7 +4,21 @@ ConversationHistory model for tracking agent-patient interactions.
 Stores conversation state and message history for agent continuity.
 """
 
-from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Text
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    JSON,
+    DateTime,
+    ForeignKey,
+    Index,
+    Text,
+    event,
+    text
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -21,12 +35,13 @@ class ConversationHistory(Base):
         id: Unique identifier
         appointment_id: Foreign key to appointment
         patient_id: Foreign key to patient (for conversations without appointments)
-        messages: JSON array of message objects
+        messages: Legacy JSON array of message objects, superseded by the
+            append-only message_log (conversation_messages table)
             Example: [
                 {"role": "user", "content": "I need to reschedule", "timestamp": "2024-..."},
                 {"role": "assistant", "content": "Sure, which date works?", "timestamp": "2024-..."}
             ]
-        state: JSON object representing current agent state
+        state: JSONB object representing current agent state
             Example: {
                 "intent": "reschedule",
                 "proposed_dates": ["2024-10-26T10:00:00", "2024-10-27T14:00:00"],
@@ -37,15 +52,28 @@ class ConversationHistory(Base):
         updated_at: Timestamp when conversation was last updated
         appointment: Relationship to appointment
         patient: Relationship to patient
+        message_log: Relationship to conversation messages (never loaded
+            implicitly; use app.services.conversations to read the tail)
     """
 
     __tablename__ = "conversation_history"
+    __table_args__ = (
+        # Containment filters, e.g. state @> '{"awaiting_selection": true}'
+        Index(
+            "ix_conversation_history_state",
+            "state",
+            postgresql_using="gin",
+            postgresql_ops={"state": "jsonb_path_ops"}
+        ),
+        # Conversations of an appointment (dashboard escalation view)
+        Index("ix_conversation_history_appointment_id", "appointment_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     appointment_id = Column(Integer, ForeignKey("appointments.id"), nullable=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
     messages = Column(JSON, default=[])
-    state = Column(JSON, default={})
+    state = Column(JSONB, default={})
     context = Column(Text, default="")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -53,9 +81,103 @@ class ConversationHistory(Base):
     # Relationships
     appointment = relationship("Appointment", back_populates="conversations")
     patient = relationship("Patient", back_populates="conversations")
+    message_log = relationship(
+        "ConversationMessage",
+        back_populates="conversation",
+        lazy="raise",
+        passive_deletes=True
+    )
 
     def __repr__(self):
         return (
             f"<ConversationHistory(id={self.id}, appointment_id={self.appointment_id}, "
             f"patient_id={self.patient_id})>"
         )
+
+
+# RFC 7396 JSON merge patch, applied in the UPDATE so concurrent patches
+# to different keys of `state` don't overwrite each other. Alembic
+# migration c2e8f4a6d713 creates the same function; this listener covers
+# metadata.create_all() (benchmarks).
+event.listen(
+    ConversationHistory.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION jsonb_merge_patch(target jsonb, patch jsonb) RETURNS jsonb AS $$
+        BEGIN
+            IF patch IS NULL OR jsonb_typeof(patch) <> 'object' THEN
+                RETURN patch;
+            END IF;
+            IF target IS NULL OR jsonb_typeof(target) <> 'object' THEN
+                target := '{}'::jsonb;
+            END IF;
+            RETURN (
+                SELECT COALESCE(
+                    jsonb_object_agg(
+                        key,
+                        CASE WHEN p.value IS NULL THEN t.value
+                             ELSE jsonb_merge_patch(t.value, p.value) END
+                    ),
+                    '{}'::jsonb
+                )
+                FROM jsonb_each(target) t
+                FULL JOIN jsonb_each(patch) p USING (key)
+                WHERE p.value IS NULL OR jsonb_typeof(p.value) <> 'null'
+            );
+        END
+        $$ LANGUAGE plpgsql IMMUTABLE
+    """).execute_if(dialect="postgresql")
+)
+
+
+class ConversationMessage(Base):
+    """
+    One message of a conversation, stored append-only.
+
+    Appending is a single INSERT and reading the latest messages is an
+    index range scan, so the cost per message no longer grows with the
+    length of the conversation.
+
+    Attributes:
+        id: Unique identifier (also breaks created_at ties)
+        conversation_id: Foreign key to conversation history
+        role: Who sent the message ("user", "assistant", "system", ...)
+        content: Message text
+        payload: Optional extra data, e.g. {"intent": "confirm", "message_sid": "SM..."}
+        created_at: When the message was appended
+        conversation: Relationship to conversation history
+    """
+
+    __tablename__ = "conversation_messages"
+    __table_args__ = (
+        # Serves "last K messages of a conversation" as a backward index scan
+        Index(
+            "ix_conversation_messages_conversation_id_created_at",
+            "conversation_id", "created_at", "id"
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    conversation_id = Column(
+        Integer,
+        ForeignKey("conversation_history.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    role = Column(String(20), nullable=False)
+    content = Column(Text, nullable=False, default="")
+    payload = Column(JSONB(none_as_null=True), nullable=True)
+    # clock_timestamp() rather than now(): messages appended in one
+    # transaction still get increasing timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("clock_timestamp()")
+    )
+
+    conversation = relationship("ConversationHistory", back_populates="message_log")
+
+    def __repr__(self):
+        return (
+            f"<ConversationMessage(id={self.id}, conversation_id={self.conversation_id}, "
+            f"role='{self.role}')>"
+        )
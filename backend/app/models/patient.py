@@ -4,7 +4,8 @@ Patient model for storing patient information.
 Represents patients who interact with the appointment system via WhatsApp.
 """
 
-from sqlalchemy import Column, Integer, String, JSON, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -18,7 +19,7 @@ class Patient(Base):
         id: Unique identifier
         name: Full name of the patient
         phone: WhatsApp phone number (E.164 format, e.g., +1234567890)
-        preferences: JSON field for storing patient preferences
+        preferences: JSONB field for storing patient preferences
             Example: {"language": "es", "preferred_time": "morning"}
         created_at: Timestamp when record was created
         updated_at: Timestamp when record was last updated
@@ -26,11 +27,25 @@ class Patient(Base):
     """
 
     __tablename__ = "patients"
+    __table_args__ = (
+        # Containment filters, e.g. preferences @> '{"language": "es"}'
+        Index(
+            "ix_patients_preferences",
+            "preferences",
+            postgresql_using="gin",
+            postgresql_ops={"preferences": "jsonb_path_ops"}
+        ),
+        # Equality on the key the availability engine and reminders use most
+        Index(
+            "ix_patients_preferred_time",
+            text("(preferences ->> 'preferred_time')")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     phone = Column(String(20), unique=True, nullable=False, index=True)
-    preferences = Column(JSON, default={})
+    preferences = Column(JSONB, default={})
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -0,0 +1,118 @@
+"""
+Reminder job model for the reminder dispatch queue.
+
+Each row is one reminder to send for one appointment. Jobs are enqueued
+from the due-reminder scan and worked off by app.worker.
+"""
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    text
+)
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from app.database import Base
+
+
+class ReminderJobStatus(str, enum.Enum):
+    """
+    Possible reminder job statuses.
+
+    PENDING: Waiting to run (new, or scheduled for a retry at run_at)
+    RUNNING: Claimed by a worker; handed out again if the lease expires
+    SENT: Reminder delivered to the messaging provider
+    FAILED: Gave up after max_attempts or a permanent provider error
+    SKIPPED: Not sent; the appointment was cancelled or reminded meanwhile
+    """
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+    SKIPPED = "SKIPPED"
+
+
+class ReminderJob(Base):
+    """
+    Reminder job database model.
+
+    Attributes:
+        id: Unique identifier
+        appointment_id: Foreign key to the appointment to remind
+        reminder_type: Kind of reminder (e.g. "48h_confirmation"); one job
+            per appointment and type, so enqueueing twice is a no-op
+        status: PENDING, RUNNING, SENT, FAILED or SKIPPED
+        run_at: Earliest time the job may run (pushed back on retries)
+        attempts: Number of times the job was claimed
+        max_attempts: Attempts allowed before the job is FAILED
+        locked_at: When the current worker claimed the job
+        locked_by: Id of the worker holding the job
+        last_error: Error of the last failed attempt
+        message_sid: Provider message id once sent
+        created_at: Timestamp when the job was enqueued
+        finished_at: Timestamp when the job was SENT, FAILED or SKIPPED
+        appointment: Relationship to appointment
+    """
+
+    __tablename__ = "reminder_jobs"
+    __table_args__ = (
+        UniqueConstraint(
+            "appointment_id", "reminder_type",
+            name="uq_reminder_jobs_appointment_id_reminder_type"
+        ),
+        # Claim scan: only runnable jobs are indexed, so finished jobs
+        # never slow it down no matter how many accumulate
+        Index(
+            "ix_reminder_jobs_runnable",
+            "run_at", "id",
+            postgresql_where=text("status = 'PENDING'")
+        ),
+        # Lease expiry scan for jobs left RUNNING by a crashed worker
+        Index(
+            "ix_reminder_jobs_running_locked_at",
+            "locked_at",
+            postgresql_where=text("status = 'RUNNING'")
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    appointment_id = Column(
+        Integer,
+        ForeignKey("appointments.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    reminder_type = Column(String(50), nullable=False)
+    status = Column(
+        Enum(ReminderJobStatus),
+        nullable=False,
+        default=ReminderJobStatus.PENDING,
+        server_default=ReminderJobStatus.PENDING.value
+    )
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="3")
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+    message_sid = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    appointment = relationship("Appointment", lazy="raise")
+
+    def __repr__(self):
+        return (
+            f"<ReminderJob(id={self.id}, appointment_id={self.appointment_id}, "
+            f"type='{self.reminder_type}', status='{self.status}')>"
+        )
@@ -0,0 +1,79 @@
+"""
+Query counting for catching N+1 regressions.
+
+Counts the SQL statements sent to the database inside a block, for any
+engine (sync or async). Tests and benchmarks use it to pin the number of
+round-trips an endpoint makes:
+
+    with assert_max_queries(2):
+        response = client.get("/api/appointments/upcoming")
+
+Counting is scoped with a ContextVar, so concurrent requests on the same
+event loop don't inflate each other's counts.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """Statements executed while the counter was active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_active_counter: ContextVar[Optional[QueryCounter]] = ContextVar(
+    "active_query_counter", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _active_counter.get()
+    if counter is not None:
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count statements executed inside the block.
+
+    Yields:
+        QueryCounter whose statements list fills in as queries run
+    """
+    counter = QueryCounter()
+    token = _active_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _active_counter.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryCounter]:
+    """
+    Fail if the block executes more than `limit` statements.
+
+    Raises:
+        AssertionError: listing every statement when the limit is exceeded
+    """
+    with count_queries() as counter:
+        yield counter
+
+    if counter.count > limit:
+        executed = "\n".join(
+            f"  {i}. {statement}" for i, statement in enumerate(counter.statements, 1)
+        )
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {counter.count}:\n{executed}"
+        )
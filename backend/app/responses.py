@@ -0,0 +1,120 @@
+"""
+Fast JSON serialization for list endpoints.
+
+A `response_model` endpoint validates the returned ORM objects into
+response models, dumps those to Python dicts and lists, then json.dumps
+the result. For thousands of appointments with their patients that is
+most of the request time.
+
+With FAST_JSON_RESPONSES on, list endpoints skip validation for rows read
+from our own database: dump_rows() copies each response model's fields
+from the loaded ORM attributes into plain dicts, and FastJSONResponse
+encodes them with orjson. The bytes are the same as the default path's
+(benchmarks/serialization.py checks it and compares the timings).
+response_model stays declared either way, so the OpenAPI schema doesn't
+change.
+
+serialize() is the validated equivalent, used where a body is built
+ahead of the response (the /upcoming response cache) in default mode.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, get_args
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.database import settings
+
+
+# "Z" for UTC like pydantic; other offsets and naive datetimes already match
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse whose datetimes render exactly like pydantic's."""
+
+    def render(self, content: Any) -> bytes:
+        return render(content)
+
+
+def render(content: Any) -> bytes:
+    """Encode plain data (e.g. from dump_rows) as JSON."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+@lru_cache(maxsize=None)
+def _field_plan(model: Type[BaseModel]) -> Tuple[Tuple[str, Optional[Type[BaseModel]]], ...]:
+    """(field name, nested response model or None) for each field, in order."""
+    plan = []
+    for name, field in model.model_fields.items():
+        nested = None
+        for candidate in (field.annotation, *get_args(field.annotation)):
+            if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+                nested = candidate
+        plan.append((name, nested))
+    return tuple(plan)
+
+
+def dump_row(model: Type[BaseModel], row: Any) -> Dict[str, Any]:
+    """
+    Fields of `model` read from a loaded ORM row, without validation.
+
+    Loaded attributes are read from the instance __dict__, skipping the
+    ORM descriptors; anything else goes through getattr like pydantic's
+    from_attributes would. Nested response models (e.g. the patient of an
+    appointment) are dumped the same way; lists of models are not
+    supported.
+
+    Only for rows that already satisfy the model, i.e. rows loaded from the
+    database the model describes.
+    """
+    values = row.__dict__
+    data = {}
+    for name, nested in _field_plan(model):
+        value = values[name] if name in values else getattr(row, name)
+        if nested is not None and value is not None:
+            value = dump_row(nested, value)
+        data[name] = value
+    return data
+
+
+def dump_rows(model: Type[BaseModel], rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """dump_row() for every row."""
+    return [dump_row(model, row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def type_adapter(type_: Any) -> TypeAdapter:
+    """Shared TypeAdapter per response type (building one compiles a schema)."""
+    return TypeAdapter(type_)
+
+
+def serialize(type_: Any, content: Any) -> bytes:
+    """
+    Validated JSON body for `content` as `type_`, in one pydantic-core pass.
+
+    Args:
+        type_: Response type, e.g. List[AppointmentResponse]
+        content: ORM objects, or dicts/lists holding them
+
+    Returns:
+        UTF-8 JSON, equal to what FastAPI renders for response_model=type_
+    """
+    adapter = type_adapter(type_)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def serialize_rows(model: Type[BaseModel], rows: List[Any]) -> bytes:
+    """JSON array of `rows` as `model`, through the fast path when enabled."""
+    if settings.fast_json_responses:
+        return render(dump_rows(model, rows))
+    return serialize(List[model], rows)
+
+
+def serialize_row(model: Type[BaseModel], row: Any) -> str:
+    """One row as `model` in JSON text (NDJSON lines, SSE data)."""
+    if settings.fast_json_responses:
+        return render(dump_row(model, row)).decode()
+    return model.model_validate(row).model_dump_json()
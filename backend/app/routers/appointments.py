@@ -4,19 +4,84 @@ Appointment API endpoints.
 Provides CRUD operations and specialized endpoints for appointment management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    Select,
+    String,
+    and_,
+    case,
+    cast,
+    column,
+    func,
+    or_,
+    select,
+    tuple_,
+    update,
+    values
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload, noload, selectinload
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import base64
+import binascii
+import enum
+import hashlib
+import io
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db, settings
+from app.responses import FastJSONResponse, dump_rows, serialize_row, serialize_rows
 from app.models import Appointment, Patient
 from app.models.appointment import AppointmentStatus
+from app.services.availability import calendar_cache, find_alternative_slots
+from app.services.changes import change_notifier, safe_revision
+from app.services.conversations import last_appointment_messages
+from app.services.reminder_jobs import discard_reminder_jobs
+from app.services.reminders import (
+    claim_due_reminders,
+    mark_reminder_sent,
+    reminder_reset_values
+)
+from app.services.response_cache import CachedResponse, upcoming_cache
+from app.services.importer import (
+    DEFAULT_CHUNK_SIZE,
+    ImportFormat,
+    detect_format,
+    import_appointments,
+    read_rows
+)
+from app.services.transitions import TRANSITIONS, AppointmentAction
 from app.schemas import (
     AppointmentResponse,
+    AppointmentBatchItem,
+    AppointmentBatchItemResult,
+    AppointmentBatchRequest,
+    AppointmentBatchResponse,
+    AppointmentCancelRequest,
+    AppointmentChanges,
+    BatchItemOutcome,
+    AppointmentConversationMessage,
     AppointmentCreate,
+    AppointmentImportResponse,
     AppointmentUpdate,
+    AppointmentPage,
     AppointmentConfirmRequest,
+    AppointmentReminderRequest,
     AppointmentRescheduleRequest,
     AlternativeSlotsResponse,
     AlternativeSlot
@@ -27,69 +92,716 @@ router = APIRouter(
     tags=["appointments"]
 )
 
+# Longest look-ahead window; every distinct `hours` is its own cache key
+# and a wide window reads most of the index
+MAX_WINDOW_HOURS = 24 * 30
+
+# Rows fetched per round-trip when streaming the upcoming window
+STREAM_BATCH_SIZE = 500
+
+# Change feed stream: comment frame interval that keeps proxies from
+# closing an idle connection, and how soon to look again while writes
+# are still committing
+CHANGES_KEEPALIVE_SECONDS = 15.0
+CHANGES_PENDING_RECHECK_SECONDS = 0.25
+
+
+class PatientLoading(str, enum.Enum):
+    """
+    How an endpoint loads Appointment.patient for AppointmentResponse.
+
+    Lazy loading is never an option: it is unavailable on an AsyncSession
+    and would cost one SELECT per appointment during serialization.
+
+    SELECTIN: one extra "WHERE patients.id IN (...)" query per batch (lists)
+    JOINED: LEFT OUTER JOIN in the same statement (single rows)
+    NONE: not loaded; the response carries patient = null
+    """
+
+    SELECTIN = "selectin"
+    JOINED = "joined"
+    NONE = "none"
+
+
+def _patient_loader(loading: PatientLoading):
+    """Return the loader option implementing a PatientLoading strategy."""
+    if loading == PatientLoading.SELECTIN:
+        return selectinload(Appointment.patient)
+    if loading == PatientLoading.JOINED:
+        return joinedload(Appointment.patient)
+    return noload(Appointment.patient)
+
+
+def _list_patient_loading(include_patient: bool) -> PatientLoading:
+    """Patient strategy for list endpoints: batched SELECTIN, or skip it."""
+    return PatientLoading.SELECTIN if include_patient else PatientLoading.NONE
+
+
+async def _get_appointment_or_404(
+    db: AsyncSession,
+    appointment_id: int,
+    patient_loading: PatientLoading = PatientLoading.JOINED
+) -> Appointment:
+    """
+    Load an appointment or raise 404.
+
+    Single-row lookups join the patient by default so the whole response
+    is built from one round-trip.
+    """
+    result = await db.execute(
+        select(Appointment)
+        .options(_patient_loader(patient_loading))
+        .where(Appointment.id == appointment_id)
+    )
+    appointment = result.scalar_one_or_none()
+
+    if not appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Appointment {appointment_id} not found"
+        )
+
+    return appointment
+
+
+def _is_past(value: datetime) -> bool:
+    """Whether an aware datetime (see schemas.RequestDatetime) has passed."""
+    return value < datetime.now(timezone.utc)
+
+
+async def _transition_appointment(
+    db: AsyncSession,
+    appointment_id: int,
+    action: AppointmentAction,
+    expected_version: Optional[int] = None,
+    new_date: Optional[datetime] = None
+) -> Appointment:
+    """
+    Apply a status transition with one conditional UPDATE ... RETURNING.
+
+    The WHERE clause carries the statuses the action may start from (and
+    the expected version, when given), so concurrent replies cannot
+    overwrite each other: an UPDATE that waited on the row lock re-checks
+    the condition against the committed row and matches nothing. The
+    UPDATE runs in a CTE so the patient is joined in the same round-trip.
+
+    Raises:
+        HTTPException: 404 if appointment not found
+        HTTPException: 409 if the status doesn't allow the action, the
+            version no longer matches or the doctor is already booked
+    """
+    transition = TRANSITIONS[action]
+
+    conditions = [
+        Appointment.id == appointment_id,
+        Appointment.status.in_(transition.allowed_from)
+    ]
+    if expected_version is not None:
+        conditions.append(Appointment.version == expected_version)
+
+    changes = {
+        "status": transition.target,
+        "version": Appointment.version + 1,
+        "updated_at": func.now()
+    }
+    if new_date is not None:
+        changes["appointment_date"] = new_date
+    if action == AppointmentAction.RESCHEDULE:
+        # The reminder sent for the old date doesn't cover the new one
+        changes.update(reminder_reset_values())
+
+    updated = (
+        update(Appointment)
+        .where(*conditions)
+        .values(**changes)
+        .returning(*Appointment.__table__.c)
+        .cte("updated_appointment")
+    )
+    updated_appointment = aliased(Appointment, updated)
+
+    try:
+        result = await db.execute(
+            select(updated_appointment).options(joinedload(updated_appointment.patient))
+        )
+    except IntegrityError as error:
+        if not _is_double_booking(error):
+            raise
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Appointment {appointment_id} would overlap another "
+                f"appointment of the same doctor"
+            )
+        )
+    appointment = result.scalar_one_or_none()
+
+    if appointment is None:
+        await _raise_transition_error(db, appointment_id, action, expected_version)
+
+    if action == AppointmentAction.RESCHEDULE:
+        await discard_reminder_jobs(db, [appointment_id])
+    await db.commit()
+    _invalidate_calendar(action, appointment.doctor_id, appointment.appointment_date)
+    await upcoming_cache.invalidate()
+
+    return appointment
+
+
+def _is_double_booking(error: IntegrityError) -> bool:
+    """Whether a write was rejected by the doctor overlap exclusion constraint."""
+    return getattr(error.orig, "sqlstate", None) == "23P01"  # exclusion_violation
+
+
+def _invalidate_calendar(action: AppointmentAction, doctor_id: str, appointment_date: datetime):
+    """Drop cached availability a committed transition may have changed."""
+    if action == AppointmentAction.CANCEL:
+        calendar_cache.invalidate_at(doctor_id, appointment_date)
+    elif action == AppointmentAction.RESCHEDULE:
+        # The previous date is not returned by the UPDATE, so drop every day
+        calendar_cache.invalidate(doctor_id)
+
+
+async def _raise_transition_error(
+    db: AsyncSession,
+    appointment_id: int,
+    action: AppointmentAction,
+    expected_version: Optional[int]
+):
+    """Explain why a conditional transition matched no row (404 or 409)."""
+    result = await db.execute(
+        select(Appointment.status, Appointment.version)
+        .where(Appointment.id == appointment_id)
+    )
+    current = result.one_or_none()
+
+    if current is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Appointment {appointment_id} not found"
+        )
+
+    if expected_version is not None and current.version != expected_version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Appointment {appointment_id} was modified "
+                f"(version {current.version}, expected {expected_version})"
+            )
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Cannot {action.value} appointment in status {current.status.value}"
+    )
+
+
+def _upcoming_window_filters(
+    hours: int,
+    status_filter: AppointmentStatus,
+    exclude_reminded: bool = False
+) -> list:
+    """
+    WHERE clauses selecting the upcoming window.
+
+    With exclude_reminded, the "reminder_sent_at IS NULL" predicate matches
+    the partial index ix_appointments_reminder_due, so rows already reminded
+    are never read.
+    """
+    # Aware: asyncpg would read a naive value as host local time
+    now = datetime.now(timezone.utc)
+    filters = [
+        Appointment.appointment_date >= now,
+        Appointment.appointment_date <= now + timedelta(hours=hours),
+        Appointment.status == status_filter
+    ]
+    if exclude_reminded:
+        filters.append(Appointment.reminder_sent_at.is_(None))
+    return filters
+
+
+def _upcoming_window_query(
+    hours: int,
+    status_filter: AppointmentStatus,
+    patient_loading: PatientLoading = PatientLoading.SELECTIN,
+    exclude_reminded: bool = False
+) -> Select:
+    """
+    Build the query for appointments in the upcoming window.
+
+    Rows are ordered by (appointment_date, id) so the order is total and
+    can be used as a keyset cursor. Patients are loaded with SELECTIN by
+    default, so a window costs two queries no matter how many rows it has.
+    """
+    return (
+        select(Appointment)
+        .options(_patient_loader(patient_loading))
+        .where(*_upcoming_window_filters(hours, status_filter, exclude_reminded))
+        .order_by(Appointment.appointment_date, Appointment.id)
+    )
+
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": settings.appointments_cache_control}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header with etag (RFC 9110, 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+
+
+def _appointment_etag(revision: int) -> str:
+    """Revisions are unique across the table, so one names a row version."""
+    return f'W/"r{revision}"'
+
+
+def _window_etag(
+    count: int,
+    latest: Optional[int],
+    total: Optional[int],
+    *params
+) -> str:
+    """
+    ETag of an upcoming window from its row count and the max and sum of
+    its revisions.
+
+    Any write to a row in the window raises its revision (max and sum
+    change); rows entering or leaving the window as time passes or status
+    changes change the count and sum. The query parameters are mixed in so
+    representations of different windows never share a tag.
+
+    The tag is weak: reminder claim bookkeeping (reminder_attempts) doesn't
+    take a revision, so it may be stale in a 304'd representation.
+    """
+    raw = "|".join(str(part) for part in (count, latest or 0, total or 0, *params))
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()}"'
+
+
+def _encode_cursor(appointment: Appointment) -> str:
+    """Encode the (appointment_date, id) keyset position as an opaque cursor."""
+    raw = f"{appointment.appointment_date.isoformat()}|{appointment.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by _encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_part, id_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 
 @router.get("/upcoming", response_model=List[AppointmentResponse])
 async def get_upcoming_appointments(
-    hours: int = Query(48, description="Look ahead window in hours"),
+    hours: int = Query(48, ge=1, le=MAX_WINDOW_HOURS, description="Look ahead window in hours"),
     status_filter: AppointmentStatus = Query(
         AppointmentStatus.PENDING,
         description="Filter by appointment status"
     ),
-    db: Session = Depends(get_db)
+    include_patient: bool = Query(True, description="Embed the patient in each appointment"),
+    exclude_reminded: bool = Query(False, description="Skip appointments already reminded"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get upcoming appointments within specified time window.
 
     Used by Cloudflare Agent to identify appointments needing confirmation.
+    The serialized window is kept in upcoming_cache (per query parameters,
+    dropped on every appointment write through the API), so repeated polls
+    don't touch the database. Responses carry a weak ETag (see
+    _window_etag); a poll sending it back in If-None-Match gets a 304 when
+    nothing changed, from the cache or from one aggregate over the window
+    index.
 
     Args:
         hours: Number of hours to look ahead (default: 48)
         status_filter: Filter by status (default: PENDING)
+        include_patient: Load and embed the patient (default: True)
+        exclude_reminded: Skip appointments already reminded (default: False)
+        if_none_match: ETag of a previously returned window
         db: Database session
 
     Returns:
-        List of appointments within the time window
+        List of appointments within the time window, or 304 Not Modified
     """
-    now = datetime.utcnow()
-    future_cutoff = now + timedelta(hours=hours)
+    params = (hours, status_filter.value, include_patient, exclude_reminded)
 
-    appointments = db.query(Appointment).filter(
-        Appointment.appointment_date >= now,
-        Appointment.appointment_date <= future_cutoff,
-        Appointment.status == status_filter
-    ).order_by(Appointment.appointment_date).all()
+    cached = await upcoming_cache.get(params)
+    if cached is None and if_none_match:
+        count, latest, total = (await db.execute(
+            select(
+                func.count(),
+                func.max(Appointment.revision),
+                func.sum(Appointment.revision)
+            ).where(*_upcoming_window_filters(hours, status_filter, exclude_reminded))
+        )).one()
+        etag = _window_etag(count, latest, total, *params)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    async def load() -> CachedResponse:
+        query = _upcoming_window_query(
+            hours, status_filter, _list_patient_loading(include_patient), exclude_reminded
+        )
+        appointments = (await db.execute(query)).scalars().all()
+        revisions = [appointment.revision for appointment in appointments]
+        return CachedResponse(
+            serialize_rows(AppointmentResponse, appointments),
+            _window_etag(len(revisions), max(revisions, default=None), sum(revisions), *params)
+        )
+
+    if cached is None:
+        cached = await upcoming_cache.load(params, load)
+    if _etag_matches(if_none_match, cached.etag):
+        return _not_modified(cached.etag)
+    return Response(
+        cached.body,
+        media_type="application/json",
+        headers=_cache_headers(cached.etag)
+    )
+
+
+@router.get("/upcoming/page", response_model=AppointmentPage)
+async def get_upcoming_appointments_page(
+    hours: int = Query(48, ge=1, le=MAX_WINDOW_HOURS, description="Look ahead window in hours"),
+    status_filter: AppointmentStatus = Query(
+        AppointmentStatus.PENDING,
+        description="Filter by appointment status"
+    ),
+    include_patient: bool = Query(True, description="Embed the patient in each appointment"),
+    exclude_reminded: bool = Query(False, description="Skip appointments already reminded"),
+    limit: int = Query(500, ge=1, le=1000, description="Maximum appointments per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get one page of upcoming appointments using keyset pagination.
+
+    Pages are keyed on (appointment_date, id), so each page is an index
+    range scan that starts where the previous one stopped instead of an
+    OFFSET that re-reads every earlier row.
+
+    Args:
+        hours: Number of hours to look ahead (default: 48)
+        status_filter: Filter by status (default: PENDING)
+        include_patient: Load and embed the patient (default: True)
+        exclude_reminded: Skip appointments already reminded (default: False)
+        limit: Page size (default: 500)
+        cursor: Opaque cursor returned as next_cursor by the previous page
+        db: Database session
+
+    Returns:
+        Page of appointments and the cursor for the next page (null on the last page)
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    query = _upcoming_window_query(
+        hours, status_filter, _list_patient_loading(include_patient), exclude_reminded
+    )
+
+    if cursor:
+        after_date, after_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(Appointment.appointment_date, Appointment.id) > (after_date, after_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    appointments = result.scalars().all()
+
+    next_cursor = None
+    if len(appointments) > limit:
+        appointments = appointments[:limit]
+        next_cursor = _encode_cursor(appointments[-1])
+
+    if settings.fast_json_responses:
+        return FastJSONResponse({
+            "items": dump_rows(AppointmentResponse, appointments),
+            "next_cursor": next_cursor
+        })
+    return {"items": appointments, "next_cursor": next_cursor}
+
+
+@router.get("/upcoming/stream")
+async def stream_upcoming_appointments(
+    hours: int = Query(48, ge=1, le=MAX_WINDOW_HOURS, description="Look ahead window in hours"),
+    status_filter: AppointmentStatus = Query(
+        AppointmentStatus.PENDING,
+        description="Filter by appointment status"
+    ),
+    include_patient: bool = Query(True, description="Embed the patient in each appointment"),
+    exclude_reminded: bool = Query(False, description="Skip appointments already reminded")
+):
+    """
+    Stream upcoming appointments as NDJSON (one AppointmentResponse per line).
+
+    Rows are fetched from a server-side cursor in batches of
+    STREAM_BATCH_SIZE and written out as they arrive, so memory stays flat
+    and the first bytes go out before the whole window has been read.
+
+    Args:
+        hours: Number of hours to look ahead (default: 48)
+        status_filter: Filter by status (default: PENDING)
+        include_patient: Load and embed the patient (default: True)
+        exclude_reminded: Skip appointments already reminded (default: False)
+
+    Returns:
+        application/x-ndjson streaming response
+    """
+    query = _upcoming_window_query(
+        hours, status_filter, _list_patient_loading(include_patient), exclude_reminded
+    ).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    async def generate() -> AsyncIterator[str]:
+        # The request-scoped session from get_db is closed before the body
+        # is sent, so the stream owns its session.
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for batch in result.scalars().partitions():
+                yield "".join(
+                    serialize_row(AppointmentResponse, appointment) + "\n"
+                    for appointment in batch
+                )
+                # Drop the batch from the identity map so memory stays flat
+                db.expunge_all()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
-    return appointments
+
+class _ChangesPage(NamedTuple):
+    """Fields of AppointmentChanges, with changes still ORM rows."""
+
+    changes: List[Appointment]
+    next_since: int
+    has_more: bool
+    pending: bool
+
+
+async def _read_changes(
+    db: AsyncSession,
+    since: int,
+    limit: int,
+    patient_loading: PatientLoading
+) -> _ChangesPage:
+    """
+    Read one page of the change feed after revision `since`.
+
+    Only revisions up to safe_revision() are read, so a change that is
+    still committing can't be skipped by a cursor that moved past it.
+    """
+    safe, latest = await safe_revision(db)
+    result = await db.execute(
+        select(Appointment)
+        .options(_patient_loader(patient_loading))
+        .where(Appointment.revision > since, Appointment.revision <= safe)
+        .order_by(Appointment.revision)
+        .limit(limit + 1)
+    )
+    appointments = result.scalars().all()
+    has_more = len(appointments) > limit
+    appointments = appointments[:limit]
+
+    return _ChangesPage(
+        changes=appointments,
+        next_since=appointments[-1].revision if has_more else max(since, safe),
+        has_more=has_more,
+        pending=safe < latest
+    )
+
+
+@router.get("/changes", response_model=AppointmentChanges)
+async def get_appointment_changes(
+    since: int = Query(0, ge=0, description="Last revision the client has seen"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum changes to return"),
+    include_patient: bool = Query(True, description="Embed the patient in each appointment"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get appointments created or modified after revision `since`.
+
+    Start with since=0 (full snapshot), then keep passing next_since. Each
+    appointment appears once, in its current state, at its latest
+    revision. An unchanged feed costs one index probe, so clients can poll
+    often; GET /changes/stream pushes the same data as it happens.
+
+    Args:
+        since: Last revision the client has seen (default: 0)
+        limit: Page size (default: 500)
+        include_patient: Load and embed the patient (default: True)
+        db: Database session
+
+    Returns:
+        Changed appointments in revision order, the cursor for the next
+        call, and whether more changes are ready or still committing
+    """
+    page = await _read_changes(db, since, limit, _list_patient_loading(include_patient))
+    if settings.fast_json_responses:
+        return FastJSONResponse({
+            **page._asdict(),
+            "changes": dump_rows(AppointmentResponse, page.changes)
+        })
+    return page._asdict()
+
+
+@router.get("/changes/stream")
+async def stream_appointment_changes(
+    since: Optional[int] = Query(None, ge=0, description="Last revision the client has seen"),
+    include_patient: bool = Query(True, description="Embed the patient in each appointment"),
+    last_event_id: Optional[int] = Header(None, ge=0, description="Sent by EventSource on reconnect")
+):
+    """
+    Stream appointment changes as Server-Sent Events.
+
+    Each change is an "appointment" event whose id is its revision and
+    whose data is an AppointmentResponse. The stream starts with the
+    changes after `since` (or the Last-Event-ID of a reconnecting
+    EventSource), then waits for Postgres NOTIFY on appointment_changes
+    and sends what changed; there is no polling while nothing changes.
+
+    Args:
+        since: Last revision the client has seen (default: 0)
+        include_patient: Load and embed the patient (default: True)
+        last_event_id: Last-Event-ID header; takes precedence over since
+
+    Returns:
+        text/event-stream streaming response
+    """
+    cursor = last_event_id if last_event_id is not None else since or 0
+    patient_loading = _list_patient_loading(include_patient)
+
+    async def generate() -> AsyncIterator[str]:
+        nonlocal cursor
+        async with change_notifier.subscribe() as changed:
+            while True:
+                changed.clear()
+                # Own session per read: the request-scoped one is closed once
+                # the response starts, and a stream may live for hours
+                async with AsyncSessionLocal() as db:
+                    page = await _read_changes(db, cursor, STREAM_BATCH_SIZE, patient_loading)
+
+                frames = [
+                    f"id: {appointment.revision}\nevent: appointment\n"
+                    f"data: {serialize_row(AppointmentResponse, appointment)}\n\n"
+                    for appointment in page.changes
+                ]
+                if page.next_since > cursor and not page.changes:
+                    # Advance the client's Last-Event-ID without an event
+                    frames.append(f"id: {page.next_since}\n\n")
+                cursor = page.next_since
+                if frames:
+                    yield "".join(frames)
+                if page.has_more:
+                    continue
+
+                timeout = (
+                    CHANGES_PENDING_RECHECK_SECONDS if page.pending
+                    else CHANGES_KEEPALIVE_SECONDS
+                )
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    if not page.pending:
+                        yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/reminders/claim", response_model=List[AppointmentResponse])
+async def claim_reminders(
+    limit: int = Query(50, ge=1, le=500, description="Maximum reminders to claim"),
+    hours: int = Query(48, ge=1, le=MAX_WINDOW_HOURS, description="Look ahead window in hours"),
+    status_filter: AppointmentStatus = Query(
+        AppointmentStatus.PENDING,
+        description="Status of appointments to remind"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Claim the next due reminders for the calling worker.
+
+    Safe to call from several workers at once: rows are taken with
+    FOR UPDATE SKIP LOCKED and leased in the same statement, so each due
+    reminder goes to exactly one caller. Call POST /{id}/reminder once it
+    is sent; a claim that isn't marked within REMINDER_LEASE_SECONDS is
+    handed out again, up to REMINDER_MAX_ATTEMPTS times.
+
+    Args:
+        limit: Batch size (default: 50)
+        hours: Number of hours to look ahead (default: 48)
+        status_filter: Filter by status (default: PENDING)
+        db: Database session
+
+    Returns:
+        Claimed appointments with their patient, ordered by date
+    """
+    claimed = await claim_due_reminders(db, limit, hours, status_filter)
+    if claimed:
+        # reminder_attempts is part of the cached representation
+        await upcoming_cache.invalidate()
+    return claimed
 
 
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
 async def get_appointment(
     appointment_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a specific appointment by ID.
 
+    The weak ETag is the appointment's revision. With If-None-Match, the
+    revision is looked up by primary key first and an unchanged appointment
+    is answered with 304 without loading it.
+
     Args:
         appointment_id: Appointment ID
+        response: Response whose ETag and Cache-Control headers are set
+        if_none_match: ETag of a previously returned representation
         db: Database session
 
     Returns:
-        Appointment details
+        Appointment details, or 304 Not Modified
 
     Raises:
         HTTPException: 404 if appointment not found
     """
-    appointment = db.query(Appointment).filter(
-        Appointment.id == appointment_id
-    ).first()
-
-    if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Appointment {appointment_id} not found"
+    if if_none_match:
+        revision = await db.scalar(
+            select(Appointment.revision).where(Appointment.id == appointment_id)
         )
+        if revision is not None and _etag_matches(if_none_match, _appointment_etag(revision)):
+            return _not_modified(_appointment_etag(revision))
+
+    appointment = await _get_appointment_or_404(db, appointment_id)
 
+    response.headers.update(_cache_headers(_appointment_etag(appointment.revision)))
     return appointment
 
 
@@ -97,7 +809,7 @@ async def get_appointment(
 async def confirm_appointment(
     appointment_id: int,
     request: AppointmentConfirmRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Confirm or unconfirm an appointment.
@@ -112,39 +824,30 @@ async def confirm_appointment(
 
     Raises:
         HTTPException: 404 if appointment not found
+        HTTPException: 409 if the status doesn't allow it or the version changed
     """
-    appointment = db.query(Appointment).filter(
-        Appointment.id == appointment_id
-    ).first()
-
-    if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Appointment {appointment_id} not found"
-        )
-
-    appointment.status = (
-        AppointmentStatus.CONFIRMED if request.confirmed
-        else AppointmentStatus.PENDING
+    action = (
+        AppointmentAction.CONFIRM if request.confirmed
+        else AppointmentAction.UNCONFIRM
     )
-    appointment.updated_at = datetime.utcnow()
-
-    db.commit()
-    db.refresh(appointment)
 
-    return appointment
+    return await _transition_appointment(
+        db, appointment_id, action, expected_version=request.expected_version
+    )
 
 
 @router.post("/{appointment_id}/cancel", response_model=AppointmentResponse)
 async def cancel_appointment(
     appointment_id: int,
-    db: Session = Depends(get_db)
+    request: Optional[AppointmentCancelRequest] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Cancel an appointment.
 
     Args:
         appointment_id: Appointment ID
+        request: Optional body with expected_version
         db: Database session
 
     Returns:
@@ -152,38 +855,34 @@ async def cancel_appointment(
 
     Raises:
         HTTPException: 404 if appointment not found
+        HTTPException: 409 if the status doesn't allow it or the version changed
     """
-    appointment = db.query(Appointment).filter(
-        Appointment.id == appointment_id
-    ).first()
-
-    if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Appointment {appointment_id} not found"
-        )
-
-    appointment.status = AppointmentStatus.CANCELLED
-    appointment.updated_at = datetime.utcnow()
-
-    db.commit()
-    db.refresh(appointment)
-
-    return appointment
+    return await _transition_appointment(
+        db,
+        appointment_id,
+        AppointmentAction.CANCEL,
+        expected_version=request.expected_version if request else None
+    )
 
 
 @router.get("/{appointment_id}/alternatives", response_model=AlternativeSlotsResponse)
 async def get_alternative_slots(
     appointment_id: int,
-    db: Session = Depends(get_db)
+    count: int = Query(2, ge=1, le=10, description="Number of slots to return"),
+    horizon_days: int = Query(14, ge=1, le=60, description="Search window in days"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get alternative appointment slots for rescheduling.
 
-    Generates 2 alternative time slots based on the current appointment.
+    Returns the free slots with the same doctor nearest to the current
+    appointment, within working hours and the patient's preferred time of
+    day. The doctor's bookings for the horizon are loaded in one query.
 
     Args:
         appointment_id: Appointment ID
+        count: Number of slots to return (default: 2)
+        horizon_days: Days around the appointment to search (default: 14)
         db: Database session
 
     Returns:
@@ -192,46 +891,124 @@ async def get_alternative_slots(
     Raises:
         HTTPException: 404 if appointment not found
     """
-    appointment = db.query(Appointment).filter(
-        Appointment.id == appointment_id
-    ).first()
+    # Patient is joined for preferences["preferred_time"]
+    appointment = await _get_appointment_or_404(db, appointment_id)
 
-    if not appointment:
+    slots = await find_alternative_slots(db, appointment, count, horizon_days)
+
+    return AlternativeSlotsResponse(
+        appointment_id=appointment_id,
+        current_date=appointment.appointment_date,
+        alternatives=[AlternativeSlot(slot_date=slot, available=True) for slot in slots]
+    )
+
+
+@router.post("/{appointment_id}/reminder", response_model=AppointmentResponse)
+async def mark_appointment_reminder(
+    appointment_id: int,
+    request: Optional[AppointmentReminderRequest] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Record that the appointment's reminder was sent.
+
+    Idempotent: the first call's values are kept and repeated calls return
+    the same appointment, so reminder workers can retry freely.
+
+    Args:
+        appointment_id: ID of the appointment
+        request: Optional send time, provider message id and reminder type
+        db: Database session
+
+    Returns:
+        Appointment with its reminder status
+
+    Raises:
+        HTTPException: 404 if appointment not found
+    """
+    request = request or AppointmentReminderRequest()
+    appointment = await mark_reminder_sent(
+        db,
+        appointment_id,
+        sent_at=request.reminder_sent_at,
+        message_sid=request.reminder_message_sid,
+        reminder_type=request.reminder_type
+    )
+    if appointment is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Appointment {appointment_id} not found"
         )
+    await upcoming_cache.invalidate()
+    return appointment
 
-    # Generate 2 alternative slots (simple logic for demo)
-    # In production, this would check actual availability
-    current_date = appointment.appointment_date
-    alternatives = [
-        AlternativeSlot(
-            slot_date=current_date + timedelta(days=1),
-            available=True
-        ),
-        AlternativeSlot(
-            slot_date=current_date + timedelta(days=2),
-            available=True
-        )
-    ]
 
-    return AlternativeSlotsResponse(
-        appointment_id=appointment_id,
-        current_date=current_date,
-        alternatives=alternatives
-    )
+# conversation_messages.role -> dashboard message direction
+_MESSAGE_DIRECTIONS = {"user": "inbound", "assistant": "outbound", "system": "system"}
+
+
+@router.get(
+    "/{appointment_id}/conversations",
+    response_model=List[AppointmentConversationMessage]
+)
+async def get_appointment_conversations(
+    appointment_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Number of latest messages"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Latest messages of an appointment's conversations, for the dashboard.
+
+    Returns the flat message list the escalation view renders, built from
+    the conversation message log (tail only, one indexed query).
+
+    Args:
+        appointment_id: ID of the appointment
+        limit: How many of the latest messages to return
+        db: Database session
+
+    Returns:
+        Up to `limit` messages, oldest first
+
+    Raises:
+        HTTPException: 404 if appointment not found
+    """
+    messages = await last_appointment_messages(db, appointment_id, limit)
+    if not messages:
+        exists = await db.scalar(select(Appointment.id).where(Appointment.id == appointment_id))
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Appointment {appointment_id} not found"
+            )
+
+    results = []
+    for message in messages:
+        payload = message.payload or {}
+        results.append(AppointmentConversationMessage(
+            id=message.id,
+            direction=_MESSAGE_DIRECTIONS.get(message.role, message.role),
+            message_body=message.content,
+            intent=payload.get("intent"),
+            confidence=payload.get("confidence"),
+            timestamp=message.created_at.timestamp()
+        ))
+    return results
 
 
 @router.post("/{appointment_id}/reschedule", response_model=AppointmentResponse)
 async def reschedule_appointment(
     appointment_id: int,
     request: AppointmentRescheduleRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Reschedule an appointment to a new date/time.
 
+    The status goes back to PENDING, and the reminder bookkeeping and
+    queued reminder jobs are cleared, so the patient is reminded again
+    about the new date.
+
     Args:
         appointment_id: Appointment ID
         request: Reschedule request with new_date
@@ -243,37 +1020,29 @@ async def reschedule_appointment(
     Raises:
         HTTPException: 404 if appointment not found
         HTTPException: 400 if new date is in the past
+        HTTPException: 409 if the status doesn't allow it, the version changed
+            or the doctor is already booked at the new time
     """
-    appointment = db.query(Appointment).filter(
-        Appointment.id == appointment_id
-    ).first()
-
-    if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Appointment {appointment_id} not found"
-        )
-
-    if request.new_date < datetime.utcnow():
+    if _is_past(request.new_date):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot reschedule to a past date"
         )
 
-    appointment.appointment_date = request.new_date
-    appointment.status = AppointmentStatus.PENDING  # Reset to pending after reschedule
-    appointment.updated_at = datetime.utcnow()
-
-    db.commit()
-    db.refresh(appointment)
-
-    return appointment
+    # Status resets to PENDING after reschedule
+    return await _transition_appointment(
+        db,
+        appointment_id,
+        AppointmentAction.RESCHEDULE,
+        expected_version=request.expected_version,
+        new_date=request.new_date
+    )
 
 
 @router.post("/", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_appointment(
     appointment: AppointmentCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new appointment.
@@ -287,9 +1056,10 @@ async def create_appointment(
 
     Raises:
         HTTPException: 404 if patient not found
+        HTTPException: 409 if the doctor is already booked at that time
     """
     # Verify patient exists
-    patient = db.query(Patient).filter(Patient.id == appointment.patient_id).first()
+    patient = await db.get(Patient, appointment.patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -298,7 +1068,323 @@ async def create_appointment(
 
     new_appointment = Appointment(**appointment.model_dump())
     db.add(new_appointment)
-    db.commit()
-    db.refresh(new_appointment)
+    try:
+        await db.commit()
+    except IntegrityError as error:
+        if not _is_double_booking(error):
+            raise
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Doctor {appointment.doctor_id} already has an appointment "
+                f"overlapping {appointment.appointment_date.isoformat()}"
+            )
+        )
+    calendar_cache.invalidate_at(new_appointment.doctor_id, new_appointment.appointment_date)
+    await upcoming_cache.invalidate()
 
-    return new_appointment
+    # Re-select instead of refresh() so server defaults and the patient
+    # relationship are loaded in one go
+    return await _get_appointment_or_404(db, new_appointment.id)
+
+
+@router.post("/import", response_model=AppointmentImportResponse)
+async def import_appointments_file(
+    file: UploadFile = File(..., description="CSV (with header row) or NDJSON agenda"),
+    import_format: Optional[ImportFormat] = Query(
+        None,
+        alias="format",
+        description="Defaults to the file extension or content type"
+    ),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=50000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk-load appointments from an agenda export.
+
+    Each row names its patient by patient_id or patient_phone. Rows are
+    validated like POST /api/appointments and copied into a staging table
+    with COPY; rows that are invalid, reference unknown patients or would
+    double-book a doctor are reported and skipped, the rest are inserted
+    as PENDING in one transaction.
+
+    Args:
+        file: Uploaded CSV or NDJSON file (UTF-8)
+        import_format: Explicit format when the file name doesn't tell
+        chunk_size: Rows read, validated and copied per COPY call
+        db: Database session
+
+    Returns:
+        Received/imported/failed totals and per-row errors
+
+    Raises:
+        HTTPException: 400 if the format can't be determined
+        HTTPException: 409 if a concurrent booking overlapped an imported row
+    """
+    import_format = import_format or detect_format(file.filename, file.content_type)
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format; use a .csv or .ndjson file or pass ?format="
+        )
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await import_appointments(db, read_rows(stream, import_format), chunk_size)
+    except IntegrityError as error:
+        if not _is_double_booking(error):
+            raise
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another booking overlapped an imported row during the import; nothing was imported, retry"
+        )
+    except UnicodeDecodeError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    finally:
+        stream.detach()
+
+
+async def _apply_batch(db: AsyncSession, items: List[AppointmentBatchItem]) -> dict:
+    """
+    Apply batch items with one UPDATE ... FROM (VALUES ...) RETURNING.
+
+    Returns:
+        Rows of the updated appointments keyed by id; items whose
+        appointment is missing, in a disallowed status or at another
+        version are simply absent
+    """
+    rows = values(
+        column("id", Integer),
+        column("action", String),
+        column("status", Appointment.status.type),
+        column("new_date", DateTime(timezone=True)),
+        column("expected_version", Integer),
+        name="batch"
+    ).data([
+        (
+            item.appointment_id,
+            item.action.value,
+            TRANSITIONS[item.action].target,
+            item.new_date if item.action == AppointmentAction.RESCHEDULE else None,
+            item.expected_version
+        )
+        for item in items
+    ])
+
+    allowed = or_(*(
+        and_(rows.c.action == action.value, Appointment.status.in_(transition.allowed_from))
+        for action, transition in TRANSITIONS.items()
+    ))
+
+    # A VALUES column that is NULL in every row is typed text by
+    # Postgres, so the nullable columns are cast back explicitly
+    new_date = cast(rows.c.new_date, DateTime(timezone=True))
+    expected_version = cast(rows.c.expected_version, Integer)
+
+    version_matches = or_(
+        expected_version.is_(None),
+        Appointment.version == expected_version
+    )
+
+    # Rescheduled rows start their reminder bookkeeping over
+    rescheduled = rows.c.action == AppointmentAction.RESCHEDULE.value
+    reminder_values = {
+        name: case((rescheduled, value), else_=getattr(Appointment, name))
+        for name, value in reminder_reset_values().items()
+    }
+
+    statement = (
+        update(Appointment)
+        .where(Appointment.id == rows.c.id, allowed, version_matches)
+        .values(
+            status=rows.c.status,
+            appointment_date=func.coalesce(new_date, Appointment.appointment_date),
+            version=Appointment.version + 1,
+            updated_at=func.now(),
+            **reminder_values
+        )
+        .returning(
+            Appointment.id,
+            Appointment.doctor_id,
+            Appointment.status,
+            Appointment.appointment_date,
+            Appointment.version
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    return {row.id: row for row in await db.execute(statement)}
+
+
+async def _apply_batch_isolating_overlaps(
+    db: AsyncSession,
+    items: List[AppointmentBatchItem]
+) -> Tuple[dict, set]:
+    """
+    Slow path after a batch hit the double-booking constraint.
+
+    Only reschedules can create an overlap, so the other items still go in
+    one statement and each reschedule runs in its own savepoint.
+
+    Returns:
+        (updated rows keyed by id, ids of reschedules rejected as overlapping)
+    """
+    others = [item for item in items if item.action != AppointmentAction.RESCHEDULE]
+    applied = await _apply_batch(db, others) if others else {}
+    double_booked = set()
+
+    for item in items:
+        if item.action != AppointmentAction.RESCHEDULE:
+            continue
+        try:
+            async with db.begin_nested():
+                applied.update(await _apply_batch(db, [item]))
+        except IntegrityError as error:
+            if not _is_double_booking(error):
+                raise
+            double_booked.add(item.appointment_id)
+
+    return applied, double_booked
+
+
+@router.post("/batch", response_model=AppointmentBatchResponse)
+async def batch_update_appointments(
+    request: AppointmentBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply many confirm/unconfirm/cancel/reschedule transitions at once.
+
+    All valid items are applied in one transaction by a single
+    UPDATE ... FROM (VALUES ...) RETURNING statement. An item that cannot be
+    applied is reported in its result instead of failing the whole batch;
+    only when some items don't come back from the UPDATE is a second
+    query made to tell missing appointments from disallowed transitions.
+    If a reschedule would double-book a doctor, the batch is retried with
+    reschedules applied one by one so only the overlapping items fail.
+
+    Args:
+        request: Batch of transitions (at most one per appointment)
+        db: Database session
+
+    Returns:
+        Per-item results in request order plus updated/failed totals
+    """
+    results: List[Optional[AppointmentBatchItemResult]] = [None] * len(request.items)
+    to_apply = {}  # appointment_id -> index of the item applied to it
+
+    for index, item in enumerate(request.items):
+        detail = None
+        if item.appointment_id in to_apply:
+            detail = "Duplicate appointment_id in batch"
+        elif item.action == AppointmentAction.RESCHEDULE and item.new_date is None:
+            detail = "new_date is required for reschedule"
+        elif item.action == AppointmentAction.RESCHEDULE and _is_past(item.new_date):
+            detail = "Cannot reschedule to a past date"
+
+        if detail:
+            results[index] = AppointmentBatchItemResult(
+                appointment_id=item.appointment_id,
+                action=item.action,
+                outcome=BatchItemOutcome.INVALID,
+                detail=detail
+            )
+        else:
+            to_apply[item.appointment_id] = index
+
+    if to_apply:
+        items = [request.items[index] for index in to_apply.values()]
+        double_booked = set()
+
+        try:
+            applied = await _apply_batch(db, items)
+        except IntegrityError as error:
+            if not _is_double_booking(error):
+                raise
+            await db.rollback()
+            applied, double_booked = await _apply_batch_isolating_overlaps(db, items)
+
+        current = {}
+        not_applied = [
+            appointment_id for appointment_id in to_apply
+            if appointment_id not in applied and appointment_id not in double_booked
+        ]
+        if not_applied:
+            found = await db.execute(
+                select(Appointment.id, Appointment.status, Appointment.version)
+                .where(Appointment.id.in_(not_applied))
+            )
+            current = {row.id: row for row in found}
+
+        await discard_reminder_jobs(db, (
+            appointment_id for appointment_id in applied
+            if request.items[to_apply[appointment_id]].action == AppointmentAction.RESCHEDULE
+        ))
+        await db.commit()
+        if applied:
+            await upcoming_cache.invalidate()
+
+        for appointment_id, index in to_apply.items():
+            item = request.items[index]
+            row = applied.get(appointment_id)
+
+            if row is not None:
+                _invalidate_calendar(item.action, row.doctor_id, row.appointment_date)
+                result = AppointmentBatchItemResult(
+                    appointment_id=appointment_id,
+                    action=item.action,
+                    outcome=BatchItemOutcome.UPDATED,
+                    status=row.status,
+                    appointment_date=row.appointment_date,
+                    version=row.version
+                )
+            elif appointment_id in double_booked:
+                result = AppointmentBatchItemResult(
+                    appointment_id=appointment_id,
+                    action=item.action,
+                    outcome=BatchItemOutcome.CONFLICT,
+                    detail="New date overlaps another appointment of the same doctor"
+                )
+            elif appointment_id in current:
+                found_row = current[appointment_id]
+                if item.expected_version is not None and found_row.version != item.expected_version:
+                    detail = (
+                        f"Appointment {appointment_id} was modified "
+                        f"(version {found_row.version}, expected {item.expected_version})"
+                    )
+                else:
+                    detail = (
+                        f"Cannot {item.action.value} appointment in status "
+                        f"{found_row.status.value}"
+                    )
+                result = AppointmentBatchItemResult(
+                    appointment_id=appointment_id,
+                    action=item.action,
+                    outcome=BatchItemOutcome.CONFLICT,
+                    status=found_row.status,
+                    version=found_row.version,
+                    detail=detail
+                )
+            else:
+                result = AppointmentBatchItemResult(
+                    appointment_id=appointment_id,
+                    action=item.action,
+                    outcome=BatchItemOutcome.NOT_FOUND,
+                    detail=f"Appointment {appointment_id} not found"
+                )
+
+            results[index] = result
+
+    updated = sum(1 for result in results if result.outcome == BatchItemOutcome.UPDATED)
+
+    return AppointmentBatchResponse(
+        updated=updated,
+        failed=len(results) - updated,
+        results=results
+    )
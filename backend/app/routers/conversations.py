@@ -0,0 +1,211 @@
+"""
+Conversation API endpoints.
+
+Conversation state for the agent (read, merge-patch), lookup by state,
+and the message log of agent-patient conversations: append one message,
+read the latest ones.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import Json
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from typing import Any, Dict, List, Optional
+
+from app.database import get_db
+from app.models import ConversationHistory
+from app.services.conversations import (
+    append_message,
+    get_conversation_state,
+    last_messages,
+    patch_conversation
+)
+from app.schemas import (
+    ConversationMessageCreate,
+    ConversationMessageResponse,
+    ConversationPatch,
+    ConversationStateResponse,
+    ConversationSummaryResponse
+)
+
+router = APIRouter(
+    prefix="/api/conversations",
+    tags=["conversations"]
+)
+
+
+def _conversation_state_query(
+    state: Optional[Dict[str, Any]],
+    patient_id: Optional[int],
+    limit: int
+) -> Select:
+    """Conversations whose state contains `state`, newest first."""
+    # The legacy messages blob is never needed for listings
+    query = select(ConversationHistory).options(defer(ConversationHistory.messages))
+    if state:
+        # jsonb_path_ops GIN index (ix_conversation_history_state)
+        query = query.where(ConversationHistory.state.contains(state))
+    if patient_id is not None:
+        query = query.where(ConversationHistory.patient_id == patient_id)
+    return query.order_by(ConversationHistory.id.desc()).limit(limit)
+
+
+@router.get("/", response_model=List[ConversationSummaryResponse])
+async def list_conversations(
+    state: Optional[Json[Dict[str, Any]]] = Query(
+        None,
+        description='JSON object the state must contain, e.g. {"awaiting_selection": true}'
+    ),
+    patient_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List conversations filtered on agent state keys.
+
+    Args:
+        state: JSON object that the conversation state must contain
+        patient_id: Only conversations of this patient
+        limit: Maximum number of conversations
+        db: Database session
+
+    Returns:
+        Matching conversations (without messages), newest first
+    """
+    result = await db.scalars(_conversation_state_query(state, patient_id, limit))
+    return result.all()
+
+
+def _conversation_not_found(conversation_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Conversation {conversation_id} not found"
+    )
+
+
+@router.get("/{conversation_id}", response_model=ConversationStateResponse)
+async def get_conversation(
+    conversation_id: int,
+    tail: int = Query(20, ge=0, le=500, description="Number of latest messages to include"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a conversation's state with only the tail of its messages.
+
+    Args:
+        conversation_id: ID of the conversation
+        tail: How many of the latest messages to include (0 = none)
+        db: Database session
+
+    Returns:
+        Conversation state and up to `tail` messages, oldest first
+
+    Raises:
+        HTTPException: 404 if conversation not found
+    """
+    conversation = await get_conversation_state(db, conversation_id)
+    if conversation is None:
+        raise _conversation_not_found(conversation_id)
+
+    messages = await last_messages(db, conversation_id, tail) if tail else []
+    return ConversationStateResponse(**conversation._mapping, messages=messages)
+
+
+@router.patch("/{conversation_id}", response_model=ConversationStateResponse)
+async def update_conversation(
+    conversation_id: int,
+    patch: ConversationPatch,
+    tail: int = Query(0, ge=0, le=500, description="Number of latest messages to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Partially update a conversation (JSON merge patch on state).
+
+    Meant for one call per agent turn: the changed state keys and the
+    turn's new messages go in, the merged state comes back, and neither
+    side ships the full history.
+
+    Args:
+        conversation_id: ID of the conversation
+        patch: Merge patch for state, new context and messages to append
+        tail: How many of the latest messages to return (default none)
+        db: Database session
+
+    Returns:
+        Conversation state after the patch
+
+    Raises:
+        HTTPException: 404 if conversation not found
+    """
+    conversation = await patch_conversation(
+        db,
+        conversation_id,
+        state_patch=patch.state,
+        context=patch.context,
+        new_messages=[message.model_dump() for message in patch.messages]
+    )
+    if conversation is None:
+        raise _conversation_not_found(conversation_id)
+
+    messages = await last_messages(db, conversation_id, tail) if tail else []
+    return ConversationStateResponse(**conversation._mapping, messages=messages)
+
+
+@router.post(
+    "/{conversation_id}/messages",
+    response_model=ConversationMessageResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def append_conversation_message(
+    conversation_id: int,
+    message: ConversationMessageCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Append a message to a conversation (single INSERT, no history read).
+
+    Args:
+        conversation_id: ID of the conversation
+        message: Role, content and optional payload
+        db: Database session
+
+    Returns:
+        Stored message with its id and timestamp
+
+    Raises:
+        HTTPException: 404 if conversation not found
+    """
+    stored = await append_message(
+        db, conversation_id, message.role, message.content, message.payload
+    )
+    if stored is None:
+        raise _conversation_not_found(conversation_id)
+    return stored
+
+
+@router.get("/{conversation_id}/messages", response_model=List[ConversationMessageResponse])
+async def get_conversation_messages(
+    conversation_id: int,
+    limit: int = Query(20, ge=1, le=500, description="Number of latest messages"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the latest messages of a conversation, oldest first.
+
+    Args:
+        conversation_id: ID of the conversation
+        limit: How many of the latest messages to return
+        db: Database session
+
+    Returns:
+        Up to `limit` messages in chronological order
+
+    Raises:
+        HTTPException: 404 if conversation not found
+    """
+    messages = await last_messages(db, conversation_id, limit)
+    # An empty tail is ambiguous; only then check that the conversation exists
+    if not messages and await get_conversation_state(db, conversation_id) is None:
+        raise _conversation_not_found(conversation_id)
+    return messages
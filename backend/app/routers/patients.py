@@ -0,0 +1,134 @@
+"""
+Patient API endpoints.
+
+Lookup of patients by id or preferences, and the phone-number fast path
+used by the WhatsApp webhook.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import Json
+from sqlalchemy import Select, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+
+from app.database import get_db, settings
+from app.models import Patient
+from app.responses import FastJSONResponse, dump_rows
+from app.services.patients import lookup_or_create_patient
+from app.schemas import (
+    PatientLookupRequest,
+    PatientLookupResponse,
+    PatientResponse
+)
+
+router = APIRouter(
+    prefix="/api/patients",
+    tags=["patients"]
+)
+
+# Literal key (not a bind parameter) so the expression matches
+# ix_patients_preferred_time
+PREFERRED_TIME = Patient.preferences[literal_column("'preferred_time'")].astext
+
+
+def _patient_preferences_query(
+    preferred_time: Optional[str],
+    preferences: Optional[Dict[str, Any]],
+    limit: int
+) -> Select:
+    """Patients filtered on preference keys, newest first."""
+    query = select(Patient)
+    if preferred_time is not None:
+        query = query.where(PREFERRED_TIME == preferred_time)
+    if preferences:
+        # jsonb_path_ops GIN index (ix_patients_preferences)
+        query = query.where(Patient.preferences.contains(preferences))
+    return query.order_by(Patient.id.desc()).limit(limit)
+
+
+@router.get("/", response_model=List[PatientResponse])
+async def list_patients(
+    preferred_time: Optional[str] = Query(None, description="e.g. morning, afternoon, evening"),
+    preferences: Optional[Json[Dict[str, Any]]] = Query(
+        None,
+        description='JSON object the preferences must contain, e.g. {"language": "es"}'
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List patients filtered on their preferences.
+
+    Both filters are index-backed: preferred_time by an expression index,
+    `preferences` containment by a GIN index.
+
+    Args:
+        preferred_time: Exact value of preferences.preferred_time
+        preferences: JSON object that preferences must contain
+        limit: Maximum number of patients
+        db: Database session
+
+    Returns:
+        Matching patients, newest first
+    """
+    result = await db.scalars(_patient_preferences_query(preferred_time, preferences, limit))
+    patients = result.all()
+    if settings.fast_json_responses:
+        return FastJSONResponse(dump_rows(PatientResponse, patients))
+    return patients
+
+
+@router.post("/lookup", response_model=PatientLookupResponse)
+async def lookup_patient_by_phone(
+    request: PatientLookupRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Map an inbound phone number to a patient, registering unknown numbers.
+
+    Called for every inbound WhatsApp message. Costs one read-only query
+    on the unique phone index for known patients, an insert for new ones,
+    and none when the phone is in the per-worker cache. Existing patients
+    are not modified.
+
+    Args:
+        request: Phone number (E.164, optional "whatsapp:" prefix) and the
+            name to use if the patient is new
+        db: Database session
+
+    Returns:
+        Patient id, normalized phone and whether the patient was created
+    """
+    lookup = await lookup_or_create_patient(db, request.phone, request.name)
+    return PatientLookupResponse(
+        id=lookup.patient_id,
+        phone=request.phone,
+        created=lookup.created
+    )
+
+
+@router.get("/{patient_id}", response_model=PatientResponse)
+async def get_patient(
+    patient_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a patient by ID.
+
+    Args:
+        patient_id: ID of the patient
+        db: Database session
+
+    Returns:
+        Patient details
+
+    Raises:
+        HTTPException: 404 if patient not found
+    """
+    patient = await db.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Patient {patient_id} not found"
+        )
+    return patient
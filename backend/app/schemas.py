@@ -4,10 +4,23 @@ Pydantic schemas for request/response validation.
 Defines the API contract for all endpoints.
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from pydantic import AfterValidator, BaseModel, Field, field_validator
+from typing import Annotated, Any, Dict, Optional, List
+from datetime import datetime, timezone
+import enum
 from app.models.appointment import AppointmentStatus
+from app.services.patients import normalize_phone
+from app.services.transitions import AppointmentAction
+
+
+def _assume_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+# Datetime from a request; a value without an offset is read as UTC, so
+# the past-date checks and the stored value agree (asyncpg would encode a
+# naive value as host local time)
+RequestDatetime = Annotated[datetime, AfterValidator(_assume_utc)]
 
 
 # Patient Schemas
@@ -36,13 +49,33 @@ class PatientResponse(PatientBase):
         from_attributes = True
 
 
+class PatientLookupRequest(BaseModel):
+    """Schema for resolving an inbound phone number to a patient."""
+
+    phone: str = Field(..., pattern=r'^\+[1-9]\d{1,14}$')  # "whatsapp:" prefix allowed
+    name: Optional[str] = Field(None, min_length=1, max_length=255)  # Used for new patients only
+
+    @field_validator("phone", mode="before")
+    @classmethod
+    def _normalize_phone(cls, value):
+        return normalize_phone(value) if isinstance(value, str) else value
+
+
+class PatientLookupResponse(BaseModel):
+    """Schema for phone lookup responses."""
+
+    id: int
+    phone: str
+    created: bool
+
+
 # Appointment Schemas
 class AppointmentBase(BaseModel):
     """Base appointment schema with common fields."""
 
     doctor_id: str
     doctor_name: str
-    appointment_date: datetime
+    appointment_date: RequestDatetime
     duration_minutes: int = 30
     notes: Optional[str] = ""
 
@@ -56,7 +89,7 @@ class AppointmentCreate(AppointmentBase):
 class AppointmentUpdate(BaseModel):
     """Schema for updating an appointment."""
 
-    appointment_date: Optional[datetime] = None
+    appointment_date: Optional[RequestDatetime] = None
     status: Optional[AppointmentStatus] = None
     notes: Optional[str] = None
 
@@ -69,22 +102,126 @@ class AppointmentResponse(AppointmentBase):
     status: AppointmentStatus
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
+    reminder_sent_at: Optional[datetime] = None
+    reminder_attempts: int = 0
+    revision: Optional[int] = None  # Change feed position of this version
     patient: Optional[PatientResponse] = None
 
     class Config:
         from_attributes = True
 
 
+class AppointmentPage(BaseModel):
+    """Schema for a keyset-paginated page of appointments."""
+
+    items: List[AppointmentResponse]
+    next_cursor: Optional[str] = None
+
+
+class AppointmentChanges(BaseModel):
+    """Schema for a page of the appointment change feed."""
+
+    changes: List[AppointmentResponse]  # Current state, in revision order
+    next_since: int  # Pass as ?since= on the next call
+    has_more: bool  # More changes are ready; call again right away
+    pending: bool  # Writes still committing; call again shortly
+
+
 class AppointmentConfirmRequest(BaseModel):
     """Schema for confirming an appointment."""
 
     confirmed: bool = True
+    expected_version: Optional[int] = None  # 409 if the appointment changed since
+
+
+class AppointmentCancelRequest(BaseModel):
+    """Schema for cancelling an appointment (body is optional)."""
+
+    expected_version: Optional[int] = None  # 409 if the appointment changed since
 
 
 class AppointmentRescheduleRequest(BaseModel):
     """Schema for rescheduling an appointment."""
 
-    new_date: datetime
+    new_date: RequestDatetime
+    expected_version: Optional[int] = None  # 409 if the appointment changed since
+
+
+class AppointmentReminderRequest(BaseModel):
+    """Schema for recording a sent reminder (body is optional)."""
+
+    reminder_sent_at: Optional[RequestDatetime] = None  # Defaults to now
+    reminder_message_sid: Optional[str] = Field(None, max_length=64)
+    reminder_type: Optional[str] = Field(None, max_length=50)
+
+
+class AppointmentBatchItem(BaseModel):
+    """One status transition in a batch request."""
+
+    appointment_id: int
+    action: AppointmentAction
+    new_date: Optional[RequestDatetime] = None  # Required for reschedule
+    expected_version: Optional[int] = None
+
+
+class AppointmentBatchRequest(BaseModel):
+    """Schema for applying many status transitions in one transaction."""
+
+    items: List[AppointmentBatchItem] = Field(..., min_length=1, max_length=5000)
+
+
+class BatchItemOutcome(str, enum.Enum):
+    """
+    Result of a single batch item.
+
+    UPDATED: Transition applied
+    NOT_FOUND: Appointment does not exist
+    CONFLICT: Appointment status does not allow the action, or
+        expected_version no longer matches
+    INVALID: Item rejected before reaching the database
+    """
+
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    CONFLICT = "conflict"
+    INVALID = "invalid"
+
+
+class AppointmentBatchItemResult(BaseModel):
+    """Per-item result of a batch request."""
+
+    appointment_id: int
+    action: AppointmentAction
+    outcome: BatchItemOutcome
+    status: Optional[AppointmentStatus] = None
+    appointment_date: Optional[datetime] = None
+    version: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class AppointmentBatchResponse(BaseModel):
+    """Schema for batch responses, results in request order."""
+
+    updated: int
+    failed: int
+    results: List[AppointmentBatchItemResult]
+
+
+class AppointmentImportRowError(BaseModel):
+    """A rejected row of a bulk import (1-based data row number)."""
+
+    row: int
+    detail: str
+
+
+class AppointmentImportResponse(BaseModel):
+    """Schema for bulk import results."""
+
+    received: int
+    imported: int
+    failed: int
+    errors: List[AppointmentImportRowError]  # Capped; `failed` counts all
 
 
 class AlternativeSlot(BaseModel):
@@ -129,3 +266,70 @@ class ConversationHistoryResponse(ConversationHistoryBase):
 
     class Config:
         from_attributes = True
+
+
+class ConversationSummaryResponse(BaseModel):
+    """Schema for conversation listings (state without the message log)."""
+
+    id: int
+    appointment_id: Optional[int]
+    patient_id: int
+    state: dict = {}
+    context: Optional[str] = ""
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class ConversationMessageCreate(BaseModel):
+    """Schema for appending a message to a conversation."""
+
+    role: str = Field(..., min_length=1, max_length=20)
+    content: str = ""
+    payload: Optional[dict] = None
+
+
+class ConversationMessageResponse(BaseModel):
+    """Schema for conversation message responses."""
+
+    id: int
+    conversation_id: int
+    role: str
+    content: str
+    payload: Optional[dict] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ConversationStateResponse(ConversationSummaryResponse):
+    """Schema for conversation state with only the tail of its messages."""
+
+    messages: List[ConversationMessageResponse] = []
+
+
+class ConversationPatch(BaseModel):
+    """
+    Schema for a partial conversation update.
+
+    `state` is a JSON merge patch (RFC 7396): keys set to null are removed,
+    nested objects are merged. Omitted fields are left unchanged.
+    """
+
+    state: Optional[Dict[str, Any]] = None
+    context: Optional[str] = None
+    messages: List[ConversationMessageCreate] = Field([], max_length=50)  # Appended in order
+
+
+class AppointmentConversationMessage(BaseModel):
+    """One message in the dashboard's escalation view of an appointment."""
+
+    id: int
+    direction: str  # inbound, outbound or system
+    message_body: str
+    intent: Optional[str] = None
+    confidence: Optional[float] = None
+    timestamp: float  # Unix seconds
@@ -0,0 +1,3 @@
+"""
+Business logic shared by the API routers.
+"""
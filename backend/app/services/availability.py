@@ -0,0 +1,416 @@
+"""
+Doctor availability engine.
+
+Loads a doctor's booked intervals for a horizon in one query, keeps them
+as merged, sorted arrays of POSIX timestamps and answers "is this slot
+free?" with a binary search. Alternative slots are generated outward from
+the current appointment time, so the nearest free slots are found without
+scanning the whole horizon.
+"""
+
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import settings
+from app.models import Appointment
+from app.models.appointment import BOOKED_STATUSES
+from app.services.cache import LRUCache
+
+
+# Local-time windows for Patient.preferences["preferred_time"]
+PREFERRED_TIME_WINDOWS = {
+    "morning": (time(8, 0), time(12, 0)),
+    "afternoon": (time(12, 0), time(17, 0)),
+    "evening": (time(17, 0), time(20, 0)),
+}
+
+
+class WorkingHours:
+    """
+    When slots can be offered, in the clinic's local time.
+
+    Candidate slots are memoized per local day in an LRUCache bounded like
+    the calendar cache (CALENDAR_CACHE_MAX_DAYS entries), so the shared
+    `working_hours` instance reuses them across requests.
+
+    Attributes:
+        start: First slot start of the day
+        end: Latest time a slot may end
+        days: Weekdays with consultations (0 = Monday)
+        slot_step: Spacing between candidate slot starts
+        tz: Clinic timezone
+    """
+
+    def __init__(
+        self,
+        start: time = time(8, 0),
+        end: time = time(20, 0),
+        days: Sequence[int] = (0, 1, 2, 3, 4),
+        slot_step: timedelta = timedelta(minutes=30),
+        tz: Optional[ZoneInfo] = None
+    ):
+        self.start = start
+        self.end = end
+        self.days = frozenset(days)
+        self.slot_step = slot_step
+        self.tz = tz or ZoneInfo(settings.clinic_timezone)
+        self._day_slots = LRUCache(
+            maxsize=settings.calendar_cache_max_days,
+            ttl_seconds=settings.calendar_cache_ttl_seconds
+        )
+
+    def day_slots(
+        self,
+        day: date,
+        duration: timedelta,
+        window: Optional[Tuple[time, time]] = None
+    ) -> Tuple[float, ...]:
+        """Candidate slot starts (POSIX timestamps) for one local day, ascending."""
+        # Timezone-aware arithmetic dominates lookups, so days are memoized
+        key = (day, duration, window)
+        slots = self._day_slots.get(key)
+        if slots is None:
+            slots = tuple(self._build_day_slots(day, duration, window))
+            self._day_slots.set(key, slots)
+        return slots
+
+    def stats(self) -> dict:
+        return self._day_slots.stats()
+
+    def _build_day_slots(
+        self,
+        day: date,
+        duration: timedelta,
+        window: Optional[Tuple[time, time]]
+    ) -> List[float]:
+        if day.weekday() not in self.days:
+            return []
+
+        start, end = self.start, self.end
+        if window:
+            start, end = max(start, window[0]), min(end, window[1])
+
+        slot = datetime.combine(day, start, tzinfo=self.tz)
+        last_start = datetime.combine(day, end, tzinfo=self.tz) - duration
+        slots = []
+        while slot <= last_start:
+            slots.append(slot.timestamp())
+            slot += self.slot_step
+        return slots
+
+
+class DoctorCalendar:
+    """
+    Booked intervals of one doctor, merged and sorted for O(log n) lookups.
+
+    Overlapping or touching bookings are merged on construction, so at most
+    one interval can contain any instant and a single bisect answers
+    whether a slot is free.
+    """
+
+    def __init__(self, doctor_id: str, intervals: Iterable[Tuple[float, float]]):
+        """
+        Args:
+            doctor_id: Doctor the bookings belong to
+            intervals: (start, end) POSIX timestamps of each booking
+        """
+        self.doctor_id = doctor_id
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def is_free(self, start: float, end: float) -> bool:
+        """Whether [start, end) overlaps no booked interval."""
+        # Last interval starting before `end` is the only possible overlap
+        i = bisect_left(self.starts, end) - 1
+        return i < 0 or self.ends[i] <= start
+
+    def nearest_free_slots(
+        self,
+        reference: datetime,
+        duration: timedelta,
+        count: int,
+        not_before: datetime,
+        not_after: datetime,
+        hours: WorkingHours,
+        window: Optional[Tuple[time, time]] = None
+    ) -> List[datetime]:
+        """
+        Find the `count` free slots closest in time to `reference`.
+
+        Candidates are walked outward from `reference` in both directions
+        and merged by distance, so the search stops as soon as enough free
+        slots are found. The reference slot itself is never returned.
+
+        Returns:
+            Slot starts as UTC datetimes, ordered by distance from reference
+        """
+        ref = reference.timestamp()
+        lower, upper = not_before.timestamp(), not_after.timestamp()
+        seconds = duration.total_seconds()
+        local_day = reference.astimezone(hours.tz).date()
+
+        forward = self._walk(local_day, 1, duration, hours, window, lambda t: t > ref, upper)
+        backward = self._walk(local_day, -1, duration, hours, window, lambda t: t < ref, lower)
+
+        found = []
+        next_forward = next(forward, None)
+        next_backward = next(backward, None)
+        while len(found) < count and (next_forward is not None or next_backward is not None):
+            if next_backward is None or (
+                next_forward is not None and next_forward - ref <= ref - next_backward
+            ):
+                candidate, next_forward = next_forward, next(forward, None)
+            else:
+                candidate, next_backward = next_backward, next(backward, None)
+
+            if self.is_free(candidate, candidate + seconds):
+                found.append(datetime.fromtimestamp(candidate, timezone.utc))
+
+        return found
+
+    @staticmethod
+    def _walk(
+        day: date,
+        direction: int,
+        duration: timedelta,
+        hours: WorkingHours,
+        window: Optional[Tuple[time, time]],
+        keep,
+        bound: float
+    ) -> Iterator[float]:
+        """Yield candidate starts day by day away from `day` until `bound`."""
+        while True:
+            slots = hours.day_slots(day, duration, window)
+            for slot in (slots if direction > 0 else reversed(slots)):
+                if (direction > 0 and slot > bound) or (direction < 0 and slot < bound):
+                    return
+                if keep(slot):
+                    yield slot
+
+            # Stop once the whole local day is past the bound
+            day_edge = datetime.combine(day, time.min, tzinfo=hours.tz)
+            if direction > 0 and day_edge.timestamp() > bound:
+                return
+            if direction < 0 and (day_edge + timedelta(days=1)).timestamp() < bound:
+                return
+            day += timedelta(days=direction)
+
+
+class CalendarCache:
+    """
+    Per-worker cache of booked intervals keyed by (doctor_id, UTC day).
+
+    Days are loaded lazily: a horizon lookup only queries the days it does
+    not have yet, in one range query. Entries are evicted LRU and expire
+    after a TTL, which bounds staleness across uvicorn workers; within a
+    worker, the appointments router invalidates a doctor's days on every
+    create, cancel and reschedule.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        # Value: tuple of (start_ts, end_ts, appointment_id)
+        self.days = LRUCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        # Bumped on invalidation so a load that raced with a write is not cached
+        self._generations: Dict[str, int] = {}
+
+    def invalidate(self, doctor_id: str, day: Optional[date] = None) -> None:
+        """Forget one cached day of a doctor, or all of them."""
+        self._generations[doctor_id] = self._generations.get(doctor_id, 0) + 1
+        if day is not None:
+            self.days.delete((doctor_id, day))
+        else:
+            self.days.delete_where(lambda key: key[0] == doctor_id)
+
+    def invalidate_at(self, doctor_id: str, when: datetime) -> None:
+        """Forget the cached day containing `when`."""
+        self.invalidate(doctor_id, _utc_day(when))
+
+    async def intervals(
+        self,
+        db: AsyncSession,
+        doctor_id: str,
+        first_day: date,
+        last_day: date
+    ) -> List[Tuple[float, float, int]]:
+        """Booked intervals starting on UTC days first_day..last_day."""
+        days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+        cached = {day: self.days.get((doctor_id, day)) for day in days}
+        missing = [day for day, value in cached.items() if value is None]
+
+        if missing:
+            generation = self._generations.get(doctor_id, 0)
+            loaded = await self._load_days(db, doctor_id, missing[0], missing[-1])
+            still_valid = self._generations.get(doctor_id, 0) == generation
+            for day in missing:
+                cached[day] = tuple(loaded.get(day, ()))
+                if still_valid:
+                    self.days.set((doctor_id, day), cached[day])
+
+        return [interval for day in days for interval in cached[day]]
+
+    @staticmethod
+    async def _load_days(
+        db: AsyncSession,
+        doctor_id: str,
+        first_day: date,
+        last_day: date
+    ) -> Dict[date, List[Tuple[float, float, int]]]:
+        """Load booked intervals for a contiguous day range in one query."""
+        result = await db.execute(
+            select(
+                Appointment.id,
+                Appointment.appointment_date,
+                Appointment.duration_minutes
+            ).where(
+                Appointment.doctor_id == doctor_id,
+                Appointment.status.in_(BOOKED_STATUSES),
+                Appointment.appointment_date >= datetime.combine(
+                    first_day, time.min, tzinfo=timezone.utc
+                ),
+                Appointment.appointment_date < datetime.combine(
+                    last_day + timedelta(days=1), time.min, tzinfo=timezone.utc
+                )
+            )
+        )
+
+        by_day: Dict[date, List[Tuple[float, float, int]]] = {}
+        for appointment_id, booked_at, duration in result.all():
+            start = booked_at.timestamp()
+            by_day.setdefault(_utc_day(booked_at), []).append(
+                (start, start + (duration or 30) * 60, appointment_id)
+            )
+        return by_day
+
+    def stats(self) -> dict:
+        return self.days.stats()
+
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is None:
+        return value.date()
+    return value.astimezone(timezone.utc).date()
+
+
+calendar_cache = CalendarCache(
+    maxsize=settings.calendar_cache_max_days,
+    ttl_seconds=settings.calendar_cache_ttl_seconds
+)
+
+# Clinic working hours (CLINIC_TIMEZONE), shared so the slot memo persists
+working_hours = WorkingHours()
+
+
+async def load_doctor_calendar(
+    db: AsyncSession,
+    doctor_id: str,
+    start: datetime,
+    end: datetime,
+    exclude_appointment_id: Optional[int] = None
+) -> DoctorCalendar:
+    """
+    Build a doctor's calendar for [start, end) from the calendar cache.
+
+    Days not cached yet are loaded in a single query.
+
+    Args:
+        db: Database session
+        doctor_id: Doctor to load
+        start: Horizon start
+        end: Horizon end
+        exclude_appointment_id: Appointment whose own slot should not count
+            as busy (the one being rescheduled)
+
+    Returns:
+        DoctorCalendar for the horizon
+    """
+    # Bookings starting the day before `start` may still run into it
+    intervals = await calendar_cache.intervals(
+        db,
+        doctor_id,
+        _utc_day(start) - timedelta(days=1),
+        _utc_day(end)
+    )
+
+    return DoctorCalendar(doctor_id, (
+        (booked_start, booked_end)
+        for booked_start, booked_end, appointment_id in intervals
+        if appointment_id != exclude_appointment_id
+    ))
+
+
+async def find_alternative_slots(
+    db: AsyncSession,
+    appointment: Appointment,
+    count: int,
+    horizon_days: int,
+    hours: Optional[WorkingHours] = None
+) -> List[datetime]:
+    """
+    Find free slots with the same doctor, nearest to the appointment.
+
+    Slots honour the patient's preferences["preferred_time"] when set; if
+    the preferred window has fewer than `count` free slots in the horizon,
+    the rest are filled from the whole working day.
+
+    Args:
+        db: Database session
+        appointment: Appointment being rescheduled (patient loaded)
+        count: Number of slots wanted
+        horizon_days: How far from the appointment to search, in days
+        hours: Working hours (default: the shared `working_hours`)
+
+    Returns:
+        Up to `count` slot starts (UTC), nearest first
+    """
+    hours = hours or working_hours
+    now = datetime.now(timezone.utc)
+
+    current_date = appointment.appointment_date
+    if current_date.tzinfo is None:
+        current_date = current_date.replace(tzinfo=timezone.utc)
+
+    reference = max(current_date, now)
+    not_before = max(now, reference - timedelta(days=horizon_days))
+    not_after = reference + timedelta(days=horizon_days)
+    duration = timedelta(minutes=appointment.duration_minutes or 30)
+
+    calendar = await load_doctor_calendar(
+        db,
+        appointment.doctor_id,
+        not_before,
+        not_after,
+        exclude_appointment_id=appointment.id
+    )
+
+    preferences = (appointment.patient.preferences if appointment.patient else None) or {}
+    window = PREFERRED_TIME_WINDOWS.get(preferences.get("preferred_time"))
+
+    slots = calendar.nearest_free_slots(
+        reference, duration, count, not_before, not_after, hours, window
+    )
+
+    if window and len(slots) < count:
+        for slot in calendar.nearest_free_slots(
+            reference, duration, count + len(slots), not_before, not_after, hours
+        ):
+            if len(slots) == count:
+                break
+            if slot not in slots:
+                slots.append(slot)
+
+    return slots
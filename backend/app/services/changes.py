@@ -0,0 +1,177 @@
+"""
+Appointment change feed support.
+
+Every appointment write takes a new revision from appointments_revision_seq
+(see the triggers in app.models.appointment), and the writing statement
+NOTIFYs the highest one on the appointment_changes channel when it commits.
+
+Revisions are taken when a row is written but become visible when its
+transaction commits, so a reader can see revision 11 while 10 is still in
+flight. Feed readers therefore never read past safe_revision(), below which
+every revision is final; this is what makes "revision > since" lossless.
+
+ChangeNotifier keeps one LISTEN connection per process and wakes SSE
+subscribers when a notification arrives. Notifications only say "something
+changed": subscribers re-read the feed from their own cursor, so a missed
+or coalesced notification never loses a change.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import settings
+from app.models.appointment import CHANGES_CHANNEL
+
+
+logger = logging.getLogger(__name__)
+
+# (next xid, last revision) pairs seen by this process; a pair becomes
+# usable once every transaction that was running at the time has finished
+_watermark_samples: Deque[Tuple[int, int]] = deque(maxlen=256)
+
+LATEST_REVISION_SQL = text(
+    "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM appointments_revision_seq"
+)
+
+# A snapshot's xmax is the last completed xid + 1, so a transaction that
+# took its id later (and is still running) is neither below xmax nor listed.
+# age() measures from the next xid to be assigned without assigning one.
+SNAPSHOT_SQL = text("""
+    SELECT
+        pg_snapshot_xmin(snapshot)::text::bigint,
+        pg_snapshot_xmax(snapshot)::text::bigint + age(xid(pg_snapshot_xmax(snapshot)))
+    FROM pg_current_snapshot() AS snapshot
+""")
+
+
+async def safe_revision(db: AsyncSession) -> Tuple[int, int]:
+    """
+    Highest revision the change feed may hand out, and the latest taken.
+
+    A transaction gets its id before it takes a revision (enforced by
+    appointments_next_revision()), so every revision up to `latest`
+    belongs to a transaction below the next xid read afterwards (hence two
+    statements, in this order). Once the oldest running transaction
+    (`xmin`) is at or past that xid, those revisions are committed or
+    rolled back for good. Without concurrent writers that is the case
+    immediately. Call it from a transaction that hasn't written: age()
+    measures from the session's own xid once it has one.
+
+    Returns:
+        (safe, latest); safe < latest means writes are still in flight and
+        the caller should look again shortly
+    """
+    latest = (await db.execute(LATEST_REVISION_SQL)).scalar_one()
+    xmin, next_xid = (await db.execute(SNAPSHOT_SQL)).one()
+    if xmin >= next_xid:
+        _watermark_samples.clear()
+        return latest, latest
+
+    _watermark_samples.append((next_xid, latest))
+    safe = max(
+        (revision for sample_xid, revision in _watermark_samples if sample_xid <= xmin),
+        default=0
+    )
+    while _watermark_samples and _watermark_samples[0][0] <= xmin:
+        _watermark_samples.popleft()
+    if safe:
+        # Keep the best usable sample for the next call
+        _watermark_samples.appendleft((xmin, safe))
+    return safe, latest
+
+
+class ChangeNotifier:
+    """
+    Fan-out of appointment_changes notifications to in-process subscribers.
+
+    The LISTEN connection is opened on the first subscription, re-opened
+    with backoff if it drops (subscribers are woken so they catch up), and
+    closed by stop().
+    """
+
+    def __init__(self, channel: str = CHANGES_CHANNEL):
+        self.channel = channel
+        self._subscribers: Set[asyncio.Event] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.notifications = 0
+
+    @property
+    def dsn(self) -> str:
+        """Plain postgresql:// URL for a dedicated asyncpg connection
+        (LISTEN needs a session, so never through a transaction pooler)."""
+        return settings.direct_async_database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Event]:
+        """
+        Register for wake-ups.
+
+        Yields:
+            Event set on every notification; clear it before re-reading
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        event = asyncio.Event()
+        self._subscribers.add(event)
+        try:
+            yield event
+        finally:
+            self._subscribers.discard(event)
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._task is not None and not self._task.done(),
+            "subscribers": len(self._subscribers),
+            "notifications": self.notifications
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notification(self, *_args) -> None:
+        self.notifications += 1
+        self._wake_all()
+
+    def _wake_all(self) -> None:
+        for event in self._subscribers:
+            event.set()
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _connection: closed.set())
+                await connection.add_listener(self.channel, self._on_notification)
+                # Changes made while we were not listening
+                self._wake_all()
+                delay = 1.0
+                await closed.wait()
+            except Exception as exc:
+                # Anything but cancellation (stop()) must not end the task:
+                # subscribers would wait for notifications that never come
+                logger.warning("change notifier: %r; reconnecting in %.0fs", exc, delay)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    # Doesn't wait on (or raise from) a broken connection
+                    connection.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+change_notifier = ChangeNotifier()
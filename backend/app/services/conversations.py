@@ -0,0 +1,188 @@
+"""
+Conversation state and message log.
+
+Messages live in the append-only conversation_messages table instead of
+a JSON array on ConversationHistory, so appending a message never reads
+or rewrites the earlier ones and the agent only fetches the tail it needs.
+State changes are JSON merge patches applied inside the UPDATE, so the
+agent only sends the keys that changed.
+"""
+
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Row, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ConversationHistory, ConversationMessage
+
+
+# Everything but the legacy messages blob, which is never read back
+STATE_COLUMNS = (
+    ConversationHistory.id,
+    ConversationHistory.appointment_id,
+    ConversationHistory.patient_id,
+    ConversationHistory.state,
+    ConversationHistory.context,
+    ConversationHistory.created_at,
+    ConversationHistory.updated_at
+)
+
+
+async def get_conversation_state(db: AsyncSession, conversation_id: int) -> Optional[Row]:
+    """Conversation state row (STATE_COLUMNS), or None if it doesn't exist."""
+    result = await db.execute(
+        select(*STATE_COLUMNS).where(ConversationHistory.id == conversation_id)
+    )
+    return result.one_or_none()
+
+
+async def patch_conversation(
+    db: AsyncSession,
+    conversation_id: int,
+    state_patch: Optional[dict] = None,
+    context: Optional[str] = None,
+    new_messages: Sequence[dict] = ()
+) -> Optional[Row]:
+    """
+    Apply a partial update and append messages in one transaction.
+
+    The state patch follows RFC 7396: keys set to None are removed, nested
+    objects are merged, anything else replaces the stored value. It is
+    applied by jsonb_merge_patch() in the UPDATE, so the current state is
+    never read into Python and concurrent patches to different keys both
+    survive.
+
+    Args:
+        db: Database session (committed on success)
+        conversation_id: ID of the conversation
+        state_patch: Merge patch for `state` (None = leave unchanged)
+        context: New context text (None = leave unchanged)
+        new_messages: Messages to append, as dicts with role/content/payload
+
+    Returns:
+        Updated conversation state row, or None if the conversation doesn't exist
+    """
+    values = {"updated_at": func.now()}
+    if state_patch:
+        values["state"] = func.jsonb_merge_patch(
+            ConversationHistory.state,
+            literal(state_patch, JSONB),
+            type_=JSONB
+        )
+    if context is not None:
+        values["context"] = context
+
+    result = await db.execute(
+        update(ConversationHistory)
+        .where(ConversationHistory.id == conversation_id)
+        .values(**values)
+        .returning(*STATE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if row is None:
+        await db.rollback()
+        return None
+
+    if new_messages:
+        await db.execute(
+            insert(ConversationMessage).values([
+                {"conversation_id": conversation_id, **message}
+                for message in new_messages
+            ])
+        )
+
+    await db.commit()
+    return row
+
+
+async def append_message(
+    db: AsyncSession,
+    conversation_id: int,
+    role: str,
+    content: str,
+    payload: Optional[dict] = None
+) -> Optional[ConversationMessage]:
+    """
+    Append a message in one statement.
+
+    The INSERT is fed by an UPDATE of the conversation's updated_at, so a
+    missing conversation simply inserts nothing instead of raising a
+    foreign key error.
+
+    Args:
+        db: Database session (committed on success)
+        conversation_id: ID of the conversation
+        role: Sender role
+        content: Message text
+        payload: Optional extra data stored as JSONB
+
+    Returns:
+        The stored message, or None if the conversation doesn't exist
+    """
+    touched = (
+        update(ConversationHistory)
+        .where(ConversationHistory.id == conversation_id)
+        .values(updated_at=func.now())
+        .returning(ConversationHistory.id)
+        .cte("touched")
+    )
+    stmt = (
+        insert(ConversationMessage)
+        .from_select(
+            ["conversation_id", "role", "content", "payload"],
+            select(
+                touched.c.id,
+                literal(role),
+                literal(content),
+                literal(payload, ConversationMessage.payload.type)
+            )
+        )
+        .returning(ConversationMessage)
+    )
+
+    message = (await db.scalars(stmt)).one_or_none()
+    await db.commit()
+    return message
+
+
+async def last_messages(
+    db: AsyncSession,
+    conversation_id: int,
+    limit: int
+) -> List[ConversationMessage]:
+    """
+    Latest `limit` messages of a conversation, oldest first.
+
+    Read with a backward scan of
+    ix_conversation_messages_conversation_id_created_at, so the cost
+    depends on `limit`, not on the conversation's length.
+    """
+    result = await db.scalars(
+        select(ConversationMessage)
+        .where(ConversationMessage.conversation_id == conversation_id)
+        .order_by(ConversationMessage.created_at.desc(), ConversationMessage.id.desc())
+        .limit(limit)
+    )
+    messages = list(result)
+    messages.reverse()
+    return messages
+
+
+async def last_appointment_messages(
+    db: AsyncSession,
+    appointment_id: int,
+    limit: int
+) -> List[ConversationMessage]:
+    """Latest `limit` messages across an appointment's conversations, oldest first."""
+    result = await db.scalars(
+        select(ConversationMessage)
+        .join(ConversationHistory, ConversationMessage.conversation_id == ConversationHistory.id)
+        .where(ConversationHistory.appointment_id == appointment_id)
+        .order_by(ConversationMessage.created_at.desc(), ConversationMessage.id.desc())
+        .limit(limit)
+    )
+    messages = list(result)
+    messages.reverse()
+    return messages
@@ -0,0 +1,178 @@
+"""
+Background database health probe.
+
+Load balancers poll the health endpoints far more often than the database
+state changes. HealthMonitor probes the database on an interval with the
+async engine and keeps the result in memory, so a health request never
+blocks the event loop or takes a pool connection; the probe itself uses
+one connection every HEALTH_PROBE_INTERVAL_SECONDS.
+
+- live: the process is up and its event loop is serving requests
+- ready: the last probe succeeded and is recent; a probe older than
+  STALE_PROBES intervals (the probe loop is stuck) counts as not ready
+
+check_connection_budget() runs once at startup and compares the
+connections this configuration may open with what the server accepts.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database import async_engine, connection_budget, settings
+
+
+logger = logging.getLogger(__name__)
+
+
+STALE_PROBES = 3
+
+
+class HealthMonitor:
+    """Periodic SELECT 1 against the database, served from memory."""
+
+    def __init__(self, engine: AsyncEngine, interval_seconds: float, timeout_seconds: float):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.healthy: Optional[bool] = None  # None until the first probe
+        self.error: Optional[str] = None
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[datetime] = None
+        self.consecutive_failures = 0
+        self.probes = 0
+        self._checked_monotonic: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Probe once (so readiness is known right away), then keep probing."""
+        await self.probe()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def probe(self) -> None:
+        """Run one probe and record its outcome."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._select_one(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self._record(False, f"timed out after {self.timeout_seconds:g}s", started)
+        except Exception as exc:
+            self._record(False, str(exc), started)
+        else:
+            self._record(True, None, started)
+
+    async def _select_one(self) -> None:
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def _record(self, healthy: bool, error: Optional[str], started: float) -> None:
+        self.probes += 1
+        self.healthy = healthy
+        self.error = error
+        self.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.checked_at = datetime.utcnow()
+        self._checked_monotonic = time.monotonic()
+        self.consecutive_failures = 0 if healthy else self.consecutive_failures + 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.probe()
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self._checked_monotonic is None
+            or time.monotonic() - self._checked_monotonic > STALE_PROBES * self.interval_seconds
+        )
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.healthy) and not self.stale
+
+    @property
+    def status(self) -> str:
+        """"healthy", "unhealthy: <error>", "stale" or "unknown" (not probed yet)."""
+        if self.healthy is None:
+            return "unknown"
+        if self.stale:
+            return "stale"
+        return "healthy" if self.healthy else f"unhealthy: {self.error}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "consecutive_failures": self.consecutive_failures,
+            "probes": self.probes,
+            "interval_seconds": self.interval_seconds
+        }
+
+
+async def _server_connection_limits(engine: AsyncEngine):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(
+            "SELECT current_setting('max_connections')::int,"
+            " current_setting('superuser_reserved_connections')::int,"
+            " (SELECT count(*) FROM pg_stat_activity)"
+        ))).one()
+
+
+async def check_connection_budget(engine: AsyncEngine, timeout_seconds: float) -> Dict[str, Any]:
+    """
+    Log the effective connection budget next to the server's limits.
+
+    Warns when one node at full load (every API worker at pool_size +
+    max_overflow) would take more than the server's non-reserved
+    connections; several nodes need proportionally more headroom. Never
+    raises and never waits longer than `timeout_seconds`: an unreachable
+    database is reported, not fatal, and doesn't hold up startup.
+
+    Returns:
+        The logged report
+    """
+    report: Dict[str, Any] = {**connection_budget()}
+    try:
+        row = await asyncio.wait_for(_server_connection_limits(engine), timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        report["server"] = f"unavailable: timed out after {timeout_seconds:g}s"
+    except Exception as exc:
+        report["server"] = f"unavailable: {exc}"
+    else:
+        max_connections, reserved, in_use = row
+        report["server"] = {
+            "max_connections": max_connections,
+            "reserved": reserved,
+            "in_use": in_use
+        }
+        available = max_connections - reserved
+        if report["per_node"] is not None and report["per_node"] > available:
+            report["warning"] = (
+                f"up to {report['per_node']} connections per node but the server accepts "
+                f"{available}; lower DB_POOL_SIZE/DB_MAX_OVERFLOW or use DB_POOL_MODE=pgbouncer"
+            )
+    level = logging.WARNING if "warning" in report else logging.INFO
+    logger.log(level, "connection budget", extra={"fields": report})
+    return report
+
+
+health_monitor = HealthMonitor(
+    async_engine,
+    settings.health_probe_interval_seconds,
+    settings.health_probe_timeout_seconds
+)
@@ -0,0 +1,371 @@
+"""
+Bulk appointment import.
+
+Loads a clinic's existing agenda (CSV or NDJSON) in one transaction:
+
+1. Rows are read in chunks, and the patients a chunk references by phone
+   are resolved in a single query.
+2. Each chunk is validated with AppointmentCreate and streamed into a
+   temporary staging table with Postgres COPY. Only one chunk is held in
+   memory, and reading and validation run in the threadpool so a large
+   file doesn't block the event loop.
+3. Staged rows whose patient doesn't exist, or that would double-book a
+   doctor (against existing bookings or earlier rows of the same file),
+   are removed and reported.
+4. The remaining rows go into appointments with one INSERT ... SELECT.
+
+Invalid rows are reported per row and never abort the import.
+"""
+
+import csv
+import enum
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import String, any_, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Appointment, Patient
+from app.schemas import (
+    AppointmentCreate,
+    AppointmentImportResponse,
+    AppointmentImportRowError
+)
+from app.services.availability import calendar_cache
+from app.services.patients import normalize_phone
+from app.services.response_cache import upcoming_cache
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Row errors listed in the response; `failed` still counts all of them
+MAX_REPORTED_ERRORS = 1000
+
+STAGING_TABLE = "appointment_import"
+STAGING_COLUMNS = (
+    "row_no",
+    "patient_id",
+    "doctor_id",
+    "doctor_name",
+    "appointment_date",
+    "duration_minutes",
+    "notes"
+)
+
+
+class ImportFormat(str, enum.Enum):
+    """Supported upload formats."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[ImportFormat]:
+    """
+    Guess the upload format from the file name, then the content type.
+
+    Returns:
+        ImportFormat, or None if neither gives a hint
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return ImportFormat.CSV
+    if name.endswith((".ndjson", ".jsonl")):
+        return ImportFormat.NDJSON
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return ImportFormat.CSV
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return ImportFormat.NDJSON
+    return None
+
+
+def read_rows(stream: TextIO, import_format: ImportFormat) -> Iterator[Optional[dict]]:
+    """
+    Yield one dict per data row.
+
+    CSV files need a header row naming the columns (patient_id or
+    patient_phone, doctor_id, doctor_name, appointment_date and optionally
+    duration_minutes and notes); empty cells count as missing. NDJSON lines
+    that aren't a JSON object yield None so they can be reported by row.
+    """
+    if import_format == ImportFormat.CSV:
+        for row in csv.DictReader(stream):
+            yield {
+                key.strip(): value.strip()
+                for key, value in row.items()
+                if key and value is not None and value.strip() != ""
+            }
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def _validation_detail(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+async def _resolve_phones(db: AsyncSession, rows: List[Optional[dict]]) -> Dict[str, int]:
+    """
+    Map every patient_phone referenced by the rows to a patient id, in one
+    query. Keys are normalized (E.164) phones; numbers that don't
+    normalize are left for _validate_row to reject.
+    """
+    phones = set()
+    for row in rows:
+        if row and row.get("patient_id") is None and row.get("patient_phone"):
+            try:
+                phones.add(normalize_phone(str(row["patient_phone"])))
+            except ValueError:
+                pass
+    if not phones:
+        return {}
+
+    # One array parameter instead of an IN list: 100k phones would exceed
+    # the driver's bind parameter limit
+    result = await db.execute(
+        select(Patient.phone, Patient.id).where(
+            Patient.phone == any_(bindparam("phones", list(phones), type_=ARRAY(String)))
+        )
+    )
+    return {phone: patient_id for phone, patient_id in result}
+
+
+def _column_limit(name: str) -> Optional[int]:
+    return getattr(Appointment.__table__.c[name].type, "length", None)
+
+
+def _validate_row(row: Optional[dict], patients_by_phone: Dict[str, int]) -> Tuple[Optional[AppointmentCreate], Optional[str]]:
+    """Return (appointment, None) for a valid row or (None, reason)."""
+    if row is None:
+        return None, "Row is not a JSON object"
+
+    if row.get("patient_id") is None and row.get("patient_phone"):
+        try:
+            phone = normalize_phone(str(row["patient_phone"]))
+        except ValueError as error:
+            return None, f"patient_phone: {error}"
+        if phone not in patients_by_phone:
+            return None, f"No patient with phone {phone}"
+        row = {**row, "patient_id": patients_by_phone[phone]}
+
+    try:
+        appointment = AppointmentCreate.model_validate(row)
+    except ValidationError as error:
+        return None, _validation_detail(error)
+
+    # Checks the database would otherwise raise for the whole COPY
+    if appointment.duration_minutes <= 0:
+        return None, "duration_minutes: must be positive"
+    for name in ("doctor_id", "doctor_name", "notes"):
+        limit = _column_limit(name)
+        value = getattr(appointment, name)
+        if limit is not None and value is not None and len(value) > limit:
+            return None, f"{name}: longer than {limit} characters"
+
+    return appointment, None
+
+
+def _validate_chunk(
+    chunk: List[Optional[dict]],
+    first_row_no: int,
+    patients_by_phone: Dict[str, int]
+) -> Tuple[List[tuple], List[Tuple[int, str]]]:
+    """
+    Validate a chunk of rows (blocking: run it in the threadpool).
+
+    Returns:
+        (COPY records in STAGING_COLUMNS order, (row_no, reason) rejections)
+    """
+    records = []
+    rejected = []
+    for row_no, row in enumerate(chunk, first_row_no):
+        appointment, detail = _validate_row(row, patients_by_phone)
+        if detail:
+            rejected.append((row_no, detail))
+            continue
+        records.append((
+            row_no,
+            appointment.patient_id,
+            appointment.doctor_id,
+            appointment.doctor_name,
+            appointment.appointment_date,
+            appointment.duration_minutes,
+            appointment.notes
+        ))
+    return records, rejected
+
+
+async def _copy_to_staging(db: AsyncSession, records: List[tuple]) -> None:
+    """Stream records into the staging table with COPY (binary protocol)."""
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGING_TABLE,
+        records=records,
+        columns=STAGING_COLUMNS
+    )
+
+
+_CREATE_STAGING = text(f"""
+    CREATE TEMPORARY TABLE {STAGING_TABLE} (
+        row_no integer PRIMARY KEY,
+        patient_id integer NOT NULL,
+        doctor_id varchar(50) NOT NULL,
+        doctor_name varchar(255) NOT NULL,
+        appointment_date timestamptz NOT NULL,
+        duration_minutes integer NOT NULL,
+        notes varchar(1000)
+    ) ON COMMIT DROP
+""")
+
+_DROP_UNKNOWN_PATIENTS = text(f"""
+    DELETE FROM {STAGING_TABLE} s
+    WHERE NOT EXISTS (SELECT 1 FROM patients p WHERE p.id = s.patient_id)
+    RETURNING s.row_no, s.patient_id
+""")
+
+# Served by the partial GiST index behind the exclusion constraint
+_DROP_BOOKED_OVERLAPS = text(f"""
+    DELETE FROM {STAGING_TABLE} s
+    WHERE EXISTS (
+        SELECT 1 FROM appointments a
+        WHERE a.doctor_id = s.doctor_id
+          AND a.status IN ('PENDING', 'CONFIRMED')
+          AND a.booked_during && tstzrange(
+              s.appointment_date,
+              s.appointment_date + make_interval(mins => s.duration_minutes)
+          )
+    )
+    RETURNING s.row_no, s.doctor_id, s.appointment_date
+""")
+
+# A row overlaps an earlier row of the file if it starts before the latest
+# end among the doctor's previous rows (in date order, ties by row number)
+_DROP_FILE_OVERLAPS = text(f"""
+    WITH ordered AS (
+        SELECT row_no,
+               appointment_date,
+               max(appointment_date + make_interval(mins => duration_minutes)) OVER (
+                   PARTITION BY doctor_id
+                   ORDER BY appointment_date, row_no
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ) AS previous_end
+        FROM {STAGING_TABLE}
+    )
+    DELETE FROM {STAGING_TABLE} s
+    USING ordered o
+    WHERE s.row_no = o.row_no AND o.previous_end > o.appointment_date
+    RETURNING s.row_no, s.doctor_id, s.appointment_date
+""")
+
+_INSERT_FROM_STAGING = text(f"""
+    INSERT INTO appointments (
+        patient_id, doctor_id, doctor_name, appointment_date,
+        duration_minutes, status, notes
+    )
+    SELECT patient_id, doctor_id, doctor_name, appointment_date,
+           duration_minutes, 'PENDING', notes
+    FROM {STAGING_TABLE}
+    ORDER BY row_no
+""")
+
+
+async def import_appointments(
+    db: AsyncSession,
+    rows: Iterable[Optional[dict]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AppointmentImportResponse:
+    """
+    Validate and load appointments in one transaction.
+
+    Args:
+        db: Database session (committed on success)
+        rows: Parsed rows, e.g. from read_rows(); consumed lazily, one chunk
+            at a time in the threadpool. Row numbers in the report are
+            1-based positions in this sequence
+        chunk_size: Rows read, validated and copied per COPY call
+
+    Returns:
+        Import totals and the first MAX_REPORTED_ERRORS row errors
+
+    Raises:
+        IntegrityError: if a concurrent write double-booked a doctor between
+            the overlap check and the insert (nothing is imported)
+    """
+    rows = iter(rows)
+    errors: List[AppointmentImportRowError] = []
+    failed = 0
+
+    def reject(row_no: int, detail: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(AppointmentImportRowError(row=row_no, detail=detail))
+
+    await db.execute(_CREATE_STAGING)
+
+    received = 0
+    doctor_ids = set()
+    while True:
+        chunk = await run_in_threadpool(lambda: list(islice(rows, chunk_size)))
+        if not chunk:
+            break
+        patients_by_phone = await _resolve_phones(db, chunk)
+        records, rejected = await run_in_threadpool(
+            _validate_chunk, chunk, received + 1, patients_by_phone
+        )
+        received += len(chunk)
+        for row_no, detail in rejected:
+            reject(row_no, detail)
+        if records:
+            doctor_ids.update(record[2] for record in records)
+            await _copy_to_staging(db, records)
+
+    dropped = []
+    for row_no, patient_id in await db.execute(_DROP_UNKNOWN_PATIENTS):
+        dropped.append((row_no, f"Patient {patient_id} not found"))
+    for row_no, doctor_id, appointment_date in await db.execute(_DROP_BOOKED_OVERLAPS):
+        dropped.append((
+            row_no,
+            f"Doctor {doctor_id} already has an appointment overlapping "
+            f"{appointment_date.isoformat()}"
+        ))
+    for row_no, doctor_id, appointment_date in await db.execute(_DROP_FILE_OVERLAPS):
+        dropped.append((
+            row_no,
+            f"Overlaps an earlier row for doctor {doctor_id} at "
+            f"{appointment_date.isoformat()}"
+        ))
+    for row_no, detail in sorted(dropped):
+        reject(row_no, detail)
+
+    inserted = await db.execute(_INSERT_FROM_STAGING)
+    await db.commit()
+
+    for doctor_id in doctor_ids:
+        calendar_cache.invalidate(doctor_id)
+    if inserted.rowcount:
+        await upcoming_cache.invalidate()
+
+    errors.sort(key=lambda error: error.row)
+    return AppointmentImportResponse(
+        received=received,
+        imported=inserted.rowcount,
+        failed=failed,
+        errors=errors
+    )
@@ -0,0 +1,141 @@
+"""
+Outbound messaging clients for patient reminders.
+
+The reminder worker only depends on MessagingClient.send_reminder(), so the
+provider can be swapped: TwilioMessagingClient sends WhatsApp messages
+through the Twilio REST API, StubMessagingClient simulates latency and
+failures in-process for local runs and load tests.
+"""
+
+import asyncio
+import random
+import uuid
+from datetime import timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from app.database import settings
+from app.models import Appointment
+
+
+class MessagingError(Exception):
+    """
+    Sending failed.
+
+    Attributes:
+        retryable: Whether the same message may succeed on a later attempt
+            (timeouts, throttling, 5xx) or never will (invalid number)
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def reminder_message(appointment: Appointment) -> str:
+    """
+    Reminder text, same wording as the agent's WhatsApp reminder.
+
+    The date and time are shown in CLINIC_TIMEZONE (stored values are UTC).
+    """
+    local_date = appointment.appointment_date
+    if local_date.tzinfo is None:
+        local_date = local_date.replace(tzinfo=timezone.utc)
+    local_date = local_date.astimezone(ZoneInfo(settings.clinic_timezone))
+    return (
+        "🏥 *smartSalud - Recordatorio de Cita*\n\n"
+        "Tienes una cita programada:\n\n"
+        f"👨‍⚕️ Doctor: {appointment.doctor_name}\n"
+        f"📅 Fecha: {local_date:%d/%m/%Y}\n"
+        f"🕐 Hora: {local_date:%H:%M}\n\n"
+        "Por favor, confirma tu asistencia:\n\n"
+        "*Responde con:*\n"
+        "1️⃣ *CONFIRMAR* - Para confirmar tu cita\n"
+        "2️⃣ *CANCELAR* - Para cancelar y ver alternativas"
+    )
+
+
+class MessagingClient:
+    """Interface of a reminder sender."""
+
+    async def send_reminder(self, appointment: Appointment, reminder_type: str) -> str:
+        """
+        Send one reminder.
+
+        Args:
+            appointment: Appointment with its patient loaded
+            reminder_type: Kind of reminder (e.g. "48h_confirmation")
+
+        Returns:
+            Provider message id
+
+        Raises:
+            MessagingError: If the message was not accepted
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release connections held by the client."""
+
+
+class StubMessagingClient(MessagingClient):
+    """
+    In-process stand-in for the messaging provider.
+
+    Sleeps for a random latency and fails a fraction of the sends with a
+    retryable error, so retries, backoff and concurrency can be exercised
+    without network access. Sent messages are kept in `sent`.
+    """
+
+    def __init__(
+        self,
+        latency_ms: Tuple[float, float] = (50.0, 150.0),
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.sent: List[Tuple[int, str, str]] = []  # (appointment_id, reminder_type, sid)
+        self._random = random.Random(seed)
+
+    async def send_reminder(self, appointment: Appointment, reminder_type: str) -> str:
+        await asyncio.sleep(self._random.uniform(*self.latency_ms) / 1000)
+        if self._random.random() < self.failure_rate:
+            raise MessagingError("stub: simulated provider error (503)")
+        sid = f"SM{uuid.uuid4().hex}"
+        self.sent.append((appointment.id, reminder_type, sid))
+        return sid
+
+
+class TwilioMessagingClient(MessagingClient):
+    """WhatsApp reminders through the Twilio Messages REST API."""
+
+    API_URL = "https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json"
+
+    def __init__(self, account_sid: str, auth_token: str, from_number: str, timeout: float = 10.0):
+        self.url = self.API_URL.format(account_sid=account_sid)
+        self.from_number = from_number
+        self._client = httpx.AsyncClient(auth=(account_sid, auth_token), timeout=timeout)
+
+    async def send_reminder(self, appointment: Appointment, reminder_type: str) -> str:
+        try:
+            response = await self._client.post(self.url, data={
+                "From": self.from_number,
+                "To": f"whatsapp:{appointment.patient.phone}",
+                "Body": reminder_message(appointment)
+            })
+        except httpx.HTTPError as exc:
+            raise MessagingError(f"twilio: {exc!r}") from exc
+
+        if response.status_code >= 400:
+            # 429 and 5xx are transient; other 4xx (bad number, auth) are not
+            raise MessagingError(
+                f"twilio: {response.status_code} {response.text[:200]}",
+                retryable=response.status_code == 429 or response.status_code >= 500
+            )
+        return response.json()["sid"]
+
+    async def close(self) -> None:
+        await self._client.aclose()
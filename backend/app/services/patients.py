@@ -0,0 +1,113 @@
+"""
+Patient lookup by phone for inbound WhatsApp messages.
+
+Every inbound message has to be mapped to a patient. Phones are
+normalized to E.164 ("+56...") so every spelling of a number maps to the
+same row; numbers without an international prefix are rejected. Known numbers are resolved with a plain SELECT on the unique
+phone index (no row lock, no new row version); unknown numbers are
+registered with INSERT ... ON CONFLICT (phone) DO NOTHING RETURNING, and a
+concurrent registration of the same number is picked up by re-selecting.
+The resulting id is kept in a per-worker TTL cache so a conversation's
+follow-up messages don't touch the database at all.
+"""
+
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import settings
+from app.models import Patient
+from app.services.cache import LRUCache
+
+
+class PatientLookup(NamedTuple):
+    """Result of resolving a phone number."""
+
+    patient_id: int
+    created: bool
+
+
+# phone -> patient id. Phones are never reassigned by the API, so entries
+# only go stale if patients are deleted out of band; the TTL bounds that.
+patient_id_cache = LRUCache(
+    maxsize=settings.patient_cache_max_entries,
+    ttl_seconds=settings.patient_cache_ttl_seconds
+)
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Normalize an international phone number to E.164.
+
+    Strips the Twilio "whatsapp:" prefix and formatting characters, and
+    writes the international prefix as "+" ("0056..." and "+56..." are the
+    same number).
+
+    Args:
+        phone: Phone number with its "+" or "00" international prefix
+
+    Returns:
+        "+" followed by the digits
+
+    Raises:
+        ValueError: if the international prefix is missing (a national
+            number such as 912345678 would be read as another country
+            code) or the number has characters other than digits
+    """
+    phone = phone.strip()
+    if phone.lower().startswith("whatsapp:"):
+        phone = phone[len("whatsapp:"):]
+    phone = "".join(char for char in phone if char not in " -().")
+    if phone.startswith("+"):
+        digits = phone[1:]
+    elif phone.startswith("00"):
+        digits = phone[2:]
+    else:
+        raise ValueError("phone must start with + or 00 and the country code")
+    if not digits.isdigit():
+        raise ValueError("phone must contain only digits after the prefix")
+    return "+" + digits
+
+
+async def lookup_or_create_patient(
+    db: AsyncSession,
+    phone: str,
+    name: Optional[str] = None
+) -> PatientLookup:
+    """
+    Resolve a phone number to a patient id, registering unknown numbers.
+
+    Existing patients are never modified: `name` is only used when the
+    patient is created (falling back to the phone number).
+
+    Args:
+        db: Database session (committed when a patient was inserted)
+        phone: E.164 phone number, already normalized
+        name: Display name for a new patient, e.g. the WhatsApp profile name
+
+    Returns:
+        PatientLookup with the id and whether the patient was just created
+    """
+    patient_id = patient_id_cache.get(phone)
+    if patient_id is not None:
+        return PatientLookup(patient_id, False)
+
+    lookup = select(Patient.id).where(Patient.phone == phone)
+    patient_id = (await db.execute(lookup)).scalar_one_or_none()
+    created = False
+    if patient_id is None:
+        insert_stmt = insert(Patient).values(name=name or phone, phone=phone)
+        insert_stmt = insert_stmt.on_conflict_do_nothing(
+            index_elements=[Patient.phone]
+        ).returning(Patient.id)
+        patient_id = (await db.execute(insert_stmt)).scalar_one_or_none()
+        await db.commit()
+        created = patient_id is not None
+        if patient_id is None:
+            # Registered by a concurrent request since our SELECT
+            patient_id = (await db.execute(lookup)).scalar_one()
+
+    patient_id_cache.set(phone, patient_id)
+    return PatientLookup(patient_id, created)
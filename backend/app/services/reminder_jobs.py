@@ -0,0 +1,326 @@
+"""
+Postgres-backed queue of reminder jobs.
+
+The due-reminder scan (ix_appointments_reminder_due) turns appointments
+into reminder_jobs rows; workers claim runnable jobs in batches with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of app.worker processes
+can share the queue without handing out a job twice. A claimed job carries
+a lease: if its worker dies, the job goes back to PENDING once the lease
+expires. Failed sends are retried with exponential backoff until
+max_attempts, then the job is FAILED.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+
+from app.database import settings
+from app.models import Appointment, ReminderJob
+from app.models.appointment import AppointmentStatus
+from app.models.reminder_job import ReminderJobStatus
+from app.services.reminders import reminder_sent_values
+
+
+DEFAULT_REMINDER_TYPE = "48h_confirmation"
+
+
+def retry_delay(attempts: int, base_seconds: float, max_seconds: float) -> float:
+    """
+    Backoff before the next attempt: base * 2^(attempts - 1), capped, with
+    "equal jitter" (50-100% of the delay) so retries of jobs that failed
+    together don't hit the provider together again.
+    """
+    delay = min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def enqueue_due_reminders(
+    db: AsyncSession,
+    hours: int = 48,
+    reminder_type: str = DEFAULT_REMINDER_TYPE,
+    status_filter: AppointmentStatus = AppointmentStatus.PENDING,
+    max_attempts: Optional[int] = None
+) -> int:
+    """
+    Create a job for every appointment due a reminder of `reminder_type`.
+
+    One INSERT ... SELECT over the partial index of not-yet-reminded
+    appointments; appointments that already have a job of this type are
+    skipped by the unique constraint, so the scan can run as often as
+    needed.
+
+    Args:
+        db: Database session (committed on success)
+        hours: Look-ahead window in hours
+        reminder_type: Kind of reminder to enqueue
+        status_filter: Status of appointments to remind
+        max_attempts: Attempts per job (default: settings.reminder_max_attempts)
+
+    Returns:
+        Number of jobs created
+    """
+    if max_attempts is None:
+        max_attempts = settings.reminder_max_attempts
+
+    now = datetime.now(timezone.utc)
+    due = select(
+        Appointment.id,
+        literal(reminder_type),
+        literal(max_attempts)
+    ).where(
+        Appointment.status == status_filter,
+        Appointment.appointment_date >= now,
+        Appointment.appointment_date <= now + timedelta(hours=hours),
+        Appointment.reminder_sent_at.is_(None)
+    )
+    result = await db.execute(
+        insert(ReminderJob)
+        .from_select(["appointment_id", "reminder_type", "max_attempts"], due)
+        .on_conflict_do_nothing(constraint="uq_reminder_jobs_appointment_id_reminder_type")
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def discard_reminder_jobs(db: AsyncSession, appointment_ids: Iterable[int]) -> int:
+    """
+    Delete the reminder jobs of rescheduled appointments.
+
+    The unique (appointment_id, reminder_type) key would otherwise keep a
+    finished job for the old date in place and the new date could never be
+    enqueued. A job still RUNNING loses its row, so its worker's
+    complete_reminder_job() writes nothing.
+
+    Args:
+        db: Database session (not committed: runs in the caller's transaction)
+        appointment_ids: Rescheduled appointments
+
+    Returns:
+        Number of jobs deleted
+    """
+    appointment_ids = list(appointment_ids)
+    if not appointment_ids:
+        return 0
+    result = await db.execute(
+        delete(ReminderJob).where(ReminderJob.appointment_id.in_(appointment_ids))
+    )
+    return result.rowcount
+
+
+async def claim_reminder_jobs(
+    db: AsyncSession,
+    worker_id: str,
+    limit: int,
+    lease_seconds: Optional[int] = None
+) -> List[ReminderJob]:
+    """
+    Claim up to `limit` runnable jobs for `worker_id`.
+
+    Jobs whose lease expired are first put back (or FAILED when out of
+    attempts). The claim itself is one statement: the runnable scan on
+    ix_reminder_jobs_runnable with SKIP LOCKED, the RUNNING update, and the
+    appointment and patient the sender needs.
+
+    Args:
+        db: Database session (committed on success)
+        worker_id: Id recorded in locked_by
+        limit: Maximum number of jobs to claim
+        lease_seconds: How long a claim is valid
+            (default: settings.reminder_lease_seconds)
+
+    Returns:
+        Claimed jobs, oldest run_at first, with appointment and patient loaded
+    """
+    if lease_seconds is None:
+        lease_seconds = settings.reminder_lease_seconds
+
+    out_of_attempts = ReminderJob.attempts >= ReminderJob.max_attempts
+    await db.execute(
+        update(ReminderJob)
+        .where(
+            ReminderJob.status == ReminderJobStatus.RUNNING,
+            ReminderJob.locked_at < func.now() - timedelta(seconds=lease_seconds)
+        )
+        .values(
+            status=case(
+                (out_of_attempts, ReminderJobStatus.FAILED.value),
+                else_=ReminderJobStatus.PENDING.value
+            ).cast(ReminderJob.status.type),
+            finished_at=case((out_of_attempts, func.now())),
+            last_error="lease expired",
+            locked_at=None,
+            locked_by=None
+        )
+    )
+
+    runnable = (
+        select(ReminderJob.id)
+        .where(
+            ReminderJob.status == ReminderJobStatus.PENDING,
+            ReminderJob.run_at <= func.now()
+        )
+        .order_by(ReminderJob.run_at, ReminderJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .cte("runnable_jobs")
+    )
+    claimed = (
+        update(ReminderJob)
+        .where(ReminderJob.id == runnable.c.id)
+        .values(
+            status=ReminderJobStatus.RUNNING,
+            locked_at=func.now(),
+            locked_by=worker_id,
+            attempts=ReminderJob.attempts + 1
+        )
+        .returning(*ReminderJob.__table__.c)
+        .cte("claimed_jobs")
+    )
+    claimed_job = aliased(ReminderJob, claimed)
+
+    result = await db.execute(
+        select(claimed_job)
+        .options(joinedload(claimed_job.appointment).joinedload(Appointment.patient))
+        .order_by(claimed_job.run_at, claimed_job.id)
+        .execution_options(populate_existing=True)
+    )
+    jobs = result.scalars().all()
+    await db.commit()
+    return jobs
+
+
+def _owned_by(job: ReminderJob):
+    """Only the worker still holding the job may finish it."""
+    return (
+        ReminderJob.id == job.id,
+        ReminderJob.status == ReminderJobStatus.RUNNING,
+        ReminderJob.locked_by == job.locked_by
+    )
+
+
+async def complete_reminder_job(
+    db: AsyncSession,
+    job: ReminderJob,
+    message_sid: Optional[str]
+) -> bool:
+    """
+    Mark a job SENT and record the reminder on its appointment.
+
+    One statement updates both rows. Nothing is written if the job's lease
+    was lost to another worker in the meantime.
+
+    Args:
+        db: Database session (committed on success)
+        job: Job returned by claim_reminder_jobs
+        message_sid: Provider message id
+
+    Returns:
+        True if the job was still held and is now SENT
+    """
+    done = (
+        update(ReminderJob)
+        .where(*_owned_by(job))
+        .values(
+            status=ReminderJobStatus.SENT,
+            message_sid=message_sid,
+            finished_at=func.now(),
+            last_error=None,
+            locked_at=None,
+            locked_by=None
+        )
+        .returning(ReminderJob.appointment_id)
+        .cte("done_job")
+    )
+    result = await db.execute(
+        update(Appointment)
+        .where(Appointment.id == done.c.appointment_id)
+        .values(**reminder_sent_values(
+            message_sid=message_sid,
+            reminder_type=job.reminder_type
+        ))
+        .returning(Appointment.id)
+        .execution_options(synchronize_session=False)
+    )
+    held = result.first() is not None
+    await db.commit()
+    return held
+
+
+async def skip_reminder_job(db: AsyncSession, job: ReminderJob, reason: str) -> bool:
+    """
+    Finish a job without sending (appointment cancelled or reminded meanwhile).
+
+    Returns:
+        True if the job was still held and is now SKIPPED
+    """
+    result = await db.execute(
+        update(ReminderJob)
+        .where(*_owned_by(job))
+        .values(
+            status=ReminderJobStatus.SKIPPED,
+            finished_at=func.now(),
+            last_error=reason,
+            locked_at=None,
+            locked_by=None
+        )
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def fail_reminder_job(
+    db: AsyncSession,
+    job: ReminderJob,
+    error: str,
+    retryable: bool = True,
+    base_seconds: Optional[float] = None,
+    max_seconds: Optional[float] = None
+) -> Optional[ReminderJobStatus]:
+    """
+    Record a failed attempt: reschedule with backoff, or give up.
+
+    Args:
+        db: Database session (committed on success)
+        job: Job returned by claim_reminder_jobs
+        error: Error message to store in last_error
+        retryable: False for permanent errors (the job fails right away)
+        base_seconds: Delay before the first retry
+            (default: settings.reminder_retry_base_seconds)
+        max_seconds: Upper bound of the delay
+            (default: settings.reminder_retry_max_seconds)
+
+    Returns:
+        PENDING if a retry was scheduled, FAILED if not, None if the job
+        was no longer held by this worker
+    """
+    if base_seconds is None:
+        base_seconds = settings.reminder_retry_base_seconds
+    if max_seconds is None:
+        max_seconds = settings.reminder_retry_max_seconds
+
+    if retryable and job.attempts < job.max_attempts:
+        new_status = ReminderJobStatus.PENDING
+        delay = retry_delay(job.attempts, base_seconds, max_seconds)
+        values = {"run_at": func.now() + timedelta(seconds=delay)}
+    else:
+        new_status = ReminderJobStatus.FAILED
+        values = {"finished_at": func.now()}
+
+    result = await db.execute(
+        update(ReminderJob)
+        .where(*_owned_by(job))
+        .values(
+            status=new_status,
+            last_error=error[:1000],
+            locked_at=None,
+            locked_by=None,
+            **values
+        )
+    )
+    await db.commit()
+    return new_status if result.rowcount else None
@@ -0,0 +1,175 @@
+"""
+Appointment reminder bookkeeping.
+
+Several reminder workers (cron instances, app.worker processes) may look
+for due reminders at the same time. A claim takes the next due rows with
+SELECT ... FOR UPDATE SKIP LOCKED and stamps them with a lease in the same
+statement, so concurrent claimers get disjoint batches without waiting on
+each other. Marking a reminder as sent is idempotent: the first mark wins
+and repeated calls (retries, duplicate webhooks) change nothing.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+
+from app.database import settings
+from app.models import Appointment
+from app.models.appointment import AppointmentStatus
+
+
+async def claim_due_reminders(
+    db: AsyncSession,
+    limit: int,
+    hours: int = 48,
+    status_filter: AppointmentStatus = AppointmentStatus.PENDING,
+    lease_seconds: Optional[int] = None,
+    max_attempts: Optional[int] = None
+) -> List[Appointment]:
+    """
+    Claim up to `limit` appointments whose reminder is due.
+
+    Due means: in the next `hours`, in `status_filter`, not reminded yet,
+    not claimed within the lease, and claimed fewer than `max_attempts`
+    times. The candidate scan runs on the partial index
+    ix_appointments_reminder_due; the claim, attempt count and patient
+    join happen in the same statement.
+
+    Args:
+        db: Database session (committed on success)
+        limit: Maximum number of reminders to claim
+        hours: Look-ahead window in hours
+        status_filter: Status of appointments to remind
+        lease_seconds: How long a claim blocks other workers
+            (default: settings.reminder_lease_seconds)
+        max_attempts: Claims allowed per appointment
+            (default: settings.reminder_max_attempts)
+
+    Returns:
+        Claimed appointments with their patient, ordered by date
+    """
+    if lease_seconds is None:
+        lease_seconds = settings.reminder_lease_seconds
+    if max_attempts is None:
+        max_attempts = settings.reminder_max_attempts
+
+    now = datetime.now(timezone.utc)
+    due = (
+        select(Appointment.id)
+        .where(
+            Appointment.status == status_filter,
+            Appointment.appointment_date >= now,
+            Appointment.appointment_date <= now + timedelta(hours=hours),
+            Appointment.reminder_sent_at.is_(None),
+            or_(
+                Appointment.reminder_claimed_at.is_(None),
+                Appointment.reminder_claimed_at < func.now() - timedelta(seconds=lease_seconds)
+            ),
+            Appointment.reminder_attempts < max_attempts
+        )
+        .order_by(Appointment.appointment_date, Appointment.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .cte("due_reminders")
+    )
+    claimed = (
+        update(Appointment)
+        .where(Appointment.id == due.c.id)
+        .values(
+            reminder_claimed_at=func.now(),
+            reminder_attempts=Appointment.reminder_attempts + 1
+        )
+        .returning(*Appointment.__table__.c)
+        .cte("claimed_reminders")
+    )
+    claimed_appointment = aliased(Appointment, claimed)
+
+    result = await db.execute(
+        select(claimed_appointment)
+        .options(joinedload(claimed_appointment.patient))
+        .order_by(claimed_appointment.appointment_date, claimed_appointment.id)
+    )
+    appointments = result.scalars().all()
+    await db.commit()
+    return appointments
+
+
+def reminder_sent_values(
+    sent_at: Optional[datetime] = None,
+    message_sid: Optional[str] = None,
+    reminder_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    SET clause recording a sent reminder on appointments.
+
+    Each column keeps its stored value if it has one (first mark wins), and
+    the claim lease is released.
+    """
+    return {
+        "reminder_sent_at": func.coalesce(
+            Appointment.reminder_sent_at,
+            sent_at if sent_at is not None else func.now()
+        ),
+        "reminder_message_sid": func.coalesce(Appointment.reminder_message_sid, message_sid),
+        "reminder_type": func.coalesce(Appointment.reminder_type, reminder_type),
+        "reminder_claimed_at": None
+    }
+
+
+def reminder_reset_values() -> Dict[str, Any]:
+    """
+    SET clause clearing an appointment's reminder bookkeeping.
+
+    Applied when an appointment is rescheduled, so the reminder for the
+    new date is due (and claimable) again.
+    """
+    return {
+        "reminder_sent_at": None,
+        "reminder_attempts": 0,
+        "reminder_claimed_at": None,
+        "reminder_message_sid": None,
+        "reminder_type": None
+    }
+
+
+async def mark_reminder_sent(
+    db: AsyncSession,
+    appointment_id: int,
+    sent_at: Optional[datetime] = None,
+    message_sid: Optional[str] = None,
+    reminder_type: Optional[str] = None
+) -> Optional[Appointment]:
+    """
+    Record that an appointment's reminder went out (idempotent).
+
+    Values already stored are kept, so a retried or duplicated call leaves
+    the row as the first call wrote it. The claim lease is released.
+
+    Args:
+        db: Database session (committed on success)
+        appointment_id: ID of the appointment
+        sent_at: When the reminder was sent (default: now)
+        message_sid: Provider message id
+        reminder_type: Kind of reminder
+
+    Returns:
+        Updated appointment with its patient, or None if it doesn't exist
+    """
+    marked = (
+        update(Appointment)
+        .where(Appointment.id == appointment_id)
+        .values(**reminder_sent_values(sent_at, message_sid, reminder_type))
+        .returning(*Appointment.__table__.c)
+        .cte("marked_reminder")
+    )
+    marked_appointment = aliased(Appointment, marked)
+
+    result = await db.execute(
+        select(marked_appointment).options(joinedload(marked_appointment.patient))
+    )
+    appointment = result.scalar_one_or_none()
+    await db.commit()
+    return appointment
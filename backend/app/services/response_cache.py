@@ -0,0 +1,344 @@
+"""
+Read-through cache of serialized API responses.
+
+Hot, parameter-identical reads (the /upcoming window polled by cron, the
+dashboard and the agent) are served from a cache of their JSON body and
+ETag. Storage is pluggable:
+
+- "memory" (default): per-process LRUCache with TTL
+- "redis": any client with the redis.asyncio get/set/incr API, shared by
+  every API process (needs the optional redis package and REDIS_URL)
+- "fakeredis": in-process FakeRedis behind the Redis backend, to exercise
+  that code path without a server
+- "none": no caching
+
+Entries live under a generation number. A write invalidates every entry
+of a cache with one INCR of the generation instead of finding and deleting
+keys, and a read that raced with the write stores its result under the old
+generation, where nobody looks anymore. Writes made by other processes are
+only seen by a per-process backend after the TTL.
+
+Concurrent misses of the same key in one process share a single load.
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.database import settings
+from app.services.cache import LRUCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Minimal key-value interface the response cache needs."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Value stored under `key`, or None if absent or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """Store `value` under `key` for `ttl_seconds`."""
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Atomically increment a counter (0 if absent) and return it."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend on LRUCache. Counters are kept outside the LRU so
+    they are never evicted."""
+
+    def __init__(self, maxsize: int):
+        self.entries = LRUCache(maxsize)
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.entries.set(key, value, ttl_seconds)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self.entries), "maxsize": self.entries.maxsize}
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend on a Redis (or Redis-compatible) server, shared by processes."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl_seconds * 1000), 1))
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"client": type(self.client).__name__}
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class FakeRedis:
+    """
+    In-process stand-in for redis.asyncio.Redis: the subset of commands
+    RedisCacheBackend uses, with the same types and expiry semantics.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(
+        self,
+        key: str,
+        value,
+        ex: Optional[int] = None,
+        px: Optional[int] = None
+    ) -> bool:
+        if isinstance(value, str):
+            value = value.encode()
+        elif isinstance(value, int):
+            value = str(value).encode()
+        expires_at = None
+        if ex is not None:
+            expires_at = time.monotonic() + ex
+        elif px is not None:
+            expires_at = time.monotonic() + px / 1000
+        self._data[key] = (value, expires_at)
+        return True
+
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        expires_at = self._data[key][1] if key in self._data else None
+        self._data[key] = (str(value).encode(), expires_at)
+        return value
+
+    async def aclose(self) -> None:
+        self._data.clear()
+
+
+def build_backend(kind: str, maxsize: int, redis_url: str = "") -> Optional[CacheBackend]:
+    """
+    Backend for a RESPONSE_CACHE_BACKEND value.
+
+    Raises:
+        ValueError: Unknown kind, or redis without REDIS_URL
+        RuntimeError: redis requested but the redis package is not installed
+    """
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return MemoryCacheBackend(maxsize)
+    if kind == "fakeredis":
+        return RedisCacheBackend(FakeRedis())
+    if kind == "redis":
+        if not redis_url:
+            raise ValueError("RESPONSE_CACHE_BACKEND=redis requires REDIS_URL")
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "RESPONSE_CACHE_BACKEND=redis requires the redis package (pip install redis)"
+            ) from exc
+        return RedisCacheBackend(redis.Redis.from_url(redis_url))
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {kind!r}")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Serialized response body and its ETag."""
+
+    body: bytes
+    etag: str
+
+    def encode(self) -> bytes:
+        return self.etag.encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "CachedResponse":
+        etag, body = raw.split(b"\n", 1)
+        return cls(body, etag.decode())
+
+
+class ResponseCache:
+    """
+    Read-through cache of CachedResponse values for one endpoint.
+
+    Backend errors never fail a request: they count as a miss (or a lost
+    invalidation, bounded by the TTL) and are counted in `errors`.
+
+    Attributes:
+        hits / misses / loads / coalesced / invalidations / errors:
+            Counters for /health
+    """
+
+    def __init__(self, name: str, backend: Optional[CacheBackend], ttl_seconds: float):
+        self.name = name
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{self.name}:generation"
+
+    async def _entry_key(self, key: Tuple[Hashable, ...]) -> str:
+        generation = await self._call(self.backend.get(self._generation_key))
+        return ":".join([self.name, (generation or b"0").decode(), *map(str, key)])
+
+    async def get(self, key: Tuple[Hashable, ...]) -> Optional[CachedResponse]:
+        """
+        Cached response for `key`, or None on a miss.
+
+        Args:
+            key: Request parameters identifying the response
+        """
+        if self.backend is None:
+            return None
+        raw = await self._call(self.backend.get(await self._entry_key(key)))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse.decode(raw)
+
+    async def load(
+        self,
+        key: Tuple[Hashable, ...],
+        load: Callable[[], Awaitable[CachedResponse]]
+    ) -> CachedResponse:
+        """
+        Build the response for `key` with `load` and cache it.
+
+        The generation is read before `load` runs, so a write committed
+        meanwhile leaves the result under a generation nobody reads.
+
+        Args:
+            key: Request parameters identifying the response
+            load: Builds the response from the database
+
+        Returns:
+            Freshly loaded response (shared with concurrent callers)
+        """
+        if self.backend is None:
+            return await load()
+        entry_key = await self._entry_key(key)
+
+        pending = self._loading.get(entry_key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The loading request went away; load for this one instead
+                return await load()
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[entry_key] = future
+        try:
+            response = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; don't warn when there were none
+            future.exception()
+            raise
+        finally:
+            del self._loading[entry_key]
+        self.loads += 1
+        future.set_result(response)
+
+        await self._call(self.backend.set(entry_key, response.encode(), self.ttl_seconds))
+        return response
+
+    async def invalidate(self) -> None:
+        """Drop every entry (call after committing a write)."""
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        await self._call(self.backend.incr(self._generation_key))
+
+    async def _call(self, operation: Awaitable) -> Any:
+        try:
+            return await operation
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("%s cache: %r", self.name, exc)
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **(self.backend.stats() if self.backend else {})
+        }
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+upcoming_cache = ResponseCache(
+    "upcoming",
+    build_backend(
+        settings.response_cache_backend,
+        settings.upcoming_cache_max_entries,
+        settings.redis_url
+    ),
+    settings.upcoming_cache_ttl_seconds
+)
@@ -0,0 +1,60 @@
+"""
+Appointment status transitions.
+
+Single source of truth for which status changes the API allows, shared by
+the per-appointment endpoints and the batch endpoint.
+"""
+
+import enum
+from typing import Dict, FrozenSet, NamedTuple
+
+from app.models.appointment import AppointmentStatus
+
+
+class AppointmentAction(str, enum.Enum):
+    """Status-changing actions the agent can apply to an appointment."""
+
+    CONFIRM = "confirm"
+    UNCONFIRM = "unconfirm"
+    CANCEL = "cancel"
+    RESCHEDULE = "reschedule"
+
+
+class Transition(NamedTuple):
+    """Target status of an action and the statuses it may start from."""
+
+    target: AppointmentStatus
+    allowed_from: FrozenSet[AppointmentStatus]
+
+
+# Repeating an action is allowed (confirming a CONFIRMED appointment is a
+# no-op), so retried WhatsApp webhooks don't fail. Appointments that already
+# took place (COMPLETED, NO_SHOW) are final.
+TRANSITIONS: Dict[AppointmentAction, Transition] = {
+    AppointmentAction.CONFIRM: Transition(
+        target=AppointmentStatus.CONFIRMED,
+        allowed_from=frozenset({AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED})
+    ),
+    AppointmentAction.UNCONFIRM: Transition(
+        target=AppointmentStatus.PENDING,
+        allowed_from=frozenset({AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED})
+    ),
+    AppointmentAction.CANCEL: Transition(
+        target=AppointmentStatus.CANCELLED,
+        allowed_from=frozenset({
+            AppointmentStatus.PENDING,
+            AppointmentStatus.CONFIRMED,
+            AppointmentStatus.CANCELLED
+        })
+    ),
+    # Rescheduling resets to PENDING; a cancelled appointment can be rebooked
+    # from the alternatives flow
+    AppointmentAction.RESCHEDULE: Transition(
+        target=AppointmentStatus.PENDING,
+        allowed_from=frozenset({
+            AppointmentStatus.PENDING,
+            AppointmentStatus.CONFIRMED,
+            AppointmentStatus.CANCELLED
+        })
+    ),
+}
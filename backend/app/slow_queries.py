@@ -0,0 +1,262 @@
+"""
+Sampled slow-query log.
+
+Replaces engine echo (every statement printed synchronously) with a log of
+the statements that matter. Cursor hooks on every engine time each
+statement; one slower than SLOW_QUERY_THRESHOLD_MS is kept with a
+probability of SLOW_QUERY_SAMPLE_RATE as a structured entry:
+
+    {"at", "duration_ms", "operation", "statement", "parameters",
+     "executemany", "rowcount", "request", "plan"}
+
+Entries go to a ring buffer of the last SLOW_QUERY_LOG_SIZE offenders
+(GET /admin/slow-queries) and are logged as WARNING records under
+app.slow_queries (one JSON line each with LOG_FORMAT=json).
+
+With SLOW_QUERY_EXPLAIN on, a sampled plain SELECT seen by the API's
+async engine is re-run as EXPLAIN (ANALYZE, BUFFERS) in the background,
+on another pooled connection, in a READ ONLY transaction that is rolled
+back. The plan is attached to the entry once it finishes. ANALYZE runs
+the query again, so keep the sample rate low when enabling it. Statements
+that lock rows or can write are never explained, and only one EXPLAIN runs
+at a time.
+
+Parameters are logged as bound (patient phones and names included), which
+is why the admin endpoint requires ADMIN_TOKEN.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import async_engine, settings
+from app.metrics import current_request
+
+
+logger = logging.getLogger(__name__)
+
+
+MAX_STATEMENT_CHARS = 4000
+MAX_PARAMETER_CHARS = 200
+MAX_PARAMETER_SETS = 3  # executemany: first parameter sets only
+EXPLAIN_TIMEOUT_MS = 10_000
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS) "
+
+# Set inside the EXPLAIN task so its own statements aren't logged
+_in_explain: contextvars.ContextVar[bool] = contextvars.ContextVar("in_explain", default=False)
+
+_SELECT = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_LOCKING = re.compile(r"\bFOR\s+(UPDATE|NO\s+KEY\s+UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + f"... ({len(text)} chars)"
+
+
+def _loggable(value: Any) -> Any:
+    """JSON-safe, size-bounded form of a bound parameter."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return _truncate(value, MAX_PARAMETER_CHARS)
+    if isinstance(value, (list, tuple)):
+        return [_loggable(item) for item in value[:20]] + (["..."] if len(value) > 20 else [])
+    return _truncate(str(value), MAX_PARAMETER_CHARS)
+
+
+def _loggable_parameters(parameters: Any, executemany: bool) -> Any:
+    if executemany:
+        return [_loggable_parameters(p, False) for p in list(parameters)[:MAX_PARAMETER_SETS]]
+    if isinstance(parameters, dict):
+        return {key: _loggable(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_loggable(value) for value in parameters]
+    return _loggable(parameters)
+
+
+def explainable(statement: str) -> bool:
+    """Plain SELECTs only: ANALYZE executes the statement."""
+    return bool(_SELECT.match(statement)) and not _LOCKING.search(statement)
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of sampled slow statements.
+
+    Attributes:
+        slow: Statements over the threshold
+        sampled: Of those, entries recorded
+        explained / explain_errors / explain_skipped: EXPLAIN outcomes
+            (skipped while another EXPLAIN is running)
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        sample_rate: float,
+        size: int,
+        explain: bool = False
+    ):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain = explain
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.slow = 0
+        self.sampled = 0
+        self.explained = 0
+        self.explain_errors = 0
+        self.explain_skipped = 0
+        self._explaining = False
+        self._explain_task: Optional[asyncio.Task] = None
+
+    def observe(
+        self,
+        elapsed_seconds: float,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        rowcount: Optional[int],
+        explain_engine=None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Record a statement if it is slow and sampled.
+
+        Args:
+            elapsed_seconds: Cursor execution time
+            statement: SQL as sent to the driver
+            parameters: Bound parameters as sent to the driver
+            executemany: Whether `parameters` holds several parameter sets
+            rowcount: Cursor rowcount, when the driver reports one
+            explain_engine: Async engine to EXPLAIN with, None to skip
+
+        Returns:
+            The recorded entry, or None
+        """
+        duration_ms = elapsed_seconds * 1000
+        if duration_ms < self.threshold_ms:
+            return None
+        self.slow += 1
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        self.sampled += 1
+
+        request = current_request()
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration_ms, 2),
+            "operation": (statement.lstrip().split(None, 1) or ["EMPTY"])[0].upper(),
+            "statement": _truncate(statement, MAX_STATEMENT_CHARS),
+            "parameters": _loggable_parameters(parameters, executemany),
+            "executemany": executemany,
+            "rowcount": rowcount if rowcount is not None and rowcount >= 0 else None,
+            "request": f"{request.method} {request.path}" if request is not None else None,
+            "plan": None
+        }
+        self.entries.append(entry)
+        logger.warning("slow query", extra={"fields": entry})
+
+        if self.explain and explain_engine is not None and not executemany and explainable(statement):
+            self._schedule_explain(explain_engine, entry, statement, parameters)
+        return entry
+
+    def _schedule_explain(self, engine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        if self._explaining:
+            self.explain_skipped += 1
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Not under the event loop (sync scripts)
+        self._explaining = True
+        entry["plan"] = "pending"
+        # Fresh context: the EXPLAIN's statements don't count toward the
+        # request's metrics. Keep a reference so the task isn't collected.
+        self._explain_task = loop.create_task(
+            self._explain(engine, entry, statement, parameters),
+            context=contextvars.Context()
+        )
+
+    async def _explain(self, engine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        _in_explain.set(True)
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                result = await conn.exec_driver_sql(
+                    EXPLAIN_PREFIX + statement,
+                    parameters
+                )
+                entry["plan"] = "\n".join(row[0] for row in result)
+                await conn.rollback()
+            self.explained += 1
+        except Exception as exc:
+            entry["plan"] = f"EXPLAIN failed: {exc}"
+            self.explain_errors += 1
+        finally:
+            self._explaining = False
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recorded entries, newest first."""
+        entries = list(reversed(self.entries))
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "sample_rate": self.sample_rate,
+            "explain": self.explain,
+            "size": len(self.entries),
+            "maxsize": self.entries.maxlen,
+            "slow": self.slow,
+            "sampled": self.sampled,
+            "explained": self.explained,
+            "explain_errors": self.explain_errors,
+            "explain_skipped": self.explain_skipped
+        }
+
+
+slow_query_log = SlowQueryLog(
+    settings.slow_query_threshold_ms,
+    settings.slow_query_sample_rate,
+    settings.slow_query_log_size,
+    settings.slow_query_explain
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_slow_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _check_slow_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+    if elapsed * 1000 < slow_query_log.threshold_ms or _in_explain.get():
+        return
+    slow_query_log.observe(
+        elapsed,
+        statement,
+        parameters,
+        executemany,
+        getattr(cursor, "rowcount", None),
+        async_engine if conn.engine is async_engine.sync_engine else None
+    )
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_slow_query_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("slow_query_started"):
+        connection.info["slow_query_started"].pop()
@@ -0,0 +1,356 @@
+"""
+Reminder dispatch worker.
+
+Enqueues due reminders into reminder_jobs, claims them in batches with
+SKIP LOCKED and sends them with bounded concurrency. Failed sends are
+retried with exponential backoff (see app.services.reminder_jobs). Any
+number of workers can run side by side against the same database.
+
+Throughput and latency metrics are logged every --report-interval seconds
+and when the worker exits (LOG_FORMAT=json gives one JSON object each).
+
+Usage:
+    python -m app.worker                      # run until SIGINT/SIGTERM
+    python -m app.worker --once --stub        # drain the queue with the stub client
+    python -m app.worker --once --stub --stub-failure-rate 0.2 --retry-base-seconds 0.5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Deque, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal, async_engine, settings
+from app.logging_config import configure_logging
+from app.models import ReminderJob
+from app.models.appointment import AppointmentStatus
+from app.models.reminder_job import ReminderJobStatus
+from app.services.messaging import (
+    MessagingClient,
+    MessagingError,
+    StubMessagingClient,
+    TwilioMessagingClient
+)
+from app.services.reminder_jobs import (
+    DEFAULT_REMINDER_TYPE,
+    claim_reminder_jobs,
+    complete_reminder_job,
+    enqueue_due_reminders,
+    fail_reminder_job,
+    skip_reminder_job
+)
+from benchmarks.stats import percentiles
+
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept for percentiles (most recent ones)
+METRICS_WINDOW = 10_000
+
+
+class WorkerMetrics:
+    """Counters and latency samples of one worker process."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.enqueued = 0
+        self.claimed = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.skipped = 0
+        self.lost = 0  # Lease expired and another worker took the job over
+        self.send_latency_ms: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.queue_delay_ms: Deque[float] = deque(maxlen=METRICS_WINDOW)
+
+    def record_claim(self, job: ReminderJob) -> None:
+        self.claimed += 1
+        # Time the job was runnable before a worker picked it up
+        delay = (job.locked_at - job.run_at).total_seconds() * 1000
+        self.queue_delay_ms.append(max(delay, 0.0))
+
+    def snapshot(self, in_flight: int = 0) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "enqueued": self.enqueued,
+            "claimed": self.claimed,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "lost": self.lost,
+            "in_flight": in_flight,
+            "throughput_per_second": round(self.sent / elapsed, 2) if elapsed else 0.0,
+            "send_latency_ms": percentiles(self.send_latency_ms),
+            "queue_delay_ms": percentiles(self.queue_delay_ms)
+        }
+
+
+class ReminderWorker:
+    """
+    Claim loop plus bounded-concurrency dispatch.
+
+    At most `concurrency` sends run at once, and database writes are capped
+    at the connection pool size; one more batch is claimed while the sends
+    run so the slots never wait for the database.
+    """
+
+    def __init__(
+        self,
+        client: MessagingClient,
+        worker_id: str,
+        concurrency: int,
+        batch_size: int,
+        hours: int = 48,
+        reminder_type: str = DEFAULT_REMINDER_TYPE,
+        status_filter: AppointmentStatus = AppointmentStatus.PENDING,
+        poll_interval: float = 5.0,
+        enqueue_interval: float = 60.0,
+        report_interval: float = 60.0,
+        retry_base_seconds: Optional[float] = None
+    ):
+        self.client = client
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.hours = hours
+        self.reminder_type = reminder_type
+        self.status_filter = status_filter
+        self.poll_interval = poll_interval
+        self.enqueue_interval = enqueue_interval
+        self.report_interval = report_interval
+        self.retry_base_seconds = retry_base_seconds
+        self.metrics = WorkerMetrics()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._db_slots = asyncio.Semaphore(min(concurrency, settings.db_pool_size))
+        self._in_flight: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop claiming; jobs already claimed are finished."""
+        self._stopping.set()
+
+    def report(self) -> None:
+        logger.info("worker metrics", extra={"fields": {
+            "worker_id": self.worker_id,
+            **self.metrics.snapshot(len(self._in_flight))
+        }})
+
+    async def run(self, once: bool = False) -> None:
+        """
+        Work the queue until stop() is called.
+
+        Args:
+            once: Enqueue once, then exit when no job of the queue is left
+                to run (including retries scheduled for later)
+        """
+        next_enqueue = 0.0
+        next_report = time.monotonic() + self.report_interval
+
+        while not self._stopping.is_set():
+            now = time.monotonic()
+            if now >= next_report:
+                self.report()
+                next_report = now + self.report_interval
+            if now >= next_enqueue:
+                async with self._session() as db:
+                    self.metrics.enqueued += await enqueue_due_reminders(
+                        db, self.hours, self.reminder_type, self.status_filter
+                    )
+                next_enqueue = float("inf") if once else now + self.enqueue_interval
+
+            # Keep one batch queued behind the running sends
+            if len(self._in_flight) > self.concurrency:
+                await self._wait_for_slot(self.poll_interval)
+                continue
+
+            async with self._session() as db:
+                jobs = await claim_reminder_jobs(db, self.worker_id, self.batch_size)
+            for job in jobs:
+                self.metrics.record_claim(job)
+                task = asyncio.create_task(self._dispatch(job))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+            if jobs:
+                continue
+
+            if self._in_flight:
+                await self._wait_for_slot(self.poll_interval)
+            elif once:
+                next_run_at = await self._next_run_at()
+                if next_run_at is None:
+                    break
+                await self._sleep(min(
+                    self.poll_interval,
+                    max((next_run_at - datetime.now(next_run_at.tzinfo)).total_seconds(), 0.05)
+                ))
+            else:
+                await self._sleep(self.poll_interval)
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        self.report()
+
+    async def _dispatch(self, job: ReminderJob) -> None:
+        """Send one claimed job and record the outcome."""
+        appointment = job.appointment
+        try:
+            if appointment.status != self.status_filter or appointment.reminder_sent_at:
+                async with self._session() as db:
+                    held = await skip_reminder_job(
+                        db, job, f"appointment is {appointment.status.value}"
+                        if appointment.status != self.status_filter
+                        else "reminder already sent"
+                    )
+                self.metrics.skipped += held
+                self.metrics.lost += not held
+                return
+
+            async with self._slots:
+                started = time.perf_counter()
+                try:
+                    message_sid = await self.client.send_reminder(appointment, job.reminder_type)
+                except MessagingError as exc:
+                    await self._fail(job, str(exc), exc.retryable)
+                    return
+                except Exception as exc:  # Unknown errors are retried like transient ones
+                    await self._fail(job, repr(exc), True)
+                    return
+                self.metrics.send_latency_ms.append((time.perf_counter() - started) * 1000)
+
+            async with self._session() as db:
+                held = await complete_reminder_job(db, job, message_sid)
+            self.metrics.sent += held
+            self.metrics.lost += not held
+        except Exception as exc:
+            # Database error while recording the outcome: the job stays
+            # RUNNING and is handed out again when its lease expires
+            logger.warning("job %s: could not record outcome: %r", job.id, exc)
+
+    async def _fail(self, job: ReminderJob, error: str, retryable: bool) -> None:
+        async with self._session() as db:
+            outcome = await fail_reminder_job(
+                db, job, error, retryable, base_seconds=self.retry_base_seconds
+            )
+        if outcome == ReminderJobStatus.PENDING:
+            self.metrics.retried += 1
+        elif outcome == ReminderJobStatus.FAILED:
+            self.metrics.failed += 1
+        else:
+            self.metrics.lost += 1
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Session for one queue write. Writes wait for a pooled connection
+        slot instead of opening overflow connections, which are closed on
+        release and would be reconnected for almost every job.
+        """
+        async with self._db_slots:
+            async with AsyncSessionLocal() as db:
+                yield db
+
+    async def _next_run_at(self) -> Optional[datetime]:
+        """run_at of the next PENDING job, None if the queue is drained."""
+        async with self._session() as db:
+            return await db.scalar(
+                select(func.min(ReminderJob.run_at))
+                .where(ReminderJob.status == ReminderJobStatus.PENDING)
+            )
+
+    async def _wait_for_slot(self, timeout: float) -> None:
+        await asyncio.wait(
+            set(self._in_flight),
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep, waking up early on stop()."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker(worker: ReminderWorker, once: bool) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run(once)
+    finally:
+        await worker.client.close()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send due appointment reminders.")
+    parser.add_argument("--once", action="store_true", help="Exit once the queue is drained")
+    parser.add_argument("--concurrency", type=int, default=settings.reminder_worker_concurrency)
+    parser.add_argument("--batch-size", type=int, default=settings.reminder_worker_batch_size)
+    parser.add_argument("--hours", type=int, default=48, help="Look-ahead window of due reminders")
+    parser.add_argument("--reminder-type", default=DEFAULT_REMINDER_TYPE)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--enqueue-interval", type=float, default=60.0)
+    parser.add_argument("--report-interval", type=float, default=60.0)
+    parser.add_argument(
+        "--retry-base-seconds",
+        type=float,
+        default=settings.reminder_retry_base_seconds
+    )
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}"[:64])
+    parser.add_argument("--stub", action="store_true", help="Use the in-process stub client")
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        nargs=2,
+        default=(50.0, 150.0),
+        metavar=("MIN", "MAX")
+    )
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.stub:
+        client = StubMessagingClient(tuple(args.stub_latency_ms), args.stub_failure_rate)
+    elif settings.twilio_account_sid and settings.twilio_auth_token and settings.twilio_whatsapp_number:
+        client = TwilioMessagingClient(
+            settings.twilio_account_sid,
+            settings.twilio_auth_token,
+            settings.twilio_whatsapp_number
+        )
+    else:
+        parser.error(
+            "TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN and TWILIO_WHATSAPP_NUMBER "
+            "are not set; pass --stub to use the stub messaging client"
+        )
+
+    worker = ReminderWorker(
+        client,
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        hours=args.hours,
+        reminder_type=args.reminder_type,
+        poll_interval=args.poll_interval,
+        enqueue_interval=args.enqueue_interval,
+        report_interval=args.report_interval,
+        retry_base_seconds=args.retry_base_seconds
+    )
+    asyncio.run(run_worker(worker, args.once))
+
+
+if __name__ == "__main__":
+    main()
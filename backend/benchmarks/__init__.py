@@ -0,0 +1,6 @@
+"""
+Benchmarks for the smartSalud backend.
+
+Run from the backend directory so the app package is importable:
+    python -m benchmarks.<name> --help
+"""
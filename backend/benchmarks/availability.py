@@ -0,0 +1,97 @@
+"""
+Benchmark the availability engine on dense doctor calendars.
+
+Builds a synthetic calendar (90 days at 95% occupancy by default), then
+times DoctorCalendar construction and nearest_free_slots lookups from
+random reference times, with and without a preferred-time window. Runs
+fully in memory; the database load is a single indexed range query and is
+covered by the load-test suite.
+
+Usage:
+    python -m benchmarks.availability --days 90 --occupancy 0.95
+"""
+
+import argparse
+import json
+import random
+import time as timer
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.services.availability import (
+    PREFERRED_TIME_WINDOWS,
+    DoctorCalendar,
+    WorkingHours
+)
+from benchmarks.stats import percentiles
+
+
+def dense_calendar(hours: WorkingHours, start: datetime, days: int, occupancy: float, rng):
+    """Book each working-hours slot with probability `occupancy`."""
+    intervals = []
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).date()
+        for slot in hours.day_slots(day, timedelta(minutes=30)):
+            if rng.random() < occupancy:
+                duration = rng.choice((30, 30, 30, 45, 60))
+                intervals.append((slot, slot + duration * 60))
+    return intervals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--occupancy", type=float, default=0.95)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--count", type=int, default=2)
+    parser.add_argument("--horizon-days", type=int, default=14)
+    parser.add_argument("--timezone", default="America/Mexico_City")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hours = WorkingHours(tz=ZoneInfo(args.timezone))
+    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    intervals = dense_calendar(hours, start, args.days, args.occupancy, rng)
+
+    started = timer.perf_counter()
+    calendar = DoctorCalendar("DOC-BENCH", intervals)
+    build_ms = (timer.perf_counter() - started) * 1000
+
+    duration = timedelta(minutes=30)
+    report = {
+        "days": args.days,
+        "occupancy": args.occupancy,
+        "bookings": len(intervals),
+        "merged_intervals": len(calendar),
+        "build_ms": round(build_ms, 2),
+        "lookups": {}
+    }
+
+    for label, window in (("any_time", None), ("morning", PREFERRED_TIME_WINDOWS["morning"])):
+        samples = []
+        found = 0
+        for _ in range(args.lookups):
+            reference = start + timedelta(
+                seconds=rng.uniform(0, (args.days - args.horizon_days) * 86400)
+            )
+            not_before = reference - timedelta(days=args.horizon_days)
+            not_after = reference + timedelta(days=args.horizon_days)
+
+            started = timer.perf_counter()
+            slots = calendar.nearest_free_slots(
+                reference, duration, args.count, not_before, not_after, hours, window
+            )
+            samples.append((timer.perf_counter() - started) * 1_000_000)
+            found += len(slots)
+
+        report["lookups"][label] = {
+            **percentiles(samples, "_us"),
+            "avg_slots_found": round(found / args.lookups, 2)
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark JSONB filters on patient preferences and conversation state.
+
+Seeds a scratch schema with synthetic patients and conversations (200k and
+1M by default), then runs EXPLAIN (ANALYZE, BUFFERS) on the exact queries
+built by the patients and conversations routers twice: first without the
+JSONB indexes (sequential scan), then with the GIN and expression indexes
+from migration a7d3e5f09c18. The scratch schema is dropped afterwards
+unless --keep is given, so it is safe to point at a development database.
+
+Usage:
+    python -m benchmarks.jsonb_indexes --patients 200000 --conversations 1000000
+"""
+
+import argparse
+import json
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.database import Base, settings
+from app.routers.conversations import _conversation_state_query
+from app.routers.patients import _patient_preferences_query
+from benchmarks.upcoming_index import explain
+
+
+# Preferred times are skewed so "evening" is a selective filter (~0.5%)
+SEED_PATIENTS_SQL = """
+INSERT INTO patients (name, phone, preferences)
+SELECT
+    'Paciente ' || g,
+    '+52' || (5500000000 + g)::text,
+    jsonb_strip_nulls(jsonb_build_object(
+        'language', CASE WHEN r1 < 0.995 THEN 'es' ELSE 'en' END,
+        'preferred_time', CASE
+            WHEN r2 < 0.50 THEN 'morning'
+            WHEN r2 < 0.90 THEN 'afternoon'
+            WHEN r2 < 0.905 THEN 'evening'
+        END,
+        'reminder_hours', CASE WHEN r1 < 0.3 THEN 24 END
+    ))
+FROM (
+    SELECT g, random() AS r1, random() AS r2
+    FROM generate_series(1, :patients) AS g
+) AS seed
+"""
+
+# About 0.2% of conversations are waiting for the patient to pick a slot
+SEED_CONVERSATIONS_SQL = """
+INSERT INTO conversation_history (patient_id, messages, state, context)
+SELECT
+    1 + (g % :patients),
+    '[]'::json,
+    CASE
+        WHEN r < 0.002 THEN jsonb_build_object(
+            'intent', 'reschedule',
+            'awaiting_selection', true,
+            'proposed_dates', jsonb_build_array(now() + interval '1 day', now() + interval '2 days')
+        )
+        WHEN r < 0.40 THEN jsonb_build_object('intent', 'confirm', 'awaiting_selection', false)
+        WHEN r < 0.70 THEN jsonb_build_object('intent', 'cancel', 'awaiting_selection', false)
+        ELSE jsonb_build_object('intent', 'other')
+    END,
+    ''
+FROM (
+    SELECT g, random() AS r FROM generate_series(1, :conversations) AS g
+) AS seed
+"""
+
+INDEXES = {
+    "ix_patients_preferences":
+        "CREATE INDEX ix_patients_preferences ON patients USING gin (preferences jsonb_path_ops)",
+    "ix_patients_preferred_time":
+        "CREATE INDEX ix_patients_preferred_time ON patients ((preferences ->> 'preferred_time'))",
+    "ix_conversation_history_state":
+        "CREATE INDEX ix_conversation_history_state ON conversation_history USING gin (state jsonb_path_ops)",
+}
+
+
+def compile_query(query, dialect):
+    """SQL string and driver parameters; JSONB values are sent as JSON text."""
+    compiled = query.compile(dialect=dialect)
+    params = {
+        key: json.dumps(value) if isinstance(value, (dict, list)) else value
+        for key, value in compiled.params.items()
+    }
+    return str(compiled), params
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--schema", default="smartsalud_bench")
+    parser.add_argument("--patients", type=int, default=200_000)
+    parser.add_argument("--conversations", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, poolclass=NullPool)
+
+    cases = {
+        "conversations_awaiting_selection": _conversation_state_query(
+            {"awaiting_selection": True}, None, args.limit
+        ),
+        "patients_preferred_time_evening": _patient_preferences_query(
+            "evening", None, args.limit
+        ),
+        "patients_language_en": _patient_preferences_query(
+            None, {"language": "en"}, args.limit
+        ),
+    }
+    compiled = {name: compile_query(query, engine.dialect) for name, query in cases.items()}
+
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+        conn.execute(text(f"SET search_path TO {args.schema}"))
+        Base.metadata.create_all(conn)
+        conn.commit()
+
+        results = {}
+        try:
+            started = time.perf_counter()
+            conn.execute(text(SEED_PATIENTS_SQL), {"patients": args.patients})
+            conn.execute(
+                text(SEED_CONVERSATIONS_SQL),
+                {"patients": args.patients, "conversations": args.conversations}
+            )
+            conn.commit()
+            seed_seconds = time.perf_counter() - started
+
+            # Before: JSONB columns without indexes, i.e. what generic JSON allowed
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+            conn.execute(text("ANALYZE patients"))
+            conn.execute(text("ANALYZE conversation_history"))
+            conn.commit()
+            for name, (sql, params) in compiled.items():
+                results[name] = {"before": explain(conn, sql, params, args.runs)}
+
+            # After: the indexes from migration a7d3e5f09c18
+            for ddl in INDEXES.values():
+                conn.execute(text(ddl))
+            conn.execute(text("ANALYZE patients"))
+            conn.execute(text("ANALYZE conversation_history"))
+            conn.commit()
+            for name, (sql, params) in compiled.items():
+                after = explain(conn, sql, params, args.runs)
+                before = results[name]["before"]
+                results[name]["after"] = after
+                results[name]["speedup"] = round(
+                    before["execution_ms_median"] / max(after["execution_ms_median"], 0.001), 1
+                )
+        finally:
+            if not args.keep:
+                conn.rollback()
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+                conn.commit()
+
+    print(json.dumps({
+        "patients": args.patients,
+        "conversations": args.conversations,
+        "limit": args.limit,
+        "runs": args.runs,
+        "seed_seconds": round(seed_seconds, 2),
+        "queries": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
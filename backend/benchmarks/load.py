@@ -0,0 +1,310 @@
+"""
+Load-test the API in-process against a local Postgres.
+
+Seeds a scratch schema with a realistic agenda (doctors booked on 30-minute
+working-hours slots, past rows mostly COMPLETED, future rows mostly
+PENDING/CONFIRMED), starts the app with its lifespan behind httpx's ASGI
+transport and drives each scenario with a closed-loop load generator:
+--concurrency clients, each sending its next request as soon as the
+previous one completes.
+
+Scenarios:
+
+- upcoming: the reminder cron's GET /api/appointments/upcoming pull
+- confirm_reschedule: a burst of confirms and reschedules, alternating,
+  each on a different PENDING appointment
+- alternatives: GET /api/appointments/{id}/alternatives for random
+  upcoming appointments
+
+Reports throughput, latency percentiles and status codes per scenario as
+JSON, with the git commit and the settings that change the hot paths, so
+runs can be compared across commits (--output keeps a copy). Seeding and
+request order are deterministic for a given --seed. No network or uvicorn
+is involved: the numbers cover the app and the database. Settings come
+from the environment as usual, e.g. RESPONSE_CACHE_BACKEND=none to measure
+/upcoming without the response cache.
+
+The scratch schema is dropped afterwards unless --keep is given, so it is
+safe to point DATABASE_URL at a development database.
+
+Usage:
+    python -m benchmarks.load --appointments 50000 --requests 1000 --concurrency 20
+    RESPONSE_CACHE_BACKEND=none python -m benchmarks.load --scenarios upcoming
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool
+
+from app.database import Base, async_engine, settings
+from app.main import app, lifespan
+from benchmarks.stats import percentiles
+from benchmarks.upcoming_index import SEED_PATIENTS_SQL
+
+
+SLOTS_PER_DAY = 20  # 08:00-18:00 in 30-minute slots
+
+# Row g books slot g // doctors of doctor g % doctors, so no doctor is
+# double-booked; a fraction (1 - occupancy) of slots stays free for the
+# alternatives lookups
+SEED_APPOINTMENTS_SQL = """
+INSERT INTO appointments (
+    patient_id, doctor_id, doctor_name, appointment_date,
+    duration_minutes, status, notes
+)
+SELECT
+    1 + (g % :patients),
+    'DOC' || lpad(doctor::text, 3, '0'),
+    'Dr. Load ' || doctor,
+    d,
+    30,
+    (CASE
+        WHEN d < now() AND r < 0.85 THEN 'COMPLETED'
+        WHEN d < now() AND r < 0.95 THEN 'NO_SHOW'
+        WHEN d < now() THEN 'CANCELLED'
+        WHEN r < 0.60 THEN 'PENDING'
+        WHEN r < 0.90 THEN 'CONFIRMED'
+        ELSE 'CANCELLED'
+    END)::appointmentstatus,
+    ''
+FROM (
+    SELECT
+        g,
+        g % :doctors AS doctor,
+        date_trunc('day', now()) - make_interval(days => :past_days)
+            + make_interval(days => (g / :doctors) / :slots_per_day)
+            + interval '8 hours'
+            + make_interval(mins => 30 * ((g / :doctors) % :slots_per_day)) AS d,
+        random() AS r,
+        random() AS keep
+    FROM generate_series(0, :appointments - 1) AS g
+) AS seed
+WHERE keep < :occupancy
+"""
+
+SCENARIOS = ("upcoming", "confirm_reschedule", "alternatives")
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+async def drive(client: httpx.AsyncClient, requests: List[Request], concurrency: int) -> Dict[str, Any]:
+    """
+    Send `requests` from `concurrency` clients sharing one queue.
+
+    Returns:
+        Throughput, latency percentiles and responses by status code
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    queue = iter(requests)
+
+    async def client_loop():
+        for method, url, body in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                statuses[str(response.status_code)] += 1
+            except Exception as exc:
+                statuses[type(exc).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        **percentiles(latencies, "_ms", 2),
+        "errors": sum(count for code, count in statuses.items() if not code.startswith("2")),
+        "statuses": dict(sorted(statuses.items()))
+    }
+
+
+def build_requests(
+    scenario: str,
+    count: int,
+    hours: int,
+    pending_ids: List[int],
+    upcoming_ids: List[int],
+    rng: random.Random
+) -> List[Request]:
+    """`count` requests of `scenario`; write requests consume `pending_ids`."""
+    if scenario == "upcoming":
+        return [("GET", f"/api/appointments/upcoming?hours={hours}", None)] * count
+    if scenario == "alternatives":
+        return [
+            ("GET", f"/api/appointments/{rng.choice(upcoming_ids)}/alternatives", None)
+            for _ in range(count)
+        ]
+    if scenario == "confirm_reschedule":
+        if len(pending_ids) < count:
+            raise SystemExit(
+                f"confirm_reschedule needs {count} PENDING appointments, "
+                f"{len(pending_ids)} left; seed more --appointments"
+            )
+        # Past the seeded agenda, one slot per request, so reschedules
+        # never collide with each other or with seeded rows
+        free_from = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=400)
+        requests = []
+        for i in range(count):
+            appointment_id = pending_ids.pop()
+            if i % 2 == 0:
+                requests.append(
+                    ("POST", f"/api/appointments/{appointment_id}/confirm", {"confirmed": True})
+                )
+            else:
+                new_date = free_from + timedelta(minutes=30 * i)
+                requests.append((
+                    "POST",
+                    f"/api/appointments/{appointment_id}/reschedule",
+                    {"new_date": new_date.isoformat()}
+                ))
+        return requests
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_scenarios(args, pending_ids: List[int], upcoming_ids: List[int]) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    results = {}
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=60) as client:
+            for scenario in args.scenarios:
+                warmup = build_requests(
+                    scenario, args.warmup, args.hours, pending_ids, upcoming_ids, rng
+                )
+                await drive(client, warmup, args.concurrency)
+                measured = build_requests(
+                    scenario, args.requests, args.hours, pending_ids, upcoming_ids, rng
+                )
+                results[scenario] = await drive(client, measured, args.concurrency)
+                results[scenario]["pool"] = async_engine.pool.stats()
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--schema", default="smartsalud_load")
+    parser.add_argument("--appointments", type=int, default=50_000, help="Seeded slots before occupancy")
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--doctors", type=int, default=100)
+    parser.add_argument("--past-days", type=int, default=10, help="Agenda starts this many days ago")
+    parser.add_argument("--occupancy", type=float, default=0.8)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--hours", type=int, default=48, help="/upcoming window")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+
+    # Every connection the app opens works in the scratch schema (a
+    # startup parameter: a SET would be rolled back with the first
+    # transaction)
+    @event.listens_for(async_engine.sync_engine, "do_connect")
+    def _use_scratch_schema(dialect, connection_record, cargs, cparams):
+        cparams.setdefault("server_settings", {})["search_path"] = args.schema
+
+    engine = create_engine(settings.database_url, poolclass=NullPool)
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+        conn.execute(text(f"SET search_path TO {args.schema}"))
+        Base.metadata.create_all(conn)
+        conn.commit()
+
+        try:
+            started = time.perf_counter()
+            conn.execute(text("SELECT setseed(:seed)"), {"seed": (args.seed % 1000) / 1000})
+            conn.execute(text(SEED_PATIENTS_SQL), {"patients": args.patients})
+            conn.execute(text(SEED_APPOINTMENTS_SQL), {
+                "appointments": args.appointments,
+                "patients": args.patients,
+                "doctors": args.doctors,
+                "past_days": args.past_days,
+                "occupancy": args.occupancy,
+                "slots_per_day": SLOTS_PER_DAY
+            })
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+            seed_seconds = time.perf_counter() - started
+
+            pending_ids = list(conn.execute(text(
+                "SELECT id FROM appointments"
+                " WHERE status = 'PENDING' AND appointment_date > now() ORDER BY id"
+            )).scalars())
+            upcoming_ids = list(conn.execute(
+                text(
+                    "SELECT id FROM appointments WHERE status IN ('PENDING', 'CONFIRMED')"
+                    " AND appointment_date BETWEEN now() AND now() + make_interval(hours => :hours)"
+                    " ORDER BY id"
+                ),
+                {"hours": args.hours}
+            ).scalars())
+            counts = dict(conn.execute(text(
+                "SELECT status::text, count(*) FROM appointments GROUP BY status ORDER BY status"
+            )).all())
+            random.Random(args.seed).shuffle(pending_ids)
+
+            results = asyncio.run(run_scenarios(args, pending_ids, upcoming_ids))
+        finally:
+            if not args.keep:
+                conn.rollback()
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+                conn.commit()
+
+    report = {
+        "commit": git_commit(),
+        "at": datetime.now(timezone.utc).isoformat(),
+        "settings": {
+            "db_pool_mode": settings.db_pool_mode,
+            "db_pool_size": settings.db_pool_size,
+            "db_max_overflow": settings.db_max_overflow,
+            "response_cache_backend": settings.response_cache_backend,
+            "fast_json_responses": settings.fast_json_responses,
+            "slow_query_explain": settings.slow_query_explain
+        },
+        "data": {
+            "appointments": counts,
+            "patients": args.patients,
+            "doctors": args.doctors,
+            "upcoming_appointments": len(upcoming_ids),
+            "seed_seconds": round(seed_seconds, 2)
+        },
+        "scenarios": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
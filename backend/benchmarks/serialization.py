@@ -0,0 +1,148 @@
+"""
+Benchmark JSON serialization of appointment lists.
+
+Builds N appointments (10k by default) as ORM objects with their patient,
+like a loaded /upcoming window, and times turning them into a response
+body:
+
+- fastapi: what a `response_model=List[AppointmentResponse]` endpoint
+  does (serialize_response validates, dumps to Python, JSONResponse
+  renders with json.dumps)
+- fastapi_orjson: the same with ORJSONResponse rendering (needs orjson)
+- construct: AppointmentResponse.model_construct from the ORM attributes
+  (no validation), then dumped to JSON by pydantic-core
+- type_adapter: TypeAdapter validation from attributes straight to JSON
+  bytes (app.responses.serialize, the response cache's default path)
+- fast: dump_rows + orjson, the FAST_JSON_RESPONSES path (app.responses)
+
+Every variant must produce the same bytes as the fastapi one.
+Runs fully in memory.
+
+Usage:
+    python -m benchmarks.serialization --appointments 10000 --repeat 7
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import Appointment, Patient
+from app.models.appointment import AppointmentStatus
+from app.responses import dump_rows, render, serialize, type_adapter
+from app.schemas import AppointmentResponse, PatientResponse
+
+
+def synthetic_appointments(count: int, rng: random.Random) -> List[Appointment]:
+    now = datetime.now(timezone.utc)
+    patients = [
+        Patient(
+            id=i,
+            name=f"Paciente {i}",
+            phone=f"+52{5500000000 + i}",
+            preferences={"language": "es"},
+            created_at=now - timedelta(days=30),
+            updated_at=None
+        )
+        for i in range(1, count // 4 + 2)
+    ]
+    appointments = []
+    for i in range(1, count + 1):
+        patient = rng.choice(patients)
+        appointments.append(Appointment(
+            id=i,
+            patient_id=patient.id,
+            patient=patient,
+            doctor_id=f"DOC-{rng.randint(1, 40):03d}",
+            doctor_name="Dra. Pérez",
+            appointment_date=now + timedelta(minutes=30 * rng.randint(1, 96)),
+            duration_minutes=30,
+            status=AppointmentStatus.PENDING,
+            notes="Control",
+            created_at=now - timedelta(days=2),
+            updated_at=now - timedelta(hours=1),
+            version=1,
+            reminder_sent_at=None,
+            reminder_attempts=0,
+            revision=i
+        ))
+    return appointments
+
+
+_PATIENT_FIELDS = list(PatientResponse.model_fields)
+_APPOINTMENT_FIELDS = [name for name in AppointmentResponse.model_fields if name != "patient"]
+
+
+def construct(appointment: Appointment) -> AppointmentResponse:
+    """Unvalidated model from trusted ORM attributes."""
+    patient = appointment.patient
+    return AppointmentResponse.model_construct(
+        **{name: getattr(appointment, name) for name in _APPOINTMENT_FIELDS},
+        patient=PatientResponse.model_construct(
+            **{name: getattr(patient, name) for name in _PATIENT_FIELDS}
+        ) if patient is not None else None
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--appointments", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    appointments = synthetic_appointments(args.appointments, random.Random(args.seed))
+    field = create_response_field("Response", List[AppointmentResponse], mode="serialization")
+    adapter = type_adapter(List[AppointmentResponse])
+
+    def fastapi_default() -> bytes:
+        content = asyncio.run(serialize_response(field=field, response_content=appointments))
+        return JSONResponse(content).body
+
+    variants = {"fastapi": fastapi_default}
+    try:
+        from fastapi.responses import ORJSONResponse
+        import orjson  # noqa: F401
+
+        variants["fastapi_orjson"] = lambda: ORJSONResponse(
+            asyncio.run(serialize_response(field=field, response_content=appointments))
+        ).body
+    except ImportError:
+        pass
+    variants["construct"] = lambda: adapter.dump_json([construct(a) for a in appointments])
+    variants["type_adapter"] = lambda: serialize(List[AppointmentResponse], appointments)
+    variants["fast"] = lambda: render(dump_rows(AppointmentResponse, appointments))
+
+    expected_body = fastapi_default()
+    report = {"appointments": args.appointments, "repeat": args.repeat, "variants": {}}
+    for name, run in variants.items():
+        body = run()
+        if body != expected_body:
+            raise SystemExit(f"{name}: output differs from the fastapi response")
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - started) * 1000)
+        report["variants"][name] = {
+            "median_ms": round(statistics.median(samples), 2),
+            "min_ms": round(min(samples), 2),
+            "bytes": len(body)
+        }
+
+    baseline = report["variants"]["fastapi"]["median_ms"]
+    for result in report["variants"].values():
+        result["speedup"] = round(baseline / result["median_ms"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Latency summaries shared by the benchmarks and the reminder worker.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+
+def percentiles(samples: Iterable[float], suffix: str = "", digits: int = 1) -> Dict[str, Optional[float]]:
+    """
+    p50/p95/p99/max of the samples by the nearest-rank method.
+
+    Args:
+        samples: Measurements, in any order
+        suffix: Appended to each key, e.g. "_ms" gives "p50_ms"
+        digits: Decimal places to round to
+
+    Returns:
+        {"p50", "p95", "p99", "max"} (plus suffix); all None without samples
+    """
+    ordered = sorted(samples)
+    keys = [f"{name}{suffix}" for name in ("p50", "p95", "p99", "max")]
+    if not ordered:
+        return dict.fromkeys(keys)
+
+    def rank(q: float) -> float:
+        # Smallest sample with at least q of the samples at or below it
+        return round(ordered[max(math.ceil(q * len(ordered)) - 1, 0)], digits)
+
+    return dict(zip(keys, (rank(0.50), rank(0.95), rank(0.99), round(ordered[-1], digits))))
@@ -0,0 +1,178 @@
+"""
+Benchmark the /upcoming window query with and without the composite index.
+
+Seeds a scratch schema with synthetic appointments (1M by default), then
+runs EXPLAIN (ANALYZE, BUFFERS) on the exact query built by the
+appointments router twice: first with only the single-column indexes from
+the initial migration, then with ix_appointments_status_appointment_date.
+The scratch schema is dropped afterwards unless --keep is given, so it is
+safe to point at a development database.
+
+Usage:
+    python -m benchmarks.upcoming_index --rows 1000000 --runs 10
+"""
+
+import argparse
+import enum
+import json
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.database import Base, settings
+from app.models.appointment import AppointmentStatus
+from app.routers.appointments import _upcoming_window_query
+
+
+SEED_PATIENTS_SQL = """
+INSERT INTO patients (name, phone, preferences)
+SELECT 'Paciente ' || g, '+52' || (5500000000 + g)::text, '{}'::jsonb
+FROM generate_series(1, :patients) AS g
+"""
+
+# Appointments spread over +/- 180 days; past rows are mostly COMPLETED and
+# future rows mostly PENDING/CONFIRMED, roughly like a real agenda
+SEED_APPOINTMENTS_SQL = """
+INSERT INTO appointments (
+    patient_id, doctor_id, doctor_name, appointment_date,
+    duration_minutes, status, notes
+)
+SELECT
+    1 + (g % :patients),
+    'DOC' || lpad((g % :doctors)::text, 3, '0'),
+    'Dr. Benchmark ' || (g % :doctors),
+    d,
+    30,
+    (CASE
+        WHEN d < now() AND r < 0.85 THEN 'COMPLETED'
+        WHEN d < now() AND r < 0.95 THEN 'NO_SHOW'
+        WHEN r < 0.60 THEN 'PENDING'
+        WHEN r < 0.90 THEN 'CONFIRMED'
+        ELSE 'CANCELLED'
+    END)::appointmentstatus,
+    ''
+FROM (
+    SELECT
+        g,
+        now() - interval '180 days' + random() * interval '360 days' AS d,
+        random() AS r
+    FROM generate_series(1, :rows) AS g
+) AS seed
+"""
+
+
+def explain(conn, sql: str, params: dict, runs: int) -> dict:
+    """Run EXPLAIN ANALYZE `runs` times and summarize timings and the plan."""
+    execution_ms = []
+    planning_ms = []
+    plan = None
+
+    for _ in range(runs):
+        row = conn.exec_driver_sql(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params
+        ).scalar_one()
+        report = row[0] if isinstance(row, list) else json.loads(row)[0]
+        execution_ms.append(report["Execution Time"])
+        planning_ms.append(report["Planning Time"])
+        plan = report["Plan"]
+
+    return {
+        "execution_ms_median": round(statistics.median(execution_ms), 3),
+        "execution_ms_min": round(min(execution_ms), 3),
+        "planning_ms_median": round(statistics.median(planning_ms), 3),
+        "rows_returned": plan.get("Actual Rows"),
+        "plan": summarize_plan(plan)
+    }
+
+
+def summarize_plan(node: dict) -> list:
+    """Flatten a JSON plan into 'Node Type [on index]' strings, depth first."""
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    lines = [label]
+    for child in node.get("Plans", []):
+        lines.extend("  " + line for line in summarize_plan(child))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--schema", default="smartsalud_bench")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--patients", type=int, default=50_000)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=48)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, poolclass=NullPool)
+
+    query = _upcoming_window_query(args.hours, AppointmentStatus.PENDING)
+    compiled = query.compile(dialect=engine.dialect)
+    sql = str(compiled)
+    params = {
+        key: value.value if isinstance(value, enum.Enum) else value
+        for key, value in compiled.params.items()
+    }
+
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+        conn.execute(text(f"SET search_path TO {args.schema}"))
+        Base.metadata.create_all(conn)
+        conn.commit()
+
+        try:
+            started = time.perf_counter()
+            conn.execute(text(SEED_PATIENTS_SQL), {"patients": args.patients})
+            conn.execute(
+                text(SEED_APPOINTMENTS_SQL),
+                {"rows": args.rows, "patients": args.patients, "doctors": args.doctors}
+            )
+            conn.commit()
+            seed_seconds = time.perf_counter() - started
+
+            # Before: the single-column indexes from the initial migration
+            conn.execute(text("DROP INDEX ix_appointments_status_appointment_date"))
+            conn.execute(text(
+                "CREATE INDEX ix_appointments_status ON appointments (status)"
+            ))
+            conn.execute(text("ANALYZE appointments"))
+            conn.commit()
+            before = explain(conn, sql, params, args.runs)
+
+            # After: the composite index from migration 5c1e8a7f3b92
+            conn.execute(text("DROP INDEX ix_appointments_status"))
+            conn.execute(text(
+                "CREATE INDEX ix_appointments_status_appointment_date "
+                "ON appointments (status, appointment_date, id)"
+            ))
+            conn.execute(text("ANALYZE appointments"))
+            conn.commit()
+            after = explain(conn, sql, params, args.runs)
+        finally:
+            if not args.keep:
+                conn.rollback()
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+                conn.commit()
+
+    print(json.dumps({
+        "rows": args.rows,
+        "hours": args.hours,
+        "runs": args.runs,
+        "seed_seconds": round(seed_seconds, 2),
+        "before": before,
+        "after": after,
+        "speedup": round(
+            before["execution_ms_median"] / max(after["execution_ms_median"], 0.001), 1
+        )
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
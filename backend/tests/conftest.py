@@ -0,0 +1,105 @@
+"""
+Shared fixtures: the app against a scratch schema in DATABASE_URL.
+
+The schema is created from the models (btree_gist must be available, as
+for the migrations) and dropped after the session, so DATABASE_URL can
+point at a development database. Requests go through httpx's ASGI
+transport; no server is started.
+"""
+
+import itertools
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event, text
+
+from app.database import AsyncSessionLocal, Base, async_engine
+from app.main import app
+from app.models import Appointment, Patient
+from app.services.response_cache import upcoming_cache
+
+
+SCHEMA = "smartsalud_test"
+
+
+# Every connection the app opens works in the scratch schema (a startup
+# parameter, as in benchmarks.load: a SET would be rolled back)
+@event.listens_for(async_engine.sync_engine, "do_connect")
+def _use_test_schema(dialect, connection_record, cargs, cparams):
+    cparams.setdefault("server_settings", {})["search_path"] = SCHEMA
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database(anyio_backend):
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield
+    finally:
+        async with async_engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await async_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def upcoming_appointments(database):
+    """Five PENDING appointments in the next hours, each with its own patient."""
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        appointments = []
+        for i in range(5):
+            patient = Patient(name=f"Patient {i}", phone=f"+5691000000{i}")
+            appointments.append(Appointment(
+                patient=patient,
+                doctor_id="DOC001",
+                doctor_name="Dr. Test",
+                appointment_date=now + timedelta(hours=2 + i),
+                duration_minutes=30
+            ))
+        db.add_all(appointments)
+        await db.commit()
+        return [appointment.id for appointment in appointments]
+
+
+@pytest.fixture
+async def make_appointment(database):
+    """
+    Factory for an appointment with its own patient and doctor, so tests
+    that write never collide with each other's bookings.
+    """
+    counter = itertools.count()
+
+    async def make(hours_ahead: float = 3, **values) -> Appointment:
+        number = next(counter)
+        tag = uuid.uuid4().hex[:8]
+        async with AsyncSessionLocal() as db:
+            appointment = Appointment(
+                patient=Patient(name=f"Patient {tag}", phone=f"+569{uuid.uuid4().int % 10**8:08d}"),
+                doctor_id=values.pop("doctor_id", f"DOC-{tag}-{number}"),
+                doctor_name="Dr. Test",
+                appointment_date=datetime.now(timezone.utc) + timedelta(hours=hours_ahead),
+                duration_minutes=30,
+                **values
+            )
+            db.add(appointment)
+            await db.commit()
+            return appointment
+
+    return make
+
+
+@pytest.fixture
+async def client(database):
+    await upcoming_cache.invalidate()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
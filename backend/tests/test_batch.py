@@ -0,0 +1,87 @@
+"""
+Batch transitions: per-item results, and overlapping reschedules failing
+on their own.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def _batch(client, items: list) -> dict:
+    response = await client.post("/api/appointments/batch", json={"items": items})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def _status(client, appointment_id: int) -> str:
+    response = await client.get(f"/api/appointments/{appointment_id}")
+    return response.json()["status"]
+
+
+async def test_each_item_gets_its_own_result(client, make_appointment):
+    confirmed, stale, cancelled, unscheduled = [await make_appointment() for _ in range(4)]
+    response = await client.post(f"/api/appointments/{cancelled.id}/cancel")
+    assert response.status_code == 200
+
+    body = await _batch(client, [
+        {"appointment_id": confirmed.id, "action": "confirm"},
+        {"appointment_id": stale.id, "action": "cancel", "expected_version": 7},
+        {"appointment_id": cancelled.id, "action": "confirm"},
+        {"appointment_id": 0, "action": "confirm"},
+        {"appointment_id": unscheduled.id, "action": "reschedule"},
+        {"appointment_id": confirmed.id, "action": "cancel"}
+    ])
+
+    assert [(result["appointment_id"], result["outcome"]) for result in body["results"]] == [
+        (confirmed.id, "updated"),
+        (stale.id, "conflict"),
+        (cancelled.id, "conflict"),
+        (0, "not_found"),
+        (unscheduled.id, "invalid"),
+        (confirmed.id, "invalid")
+    ]
+    assert (body["updated"], body["failed"]) == (1, 5)
+    details = [result["detail"] for result in body["results"]]
+    assert details[1] == f"Appointment {stale.id} was modified (version 1, expected 7)"
+    assert details[2] == "Cannot confirm appointment in status CANCELLED"
+    assert details[4] == "new_date is required for reschedule"
+    assert details[5] == "Duplicate appointment_id in batch"
+
+    assert body["results"][0]["status"] == "CONFIRMED"
+    assert body["results"][0]["version"] == 2
+    assert await _status(client, confirmed.id) == "CONFIRMED"
+    assert await _status(client, stale.id) == "PENDING"
+    assert await _status(client, unscheduled.id) == "PENDING"
+
+
+async def test_overlapping_reschedule_fails_alone(client, make_appointment):
+    booked = await make_appointment(hours_ahead=24)
+    overlapping, moved, cancelled = [
+        await make_appointment(hours_ahead=hours, doctor_id=booked.doctor_id)
+        for hours in (48, 72, 96)
+    ]
+    free_slot = booked.appointment_date + timedelta(hours=2)
+
+    body = await _batch(client, [
+        {
+            "appointment_id": overlapping.id,
+            "action": "reschedule",
+            "new_date": (booked.appointment_date + timedelta(minutes=10)).isoformat()
+        },
+        {"appointment_id": moved.id, "action": "reschedule", "new_date": free_slot.isoformat()},
+        {"appointment_id": cancelled.id, "action": "cancel"}
+    ])
+
+    assert [result["outcome"] for result in body["results"]] == ["conflict", "updated", "updated"]
+    assert "overlaps" in body["results"][0]["detail"]
+
+    # The failed reschedule's savepoint was rolled back, the rest committed
+    response = await client.get(f"/api/appointments/{overlapping.id}")
+    assert response.json()["version"] == 1
+    response = await client.get(f"/api/appointments/{moved.id}")
+    assert response.json()["appointment_date"].startswith(free_slot.strftime("%Y-%m-%dT%H:%M"))
+    assert await _status(client, cancelled.id) == "CANCELLED"
@@ -0,0 +1,88 @@
+"""
+Appointment change feed: cursor paging and the safe_revision() watermark.
+"""
+
+import pytest
+from sqlalchemy import update
+
+from app.database import AsyncSessionLocal
+from app.models import Appointment
+from app.models.appointment import AppointmentStatus
+from app.services.changes import safe_revision
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def _current_cursor() -> int:
+    async with AsyncSessionLocal() as db:
+        safe, latest = await safe_revision(db)
+    assert safe == latest
+    return safe
+
+
+async def test_cursor_pages_through_changes(client, make_appointment):
+    since = await _current_cursor()
+    created = [await make_appointment() for _ in range(3)]
+
+    response = await client.get("/api/appointments/changes", params={"since": since, "limit": 2})
+    assert response.status_code == 200
+    first = response.json()
+    assert [change["id"] for change in first["changes"]] == [a.id for a in created[:2]]
+    assert first["has_more"] is True
+    assert first["next_since"] == first["changes"][-1]["revision"]
+
+    response = await client.get(
+        "/api/appointments/changes", params={"since": first["next_since"], "limit": 2}
+    )
+    second = response.json()
+    assert [change["id"] for change in second["changes"]] == [created[2].id]
+    assert second["has_more"] is False
+    assert second["pending"] is False
+
+    # A write moves the appointment past the cursor, once, in its new state
+    response = await client.post(
+        f"/api/appointments/{created[0].id}/confirm", json={"confirmed": True}
+    )
+    assert response.status_code == 200
+    response = await client.get(
+        "/api/appointments/changes", params={"since": second["next_since"]}
+    )
+    third = response.json()
+    assert [change["id"] for change in third["changes"]] == [created[0].id]
+    assert third["changes"][0]["status"] == AppointmentStatus.CONFIRMED.value
+
+    response = await client.get(
+        "/api/appointments/changes", params={"since": third["next_since"]}
+    )
+    assert response.json()["changes"] == []
+
+
+async def test_feed_stops_below_uncommitted_revisions(client, make_appointment):
+    appointment = await make_appointment()
+    since = await _current_cursor()
+
+    async with AsyncSessionLocal() as writer:
+        await writer.execute(
+            update(Appointment)
+            .where(Appointment.id == appointment.id)
+            .values(status=AppointmentStatus.CONFIRMED)
+        )
+        # The revision is taken but not committed: the feed must not read
+        # past it, or a cursor could move beyond it and never see it
+        async with AsyncSessionLocal() as db:
+            safe, latest = await safe_revision(db)
+        assert safe < latest
+
+        response = await client.get("/api/appointments/changes", params={"since": since})
+        page = response.json()
+        assert page["changes"] == []
+        assert page["pending"] is True
+        assert page["next_since"] == since
+
+        await writer.commit()
+
+    response = await client.get("/api/appointments/changes", params={"since": since})
+    page = response.json()
+    assert [change["id"] for change in page["changes"]] == [appointment.id]
+    assert page["pending"] is False
@@ -0,0 +1,75 @@
+"""
+Conversation state: jsonb_merge_patch() follows RFC 7396 and PATCH applies
+it to the stored state.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal
+from app.models import ConversationHistory
+
+
+pytestmark = pytest.mark.anyio
+
+
+# RFC 7396, Appendix A
+MERGE_PATCH_EXAMPLES = [
+    ({"a": "b"}, {"a": "c"}, {"a": "c"}),
+    ({"a": "b"}, {"b": "c"}, {"a": "b", "b": "c"}),
+    ({"a": "b"}, {"a": None}, {}),
+    ({"a": "b", "b": "c"}, {"a": None}, {"b": "c"}),
+    ({"a": ["b"]}, {"a": "c"}, {"a": "c"}),
+    ({"a": "c"}, {"a": ["b"]}, {"a": ["b"]}),
+    ({"a": {"b": "c"}}, {"a": {"b": "d", "c": None}}, {"a": {"b": "d"}}),
+    ({"a": [{"b": "c"}]}, {"a": [1]}, {"a": [1]}),
+    (["a", "b"], ["c", "d"], ["c", "d"]),
+    ({"a": "b"}, ["c"], ["c"]),
+    ({"a": "foo"}, None, None),
+    ({"a": "foo"}, "bar", "bar"),
+    ({"e": None}, {"a": 1}, {"e": None, "a": 1}),
+    ([1, 2], {"a": "b", "c": None}, {"a": "b"}),
+    ({}, {"a": {"bb": {"ccc": None}}}, {"a": {"bb": {}}})
+]
+
+
+@pytest.mark.parametrize("target, patch, expected", MERGE_PATCH_EXAMPLES)
+async def test_jsonb_merge_patch_follows_rfc_7396(database, target, patch, expected):
+    async with AsyncSessionLocal() as db:
+        merged = (await db.execute(
+            text("SELECT jsonb_merge_patch(CAST(:target AS jsonb), CAST(:patch AS jsonb))::text"),
+            {"target": json.dumps(target), "patch": json.dumps(patch)}
+        )).scalar_one()
+    assert json.loads(merged) == expected
+
+
+async def test_patch_merges_into_stored_state(client, make_appointment):
+    appointment = await make_appointment()
+    async with AsyncSessionLocal() as db:
+        conversation = ConversationHistory(
+            patient_id=appointment.patient_id,
+            appointment_id=appointment.id,
+            state={"step": "greeting", "slots": {"date": "monday", "time": "10:00"}}
+        )
+        db.add(conversation)
+        await db.commit()
+    url = f"/api/conversations/{conversation.id}"
+
+    response = await client.patch(url, json={
+        "state": {"step": None, "slots": {"time": None, "doctor": "DOC001"}, "confirmed": True}
+    })
+    assert response.status_code == 200
+    assert response.json()["state"] == {
+        "slots": {"date": "monday", "doctor": "DOC001"},
+        "confirmed": True
+    }
+
+    response = await client.get(url)
+    assert response.json()["state"]["slots"] == {"date": "monday", "doctor": "DOC001"}
+
+
+async def test_patch_missing_conversation_is_404(client, database):
+    response = await client.patch("/api/conversations/0", json={"state": {"a": 1}})
+    assert response.status_code == 404
@@ -0,0 +1,73 @@
+"""
+Bulk import: per-row rejections in the report and phone matching.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+pytestmark = pytest.mark.anyio
+
+HEADER = "patient_id,patient_phone,doctor_id,doctor_name,appointment_date,duration_minutes"
+
+
+async def _import_csv(client, lines):
+    body = "\n".join([HEADER, *lines]).encode()
+    return await client.post(
+        "/api/appointments/import",
+        files={"file": ("agenda.csv", body, "text/csv")}
+    )
+
+
+def _slot(days: int, hour: int) -> str:
+    day = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (day + timedelta(days=days, hours=hour)).isoformat()
+
+
+async def test_import_reports_rejected_rows(client, make_appointment):
+    booked = await make_appointment(hours_ahead=24 * 40)
+    patient_id = booked.patient_id
+    doctor = f"IMP-{booked.id}"
+    booked_at = booked.appointment_date.isoformat()
+
+    response = await _import_csv(client, [
+        f"{patient_id},,{doctor},Dr. Import,{_slot(50, 9)},30",        # 1 imported
+        f"{patient_id},,{doctor},Dr. Import,{_slot(50, 9)},30",        # 2 overlaps row 1
+        f"{patient_id},,{booked.doctor_id},Dr. Test,{booked_at},30",  # 3 doctor already booked
+        f"999999999,,{doctor},Dr. Import,{_slot(51, 9)},30",          # 4 unknown patient
+        f"{patient_id},,{doctor},Dr. Import,not-a-date,30",           # 5 invalid date
+        f"{patient_id},,{doctor},Dr. Import,{_slot(52, 9)},0",         # 6 non-positive duration
+        f",+56000000001,{doctor},Dr. Import,{_slot(53, 9)},30",        # 7 unknown phone
+        f",912345678,{doctor},Dr. Import,{_slot(54, 9)},30",           # 8 no international prefix
+    ])
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["received"], report["imported"], report["failed"]) == (8, 1, 7)
+    rejected = {error["row"]: error["detail"] for error in report["errors"]}
+    assert sorted(rejected) == [2, 3, 4, 5, 6, 7, 8]
+    assert "earlier row" in rejected[2]
+    assert "already has an appointment" in rejected[3]
+    assert "not found" in rejected[4]
+    assert rejected[5].startswith("appointment_date")
+    assert rejected[6].startswith("duration_minutes")
+    assert "No patient with phone" in rejected[7]
+    assert rejected[8].startswith("patient_phone")
+
+
+async def test_import_matches_phones_in_any_spelling(client, make_appointment):
+    appointment = await make_appointment()
+    phone = appointment.patient.phone  # "+569XXXXXXXX"
+    spaced = f"{phone[:3]} {phone[3]} {phone[4:8]} {phone[8:]}"
+    dashed = f"{phone[:3]}-{phone[3]}-{phone[4:8]}-{phone[8:]}"
+    doctor = f"IMP-PHONE-{appointment.id}"
+
+    response = await _import_csv(client, [
+        f",{spaced},{doctor},Dr. Import,{_slot(60, 9)},30",
+        f",{dashed},{doctor},Dr. Import,{_slot(60, 10)},30",
+        f",00{phone[1:]},{doctor},Dr. Import,{_slot(60, 11)},30",
+    ])
+
+    assert response.json()["errors"] == []
+    assert response.json()["imported"] == 3
@@ -0,0 +1,63 @@
+"""
+Phone lookup fast path: normalization and concurrent registration.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.services.patients import normalize_phone, patient_id_cache
+
+
+pytestmark = pytest.mark.anyio
+
+
+def _new_number() -> str:
+    return f"569{uuid.uuid4().int % 10**8:08d}"
+
+
+@pytest.mark.parametrize("raw", [
+    "+56 9 1234 5678",
+    "+56-9-1234-5678",
+    "0056912345678",
+    "whatsapp:+56912345678",
+    "(+56) 9 1234.5678"
+])
+def test_normalize_phone_to_e164(raw):
+    assert normalize_phone(raw) == "+56912345678"
+
+
+@pytest.mark.parametrize("raw", ["912345678", "56912345678", "+56abc", ""])
+def test_normalize_phone_rejects_numbers_without_prefix(raw):
+    with pytest.raises(ValueError):
+        normalize_phone(raw)
+
+
+async def test_lookup_rejects_national_numbers(client):
+    response = await client.post("/api/patients/lookup", json={"phone": "912345678"})
+
+    assert response.status_code == 422
+
+
+async def test_lookup_spellings_resolve_to_one_patient(client):
+    number = _new_number()
+
+    first = await client.post("/api/patients/lookup", json={"phone": f"+{number}", "name": "Ana"})
+    patient_id_cache.clear()
+    second = await client.post("/api/patients/lookup", json={"phone": f"00{number}"})
+
+    assert first.json()["created"] is True
+    assert second.json() == {"id": first.json()["id"], "phone": f"+{number}", "created": False}
+
+
+async def test_concurrent_lookups_create_one_patient(client):
+    phone = f"+{_new_number()}"
+
+    responses = await asyncio.gather(*(
+        client.post("/api/patients/lookup", json={"phone": phone}) for _ in range(10)
+    ))
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum(response.json()["created"] for response in responses) == 1
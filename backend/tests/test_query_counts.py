@@ -0,0 +1,70 @@
+"""
+Round-trips per request on the appointment read paths (N+1 regressions).
+"""
+
+import pytest
+
+from app.query_counter import assert_max_queries
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_upcoming_loads_patients_in_one_extra_query(client, upcoming_appointments):
+    # The window, then every patient in one SELECT ... IN
+    with assert_max_queries(2):
+        response = await client.get("/api/appointments/upcoming")
+
+    assert response.status_code == 200
+    appointments = response.json()
+    assert {a["id"] for a in appointments} >= set(upcoming_appointments)
+    assert all(a["patient"]["id"] == a["patient_id"] for a in appointments)
+
+
+async def test_upcoming_without_patients_is_one_query(client, upcoming_appointments):
+    with assert_max_queries(1):
+        response = await client.get("/api/appointments/upcoming?include_patient=false")
+
+    assert response.status_code == 200
+    assert len(response.json()) >= len(upcoming_appointments)
+
+
+async def test_upcoming_repeated_poll_is_served_from_cache(client, upcoming_appointments):
+    await client.get("/api/appointments/upcoming")
+
+    with assert_max_queries(0):
+        response = await client.get("/api/appointments/upcoming")
+
+    assert response.status_code == 200
+
+
+async def test_get_appointment_is_one_query(client, upcoming_appointments):
+    appointment_id = upcoming_appointments[0]
+
+    with assert_max_queries(1):
+        response = await client.get(f"/api/appointments/{appointment_id}")
+
+    assert response.status_code == 200
+    appointment = response.json()
+    assert appointment["id"] == appointment_id
+    assert appointment["patient"]["id"] == appointment["patient_id"]
+
+
+async def test_get_appointment_not_modified_is_one_query(client, upcoming_appointments):
+    appointment_id = upcoming_appointments[0]
+    etag = (await client.get(f"/api/appointments/{appointment_id}")).headers["etag"]
+
+    with assert_max_queries(1):
+        response = await client.get(
+            f"/api/appointments/{appointment_id}",
+            headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("hours", [0, -1, 24 * 30 + 1])
+async def test_upcoming_rejects_unbounded_windows(client, hours):
+    response = await client.get(f"/api/appointments/upcoming?hours={hours}")
+
+    assert response.status_code == 422
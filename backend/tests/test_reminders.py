@@ -0,0 +1,130 @@
+"""
+Reminder claims, the reminder job queue and their bookkeeping across
+reschedules.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import anyio
+import pytest
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import ReminderJob
+from app.models.reminder_job import ReminderJobStatus
+from app.services.reminder_jobs import (
+    claim_reminder_jobs,
+    complete_reminder_job,
+    enqueue_due_reminders
+)
+from app.services.reminders import claim_due_reminders
+
+
+pytestmark = pytest.mark.anyio
+
+
+def _in_hours(hours: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(hours=hours)).isoformat()
+
+
+async def _claimed_ids(client) -> set:
+    response = await client.post("/api/appointments/reminders/claim?limit=500&hours=48")
+    assert response.status_code == 200
+    return {appointment["id"] for appointment in response.json()}
+
+
+async def _no_commit() -> None:
+    pass
+
+
+async def test_concurrent_claims_skip_locked_rows(database, make_appointment, monkeypatch):
+    # Earlier than anything else in the window, so a small limit takes them
+    ours = {(await make_appointment(hours_ahead=0.1 + i / 100)).id for i in range(4)}
+
+    async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+        # Keep the first claim's transaction (and row locks) open
+        monkeypatch.setattr(first, "commit", _no_commit)
+        held = {appointment.id for appointment in await claim_due_reminders(first, limit=2)}
+        assert held < ours
+
+        # The second claim skips the locked rows instead of waiting on them
+        with anyio.fail_after(5):
+            claimed = {appointment.id for appointment in await claim_due_reminders(second, limit=500)}
+        assert claimed & ours == ours - held
+
+        monkeypatch.undo()
+        await first.commit()
+
+    # Both claims hold their lease now
+    async with AsyncSessionLocal() as db:
+        assert not {appointment.id for appointment in await claim_due_reminders(db, limit=500)} & ours
+
+
+async def test_reschedule_makes_reminder_due_again(client, make_appointment):
+    appointment = await make_appointment(hours_ahead=3)
+
+    assert appointment.id in await _claimed_ids(client)
+    sent = await client.post(
+        f"/api/appointments/{appointment.id}/reminder",
+        json={"reminder_message_sid": "SM-old-date", "reminder_type": "48h_confirmation"}
+    )
+    assert sent.json()["reminder_sent_at"] is not None
+    assert appointment.id not in await _claimed_ids(client)
+
+    response = await client.post(
+        f"/api/appointments/{appointment.id}/reschedule",
+        json={"new_date": _in_hours(20)}
+    )
+    assert response.status_code == 200
+    assert response.json()["reminder_sent_at"] is None
+    assert response.json()["reminder_attempts"] == 0
+
+    assert appointment.id in await _claimed_ids(client)
+
+
+async def test_batch_reschedule_makes_reminder_due_again(client, make_appointment):
+    rescheduled = await make_appointment(hours_ahead=3)
+    confirmed = await make_appointment(hours_ahead=4)
+    for appointment in (rescheduled, confirmed):
+        await client.post(f"/api/appointments/{appointment.id}/reminder", json={})
+
+    response = await client.post("/api/appointments/batch", json={"items": [
+        {"appointment_id": rescheduled.id, "action": "reschedule", "new_date": _in_hours(21)},
+        {"appointment_id": confirmed.id, "action": "confirm"}
+    ]})
+    assert response.json()["updated"] == 2
+
+    assert rescheduled.id in await _claimed_ids(client)
+    # Other transitions keep the reminder that was sent
+    kept = await client.get(f"/api/appointments/{confirmed.id}")
+    assert kept.json()["reminder_sent_at"] is not None
+
+
+async def _jobs_for(appointment_id: int) -> list:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ReminderJob).where(ReminderJob.appointment_id == appointment_id)
+        )
+        return result.scalars().all()
+
+
+async def test_reschedule_lets_the_job_queue_remind_again(client, make_appointment):
+    appointment = await make_appointment(hours_ahead=3)
+
+    async with AsyncSessionLocal() as db:
+        await enqueue_due_reminders(db)
+        jobs = await claim_reminder_jobs(db, "test-worker", limit=500)
+        job = next(job for job in jobs if job.appointment_id == appointment.id)
+        assert await complete_reminder_job(db, job, "SM-old-date")
+
+    response = await client.post(
+        f"/api/appointments/{appointment.id}/reschedule",
+        json={"new_date": _in_hours(22)}
+    )
+    assert response.status_code == 200
+    assert await _jobs_for(appointment.id) == []
+
+    async with AsyncSessionLocal() as db:
+        await enqueue_due_reminders(db)
+    [job] = await _jobs_for(appointment.id)
+    assert job.status == ReminderJobStatus.PENDING
@@ -0,0 +1,67 @@
+"""
+Response cache: writes invalidate the cached /upcoming window, and backend
+errors degrade to misses.
+"""
+
+import logging
+
+import pytest
+
+from app.services.response_cache import (
+    CachedResponse,
+    MemoryCacheBackend,
+    ResponseCache,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def _upcoming_ids(client) -> list:
+    response = await client.get("/api/appointments/upcoming", params={"hours": 6})
+    assert response.status_code == 200
+    return [appointment["id"] for appointment in response.json()]
+
+
+async def test_confirm_invalidates_the_cached_window(client, make_appointment):
+    appointment = await make_appointment(hours_ahead=3)
+    assert appointment.id in await _upcoming_ids(client)
+    # Served from the cache until a write drops it
+    assert appointment.id in await _upcoming_ids(client)
+
+    response = await client.post(
+        f"/api/appointments/{appointment.id}/confirm", json={"confirmed": True}
+    )
+    assert response.status_code == 200
+    assert appointment.id not in await _upcoming_ids(client)
+
+
+async def test_batch_invalidates_the_cached_window(client, make_appointment):
+    appointment = await make_appointment(hours_ahead=3)
+    assert appointment.id in await _upcoming_ids(client)
+
+    response = await client.post(
+        "/api/appointments/batch",
+        json={"items": [{"appointment_id": appointment.id, "action": "cancel"}]}
+    )
+    assert response.status_code == 200
+    assert appointment.id not in await _upcoming_ids(client)
+
+
+class FailingBackend(MemoryCacheBackend):
+    async def get(self, key):
+        raise ConnectionError("cache unavailable")
+
+
+async def test_backend_errors_are_misses(caplog):
+    cache = ResponseCache("test", FailingBackend(maxsize=8), ttl_seconds=60)
+
+    async def load() -> CachedResponse:
+        return CachedResponse(b"[]", 'W/"0"')
+
+    with caplog.at_level(logging.WARNING, logger="app.services.response_cache"):
+        assert await cache.get(("key",)) is None
+        assert await cache.load(("key",), load) == CachedResponse(b"[]", 'W/"0"')
+
+    assert cache.errors == 3
+    assert "test cache: ConnectionError" in caplog.text
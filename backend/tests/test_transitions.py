@@ -0,0 +1,105 @@
+"""
+Appointment writes: creation, status transitions, reschedules and the
+conflicts they report.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_naive_datetimes_are_read_as_utc(client, make_appointment):
+    appointment = await make_appointment()
+    naive = (datetime.utcnow() + timedelta(days=2)).replace(microsecond=0)
+
+    response = await client.post(
+        f"/api/appointments/{appointment.id}/reschedule",
+        json={"new_date": naive.isoformat()}
+    )
+    assert response.status_code == 200
+    stored = datetime.fromisoformat(response.json()["appointment_date"])
+    assert stored == naive.replace(tzinfo=timezone.utc)
+
+    just_past = datetime.utcnow() - timedelta(minutes=1)
+    response = await client.post(
+        f"/api/appointments/{appointment.id}/reschedule",
+        json={"new_date": just_past.isoformat()}
+    )
+    assert response.status_code == 400
+
+
+async def test_stale_expected_version_is_409(client, make_appointment):
+    appointment = await make_appointment()
+    url = f"/api/appointments/{appointment.id}/confirm"
+
+    response = await client.post(url, json={"confirmed": True, "expected_version": 1})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+    # A second reply based on the same read loses instead of overwriting
+    response = await client.post(url, json={"confirmed": False, "expected_version": 1})
+    assert response.status_code == 409
+    assert "version 2, expected 1" in response.json()["detail"]
+
+    response = await client.get(f"/api/appointments/{appointment.id}")
+    assert response.json()["status"] == "CONFIRMED"
+
+
+async def test_disallowed_transition_is_409(client, make_appointment):
+    appointment = await make_appointment()
+    response = await client.post(f"/api/appointments/{appointment.id}/cancel")
+    assert response.status_code == 200
+
+    response = await client.post(
+        f"/api/appointments/{appointment.id}/confirm", json={"confirmed": True}
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot confirm appointment in status CANCELLED"
+
+    response = await client.get(f"/api/appointments/{appointment.id}")
+    assert response.json()["status"] == "CANCELLED"
+    assert response.json()["version"] == 2
+
+
+async def test_missing_appointment_is_404(client, database):
+    response = await client.post("/api/appointments/0/confirm", json={"confirmed": True})
+    assert response.status_code == 404
+
+
+async def test_double_booking_is_409(client, make_appointment):
+    booked = await make_appointment(hours_ahead=24)
+    other = await make_appointment(hours_ahead=48, doctor_id=booked.doctor_id)
+    overlapping = booked.appointment_date + timedelta(minutes=15)
+
+    response = await client.post("/api/appointments/", json={
+        "patient_id": booked.patient_id,
+        "doctor_id": booked.doctor_id,
+        "doctor_name": "Dr. Test",
+        "appointment_date": overlapping.isoformat()
+    })
+    assert response.status_code == 409
+
+    response = await client.post(
+        f"/api/appointments/{other.id}/reschedule",
+        json={"new_date": overlapping.isoformat()}
+    )
+    assert response.status_code == 409
+    assert "would overlap" in response.json()["detail"]
+
+    # Back-to-back is not an overlap, and a cancelled slot is free again
+    response = await client.post(
+        f"/api/appointments/{other.id}/reschedule",
+        json={"new_date": (booked.appointment_date + timedelta(minutes=30)).isoformat()}
+    )
+    assert response.status_code == 200
+
+    response = await client.post(f"/api/appointments/{booked.id}/cancel")
+    assert response.status_code == 200
+    response = await client.post(
+        f"/api/appointments/{other.id}/reschedule",
+        json={"new_date": overlapping.isoformat()}
+    )
+    assert response.status_code == 200